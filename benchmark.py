@@ -0,0 +1,227 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import fakeadb
+import main as easyadb
+
+# Benchmarks for EasyADB's core operations, run against the fakeadb stand-in
+# server so they need no hardware and give repeatable numbers. Results are
+# written as JSON; a saved results file can be used as the baseline for the
+# next run, which then fails when a metric regresses past the tolerance.
+
+RESULTS_SCHEMA = 1
+DEFAULT_TOLERANCE = 0.25
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+def metric(value, unit, better):
+    return {'value': round(value, 4), 'unit': unit, 'better': better}
+
+def bench_shell_roundtrip(context):
+    # One shell,v2 service per command: connect, transport, run, exit code.
+    serial = context['serial']
+    samples = [timed(easyadb.adb_client.shell, 'true', serial) for _ in range(context['iterations'])]
+    return {
+        'shell.roundtrip_p50_ms': metric(statistics.median(samples) * 1000, 'ms', 'lower'),
+        'shell.roundtrip_p95_ms': metric(sorted(samples)[int(len(samples) * 0.95)] * 1000, 'ms', 'lower'),
+    }
+
+def bench_pooled_shell(context):
+    # Small commands over a warm pooled exec:sh session, one at a time and pipelined.
+    serial = context['serial']
+    easyadb.shell_pool.run('true', serial)
+    count = context['iterations'] * 5
+    sequential = timed(lambda: [easyadb.shell_pool.run('true', serial) for _ in range(count)])
+    pipelined = timed(easyadb.shell_pool.run_many, ['true'] * count, serial)
+    return {
+        'pool.sequential_per_s': metric(count / sequential, 'commands/s', 'higher'),
+        'pool.pipelined_per_s': metric(count / pipelined, 'commands/s', 'higher'),
+    }
+
+def bench_push_pull(context):
+    serial = context['serial']
+    size = context['transfer_mb'] * 2 ** 20
+    local_path = os.path.join(context['directory'], 'payload.bin')
+    with open(local_path, 'wb') as payload:
+        payload.write(os.urandom(size))
+    push = timed(easyadb.adb_client.push, local_path, '/sdcard/payload.bin', serial)
+    pull = timed(easyadb.adb_client.pull, '/sdcard/payload.bin', local_path + '.back', serial)
+    return {
+        'sync.push_mb_per_s': metric(size / push / 2 ** 20, 'MB/s', 'higher'),
+        'sync.pull_mb_per_s': metric(size / pull / 2 ** 20, 'MB/s', 'higher'),
+    }
+
+def bench_screenshot(context):
+    serial = context['serial']
+    count = max(5, context['iterations'] // 10)
+    _, raw_seconds = easyadb.burst_capture(count, serial, raw=True)
+    _, png_seconds = easyadb.burst_capture(count, serial, raw=False)
+    framebuffer = easyadb.capture_screenshot(serial, raw=True)
+    encode = timed(easyadb.encode_png, framebuffer)
+    return {
+        'screen.raw_fps': metric(count / raw_seconds, 'frames/s', 'higher'),
+        'screen.png_fps': metric(count / png_seconds, 'frames/s', 'higher'),
+        'screen.host_png_encode_ms': metric(encode * 1000, 'ms', 'lower'),
+    }
+
+def bench_install(context):
+    apk_path = os.path.join(context['directory'], 'app.apk')
+    with open(apk_path, 'wb') as apk_file:
+        apk_file.write(os.urandom(context['apk_mb'] * 2 ** 20))
+    single = timed(easyadb.adb_client.install, apk_path, context['serial'], ['-r'])
+    serials = [serial for serial, _ in context['devices']]
+    fan_out = timed(easyadb.install_on_devices, [apk_path], serials, ['-r'])
+    return {
+        'install.single_s': metric(single, 's', 'lower'),
+        'install.all_devices_s': metric(fan_out, 's', 'lower'),
+    }
+
+def bench_enumeration(context):
+    easyadb.device_tracker.stop()
+    tracker_sync = timed(easyadb.device_tracker.devices)
+    listing = statistics.median(timed(easyadb.adb_client.devices_long) for _ in range(20))
+    probe = timed(easyadb.probe_devices, context['devices'], lambda serial, info: None)
+    return {
+        'devices.tracker_first_sync_ms': metric(tracker_sync * 1000, 'ms', 'lower'),
+        'devices.list_ms': metric(listing * 1000, 'ms', 'lower'),
+        'devices.probe_all_s': metric(probe, 's', 'lower'),
+    }
+
+def bench_fleet(context):
+    # Fan-out paths across the whole farm: one health monitor cycle (pooled
+    # sessions, cold and then warm) and a probe of every device. Failed
+    # devices are counted, not fatal, so scenarios with failure rates work.
+    monitor = easyadb.HealthMonitor(easyadb.device_tracker, easyadb.shell_pool)
+    try:
+        cold = timed(asyncio.run, monitor.poll_once())
+        warm = timed(asyncio.run, monitor.poll_once())
+    finally:
+        monitor.close()
+    ready = [serial for serial, state in context['devices'] if state == 'device']
+    failures = []
+    probe = timed(easyadb.probe_devices, context['devices'],
+                  lambda serial, info: 'Error' in info and failures.append(serial))
+    return {
+        'fleet.monitor_cold_cycle_s': metric(cold, 's', 'lower'),
+        'fleet.monitor_warm_cycle_s': metric(warm, 's', 'lower'),
+        'fleet.monitor_error_ratio': metric(len(monitor.errors) / max(1, len(ready)), 'ratio', 'lower'),
+        'fleet.probe_per_s': metric(len(context['devices']) / probe, 'devices/s', 'higher'),
+    }
+
+BENCHMARKS = {
+    'shell': bench_shell_roundtrip,
+    'pool': bench_pooled_shell,
+    'sync': bench_push_pull,
+    'screen': bench_screenshot,
+    'install': bench_install,
+    'devices': bench_enumeration,
+    'fleet': bench_fleet,
+}
+
+def compare(results, baseline, tolerance):
+    # A metric regresses when it is worse than the baseline by more than
+    # tolerance. A baseline may carry a "tolerances" map to loosen or tighten
+    # individual metrics, e.g. noisy frame rates.
+    regressions = []
+    tolerances = baseline.get('tolerances', {})
+    for name, current in results['metrics'].items():
+        previous = baseline.get('metrics', {}).get(name)
+        if not previous or not previous['value']:
+            continue
+        change = (current['value'] - previous['value']) / previous['value']
+        if current['better'] == 'higher':
+            change = -change
+        if change > tolerances.get(name, tolerance):
+            regressions.append((name, previous['value'], current['value'], current['unit'], change))
+    return regressions
+
+def run(args):
+    # A scenario's own device count and link settings take precedence; the
+    # command-line values remain the defaults for devices it leaves unset.
+    scenario = fakeadb.load_scenario(args.scenario) if args.scenario else {}
+    scenario.setdefault('devices', args.devices)
+    scenario.setdefault('serial_format', 'bench-{:04d}')
+    devices = fakeadb.build_farm(scenario)
+    server = fakeadb.FakeAdbServer(devices, latency=args.latency / 1000, bandwidth=args.bandwidth * 2 ** 20).start()
+    easyadb.use_adb_server('127.0.0.1', server.port)
+    selected = args.only.split(',') if args.only else list(BENCHMARKS)
+    results = {
+        'schema': RESULTS_SCHEMA,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {'devices': len(devices), 'latency_ms': args.latency, 'bandwidth_mb_s': args.bandwidth,
+                   'iterations': args.iterations, 'scenario': args.scenario, 'benchmarks': selected},
+        'metrics': {},
+    }
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            context = {
+                'serial': next(device.serial for device in devices if device.state == 'device'),
+                'devices': [(device.serial, device.state) for device in devices],
+                'iterations': args.iterations,
+                'transfer_mb': args.transfer_mb,
+                'apk_mb': args.apk_mb,
+                'directory': directory,
+            }
+            for name in selected:
+                print(f"Running {name}...", file=sys.stderr)
+                results['metrics'].update(BENCHMARKS[name](context))
+    finally:
+        easyadb.shell_pool.close_all()
+        easyadb.device_tracker.stop()
+        server.stop()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark EasyADB against a simulated adb server.")
+    parser.add_argument('-n', '--devices', type=int, default=16, help="number of simulated devices")
+    parser.add_argument('--scenario', help="fakeadb scenario file describing the simulated device farm")
+    parser.add_argument('--latency', type=float, default=1.0, help="simulated per-request latency in ms")
+    parser.add_argument('--bandwidth', type=float, default=40.0, help="simulated link speed in MB/s (0: unlimited)")
+    parser.add_argument('--iterations', type=int, default=200, help="samples for the latency benchmarks")
+    parser.add_argument('--transfer-mb', type=int, default=16, help="push/pull payload size")
+    parser.add_argument('--apk-mb', type=int, default=8, help="size of the APK used for installs")
+    parser.add_argument('--only', help=f"comma-separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument('-o', '--output', help="write the results as JSON to this file")
+    parser.add_argument('--baseline', help="results file to compare against; exit 1 on a regression")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown against the baseline, as a fraction")
+    args = parser.parse_args()
+    unknown = set(args.only.split(',')) - set(BENCHMARKS) if args.only else set()
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(sorted(unknown))}")
+
+    results = run(args)
+    for name, value in results['metrics'].items():
+        print(f"{name:<34}{value['value']:>14.3f}  {value['unit']}")
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(results, output, indent=2)
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        settings = ('devices', 'latency_ms', 'bandwidth_mb_s', 'iterations', 'scenario')
+        if any(baseline.get('config', {}).get(key) != results['config'][key] for key in settings):
+            print("Warning: the baseline was recorded with different settings; compare with care.")
+        regressions = compare(results, baseline, args.tolerance)
+        for name, before, after, unit, change in regressions:
+            print(f"REGRESSION {name}: {before} -> {after} {unit} ({change:.0%} worse)")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
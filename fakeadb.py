@@ -0,0 +1,1026 @@
+import argparse
+import fnmatch
+import io
+import hashlib
+import json
+import posixpath
+import random
+import re
+import shlex
+import socket
+import socketserver
+import struct
+import sys
+import tarfile
+import threading
+import time
+import zlib
+
+# A stand-in for the adb server on localhost, with simulated devices behind
+# it. It speaks enough of the smart-socket protocol (host requests,
+# shell v2, exec, pooled exec:sh sessions, sync, streamed installs, backup
+# and restore) for EasyADB to run unmodified against it, so benchmarks and scale tests need
+# no hardware. Point EasyADB at it with `main.py -P <port> ...`.
+#
+# For scale tests a scenario file describes a whole device farm: how many
+# devices, their properties, scripted command output, and per-device link
+# latency, bandwidth and failure rates. See load_scenario for the format.
+
+DEFAULT_PROPS = {
+    'ro.product.model': 'Virtual Device',
+    'ro.product.manufacturer': 'EasyADB',
+    'ro.build.version.sdk': '34',
+    'ro.build.version.release': '14',
+    'ro.product.cpu.abi': 'arm64-v8a',
+}
+SCREEN_SIZE = (720, 1280)
+SYNC_DATA_MAX = 64 * 1024
+POOL_COMMAND = re.compile(rb"\( (.*?)\n\) </dev/null 2>&1; printf '\\n(\S+?)%d\\n' \$\?\n", re.S)
+
+
+def split_commands(command):
+    # Splits a shell line on ; && || and | into simple argument lists, each
+    # paired with the operator before it, and drops redirections. Good
+    # enough for the commands EasyADB sends; it is not a shell.
+    lexer = shlex.shlex(command, posix=True, punctuation_chars=True)
+    lexer.whitespace_split = True
+    commands, current, operator, skip = [], [], None, False
+    for token in lexer:
+        if skip:
+            skip = False
+        elif token in (';', '&&', '||', '|', '&', '(', ')'):
+            if current:
+                commands.append((operator, current))
+                operator = token
+            current = []
+        elif token in ('>', '>>', '<', '>&', '<&'):
+            if current and current[-1].isdigit():
+                current.pop()
+            skip = True
+        else:
+            current.append(token)
+    if current:
+        commands.append((operator, current))
+    return commands
+
+
+class FakeDevice:
+    # One simulated device: properties, installed packages, an in-memory
+    # filesystem and a small set of command handlers. Link settings left as
+    # None fall back to the server's. responses maps a command prefix such
+    # as "dumpsys battery" to scripted output, which wins over the built-in
+    # handler; see scripted_response.
+    def __init__(self, serial, props=None, screen_size=SCREEN_SIZE, packages=None, responses=None,
+                 latency=None, jitter=0.0, bandwidth=None, failure_rate=0.0, drop_rate=0.0, state='device'):
+        self.serial = serial
+        self.state = state
+        self.props = dict(DEFAULT_PROPS, **(props or {}))
+        self.packages = dict.fromkeys(packages or ('com.android.settings', 'com.android.systemui'), 1)
+        self.responses = {key: value if isinstance(value, dict) else {'output': value}
+                          for key, value in (responses or {}).items()}
+        self.files = {}
+        self.directories = {}
+        self.reverses = {}
+        self.input_events = []
+        # (seconds, nanoseconds, pid, tid, priority, tag, message), oldest first.
+        self.log = []
+        # (archive path, data) pairs such as ("apps/com.example/f/notes", b"..."),
+        # streamed by backup: in this order; restore: appends to restored.
+        self.backup_entries = []
+        self.restored = []
+        # The bytes of every APK streamed to the package manager.
+        self.installs = []
+        self.screen_size = screen_size
+        self.latency = latency
+        self.jitter = jitter
+        self.bandwidth = bandwidth
+        self.failure_rate = failure_rate
+        self.drop_rate = drop_rate
+        self.random = random.Random(serial)
+        self.booted = time.time() - self.random.uniform(600, 86400)
+        self._framebuffer = None
+        self._png = None
+        self._lock = threading.Lock()
+        # The working directory of the shell line running on this thread.
+        self._shell = threading.local()
+
+    def fault(self):
+        # Decides the fate of one request: None, 'fail' (the server answers
+        # FAIL) or 'drop' (the connection is cut without a reply).
+        roll = self.random.random()
+        if roll < self.failure_rate:
+            return 'fail'
+        if roll < self.failure_rate + self.drop_rate:
+            return 'drop'
+        return None
+
+    def framebuffer(self):
+        if self._framebuffer is None:
+            width, height = self.screen_size
+            row = bytes((x * 255 // width) for x in range(width) for _ in range(4))
+            self._framebuffer = struct.pack('<IIII', width, height, 1, 0) + row * height
+        return self._framebuffer
+
+    def png(self):
+        if self._png is None:
+            width, height = self.screen_size
+            pixels = self.framebuffer()[16:]
+            stride = width * 4
+            rows = b''.join(b'\0' + pixels[offset:offset + stride] for offset in range(0, len(pixels), stride))
+
+            def chunk(kind, body):
+                return struct.pack('>I', len(body)) + kind + body + struct.pack('>I', zlib.crc32(kind + body))
+            self._png = (b'\x89PNG\r\n\x1a\n' +
+                         chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)) +
+                         chunk(b'IDAT', zlib.compress(rows, 1)) + chunk(b'IEND', b''))
+        return self._png
+
+    def scripted_response(self, args):
+        # The longest scripted prefix of the command wins, matched on whole
+        # words so "pm list" does not catch "pm list-users".
+        line = ' '.join(args)
+        matches = [key for key in self.responses if line == key or line.startswith(key + ' ')]
+        return self.responses[max(matches, key=len)] if matches else None
+
+    def run(self, command):
+        # Returns (exit code, output bytes) for a whole shell line. Each line
+        # starts in /; nested runs, such as find -exec, share its directory.
+        nested = hasattr(self._shell, 'cwd')
+        if not nested:
+            self._shell.cwd = '/'
+        try:
+            return self.run_line(command)
+        finally:
+            if not nested:
+                del self._shell.cwd
+
+    def resolve(self, path):
+        return posixpath.normpath(posixpath.join(self._shell.cwd, path))
+
+    def run_line(self, command):
+        output, exit_code = [], 0
+        try:
+            commands = split_commands(command)
+        except ValueError as e:
+            return 2, f"/system/bin/sh: syntax error: {e}\n".encode()
+        for operator, args in commands:
+            if (operator == '&&' and exit_code) or (operator == '||' and not exit_code):
+                continue
+            if args[0] == 'exit':
+                return int(args[1]) if len(args) > 1 else exit_code, b''.join(output)
+            if args[0] == 'cd':
+                path = self.resolve(args[1] if len(args) > 1 else '/')
+                # A failed cd only complains on stderr, which EasyADB sends to /dev/null.
+                self._shell.cwd, exit_code = (path, 0) if self.is_directory(path) else (self._shell.cwd, 2)
+                continue
+            response = self.scripted_response(args)
+            if response is not None:
+                if response.get('delay_ms'):
+                    time.sleep(response['delay_ms'] / 1000)
+                exit_code = response.get('exit', 0)
+                data = response.get('output', '').replace('{serial}', self.serial).encode()
+                output.append(data)
+                continue
+            handler = getattr(self, 'command_' + args[0].replace('-', '_').split('/')[-1], None)
+            if handler is None:
+                exit_code, data = 127, f"/system/bin/sh: {args[0]}: inaccessible or not found\n".encode()
+            else:
+                exit_code, data = handler(args[1:])
+            output.append(data)
+        return exit_code, b''.join(output)
+
+    def read_file(self, path):
+        # Files pushed to the device, plus the /proc files the health
+        # monitor reads, synthesized so they change between samples.
+        if path in self.files:
+            return self.files[path][2]
+        if path == '/proc/stat':
+            ticks = int((time.time() - self.booted) * 100) * 8
+            busy = int(ticks * self.random.uniform(0.05, 0.6))
+            user, system = busy * 2 // 3, busy // 3
+            return f"cpu  {user} 0 {system} {ticks - busy} 0 0 0 0 0 0\n".encode()
+        if path == '/proc/meminfo':
+            total = 8 * 2 ** 20
+            available = int(total * self.random.uniform(0.2, 0.7))
+            return (f"MemTotal:       {total} kB\nMemFree:        {available // 2} kB\n"
+                    f"MemAvailable:   {available} kB\n").encode()
+        return None
+
+    def command_true(self, args):
+        return 0, b''
+
+    def command_false(self, args):
+        return 1, b''
+
+    def command_echo(self, args):
+        return 0, (' '.join(args) + '\n').encode()
+
+    def command_sleep(self, args):
+        time.sleep(float(args[0]) if args else 0)
+        return 0, b''
+
+    def command_id(self, args):
+        return 0, b'2000\n' if args == ['-u'] else b'uid=2000(shell) gid=2000(shell)\n'
+
+    def command_getprop(self, args):
+        if args:
+            return 0, (self.props.get(args[0], '') + '\n').encode()
+        return 0, ''.join(f"[{key}]: [{value}]\n" for key, value in sorted(self.props.items())).encode()
+
+    def command_setprop(self, args):
+        self.props[args[0]] = args[1] if len(args) > 1 else ''
+        return 0, b''
+
+    def command_wm(self, args):
+        if args[:1] == ['size']:
+            return 0, f"Physical size: {self.screen_size[0]}x{self.screen_size[1]}\n".encode()
+        if args[:1] == ['density']:
+            return 0, b'Physical density: 320\n'
+        return 0, b''
+
+    def command_dumpsys(self, args):
+        if args[:1] == ['-l']:
+            return 0, b'Currently running services:\n  activity\n  battery\n  meminfo\n  package\n  window\n'
+        if args[:1] == ['battery']:
+            return 0, b'Current Battery Service state:\n  AC powered: false\n  USB powered: true\n  level: 87\n  temperature: 285\n'
+        return 0, b''
+
+    def command_pm(self, args):
+        if args[:2] == ['list', 'packages']:
+            return 0, ''.join(f"package:{name}\n" for name in sorted(self.packages)).encode()
+        if args[:2] == ['list', 'features']:
+            return 0, b'feature:android.hardware.touchscreen\n'
+        if args[:1] == ['path'] and len(args) > 1 and args[1] in self.packages:
+            return 0, f"package:/data/app/{args[1]}/base.apk\n".encode()
+        if args[:1] in (['grant'], ['revoke'], ['clear']):
+            return 0, b'Success\n' if args[0] == 'clear' else b''
+        if args[:1] == ['uninstall'] and len(args) > 1:
+            return (0, b'Success\n') if self.packages.pop(args[-1], None) else (1, b'Failure [DELETE_FAILED_INTERNAL_ERROR]\n')
+        return 1, b'Unknown pm command\n'
+
+    def command_cmd(self, args):
+        if args[:1] == ['package']:
+            return self.command_pm(args[1:])
+        return 0, b''
+
+    def command_input(self, args):
+        with self._lock:
+            self.input_events.append(args)
+        return 0, b''
+
+    def command_screencap(self, args):
+        return 0, self.png() if '-p' in args else self.framebuffer()
+
+    def is_directory(self, path):
+        if path in self.files:
+            return False
+        return (path in ('/', '/sdcard') or path in self.directories or
+                any(name.startswith(path.rstrip('/') + '/') for name in self.files))
+
+    def walk(self, root):
+        # root and every file and directory below it, files and mkdir'd
+        # directories being the only things that exist.
+        root = root.rstrip('/') or '/'
+        if not self.is_directory(root):
+            return [root] if root in self.files else []
+        prefix = root.rstrip('/') + '/'
+        found = {root}
+        for name in list(self.files) + list(self.directories):
+            if name.startswith(prefix):
+                found.add(name)
+                parent = name.rpartition('/')[0]
+                while parent.startswith(prefix):
+                    found.add(parent)
+                    parent = parent.rpartition('/')[0]
+        return sorted(found)
+
+    def command_rm(self, args):
+        recursive = any(arg.startswith('-') and 'r' in arg for arg in args if arg != '--')
+        for path in [arg for arg in args if not arg.startswith('-')]:
+            for name in (self.walk(path) if recursive else [path]):
+                self.files.pop(name, None)
+                self.directories.pop(name, None)
+        return 0, b''
+
+    def command_stat(self, args):
+        # Only the -c formats EasyADB uses: %f (hex mode), %s, %Y and %n.
+        format_string = args[args.index('-c') + 1] if '-c' in args else '%n'
+        paths = [arg for index, arg in enumerate(args) if not arg.startswith('-')
+                 and (index == 0 or args[index - 1] != '-c')]
+        output, exit_code = [], 0
+        for path in paths:
+            resolved = self.resolve(path)
+            if resolved in self.files:
+                mode, mtime, data = self.files[resolved]
+                size = len(data)
+            elif self.is_directory(resolved):
+                mode, mtime, size = self.directories.get(resolved, 0o40771), int(self.booted), 4096
+            else:
+                output.append(f"stat: '{path}': No such file or directory\n")
+                exit_code = 1
+                continue
+            output.append(format_string.replace('%f', f"{mode:x}").replace('%s', str(size))
+                          .replace('%Y', str(mtime)).replace('%n', path) + '\n')
+        return exit_code, ''.join(output).encode()
+
+    def command_find(self, args):
+        # find ROOT... [-mindepth N] [-type f|d] [-exec CMD {} +]
+        roots = []
+        while args and not args[0].startswith('-'):
+            roots.append(args.pop(0))
+        min_depth = int(args[args.index('-mindepth') + 1]) if '-mindepth' in args else 0
+        kind = args[args.index('-type') + 1] if '-type' in args else None
+        matches = []
+        for root in roots:
+            base = self.resolve(root)
+            if not self.walk(base):
+                return 1, f"find: {root}: No such file or directory\n".encode()
+            for path in self.walk(base):
+                depth = path.count('/') - base.rstrip('/').count('/') if path != base else 0
+                if depth < min_depth or (kind == 'f' and path not in self.files) or \
+                        (kind == 'd' and path in self.files):
+                    continue
+                # Printed the way the root was given, relative roots included.
+                matches.append(root if path == base else root.rstrip('/') + '/' + path[len(base):].lstrip('/'))
+        if '-exec' in args:
+            command = args[args.index('-exec') + 1:args.index('{}')]
+            if not matches:
+                return 0, b''
+            return self.run(' '.join(shlex.quote(arg) for arg in command + matches))
+        return 0, ''.join(path + '\n' for path in matches).encode()
+
+    def command_chmod(self, args):
+        args = [arg for arg in args if arg != '--']
+        recursive = '-R' in args
+        args = [arg for arg in args if arg != '-R']
+        try:
+            bits = int(args[0], 8)
+        except ValueError:
+            return 1, f"chmod: unsupported mode {args[0]}\n".encode()
+        for path in args[1:]:
+            for name in (self.walk(path) if recursive else [path.rstrip('/')]):
+                if name in self.files:
+                    mode, mtime, data = self.files[name]
+                    self.files[name] = ((mode & ~0o7777) | bits, mtime, data)
+                elif self.is_directory(name):
+                    self.directories[name] = 0o40000 | bits
+                else:
+                    return 1, f"chmod: {name}: No such file or directory\n".encode()
+        return 0, b''
+
+    def command_sha1sum(self, args):
+        output, exit_code = [], 0
+        for path in args:
+            data = self.read_file(self.resolve(path))
+            if data is None:
+                output.append(f"sha1sum: {path}: No such file or directory\n")
+                exit_code = 1
+            else:
+                output.append(f"{hashlib.sha1(data).hexdigest()}  {path}\n")
+        return exit_code, ''.join(output).encode()
+
+    def command_cat(self, args):
+        data = self.read_file(args[0]) if args else None
+        if data is None:
+            return 1, f"cat: {args[0] if args else ''}: No such file or directory\n".encode()
+        return 0, data
+
+    def command_head(self, args):
+        count = int(args[args.index('-n') + 1]) if '-n' in args else 10
+        data = self.read_file(args[-1]) if args else None
+        if data is None:
+            return 1, f"head: {args[-1] if args else ''}: No such file or directory\n".encode()
+        return 0, b''.join(data.splitlines(keepends=True)[:count])
+
+    def command_df(self, args):
+        used = sum(len(data) for _, _, data in self.files.values()) // 1024 + 20 * 2 ** 20
+        total = 64 * 2 ** 20
+        return 0, (f"Filesystem     1K-blocks     Used Available Use% Mounted on\n"
+                   f"/dev/block/dm-5 {total} {used} {total - used} {used * 100 // total}% /data\n").encode()
+
+    def command_logcat(self, args):
+        # Dumps the log and exits; a capture has to reconnect with -T to
+        # see later entries, as it does when a real device drops away.
+        entries = list(self.log)
+        if '-T' in args:
+            seconds, _, millis = args[args.index('-T') + 1].partition('.')
+            since = (int(seconds), int(millis or 0) * 1000000)
+            entries = [entry for entry in entries if entry[:2] >= since]
+        output = []
+        for seconds, nanoseconds, pid, tid, priority, tag, message in entries:
+            if '-B' in args:
+                payload = bytes([priority]) + tag.encode() + b'\0' + message.encode() + b'\0'
+                # A v2 header: the v1 fields plus the sender's euid.
+                output.append(struct.pack('<HHiiIII', len(payload), 24, pid, tid, seconds, nanoseconds, 0) + payload)
+            else:
+                output.append(f"{seconds}.{nanoseconds // 1000000:03d} {pid} {tid} {tag}: {message}\n".encode())
+        return 0, b''.join(output)
+
+    def command_mkdir(self, args):
+        for path in args:
+            if not path.startswith('-'):
+                self.directories.setdefault(path.rstrip('/'), 0o40771)
+        return 0, b''
+
+
+class FakeAdbHandler(socketserver.BaseRequestHandler):
+    def read_exactly(self, size):
+        data = b''
+        while len(data) < size:
+            chunk = self.request.recv(size - len(data))
+            if not chunk:
+                raise EOFError
+            data += chunk
+        return data
+
+    def read_request(self):
+        return self.read_exactly(int(self.read_exactly(4), 16)).decode()
+
+    def okay(self):
+        self.request.sendall(b'OKAY')
+
+    def fail(self, message):
+        data = message.encode()
+        self.request.sendall(b'FAIL' + b'%04x' % len(data) + data)
+
+    def send_string(self, text):
+        data = text.encode()
+        self.request.sendall(b'%04x' % len(data) + data)
+
+    def handle(self):
+        # Like adb, no Nagle delay: sync replies go out as several small writes.
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        try:
+            self.serve()
+        except (EOFError, OSError, ValueError):
+            # ValueError: a client that does not speak the smart-socket protocol.
+            pass
+
+    def serve(self):
+        server = self.server
+        device = None
+        while True:
+            request = self.read_request()
+            server.delay(device)
+            if request == 'host:version':
+                self.okay()
+                self.send_string('0029')
+                return
+            if request in ('host:devices', 'host:devices-l'):
+                self.okay()
+                self.send_string(server.device_list(request.endswith('-l')))
+                return
+            if request in ('host:track-devices', 'host:track-devices-l'):
+                self.okay()
+                server.track(self, request.endswith('-l'))
+                return
+            if request == 'host:list-forward':
+                self.okay()
+                self.send_string(''.join(f"{serial} {local} {remote}\n" for (serial, local), remote
+                                         in list(server.forwards.items())))
+                return
+            if request == 'host:mdns:services':
+                self.okay()
+                self.send_string(''.join(f"adb-{address.replace(':', '-')}\t_adb-tls-connect._tcp.\t{address}\n"
+                                         for address in list(server.wireless)))
+                return
+            if request.startswith('host:connect:'):
+                self.okay()
+                self.send_string(server.connect(request[len('host:connect:'):]))
+                return
+            if request.startswith('host:disconnect:'):
+                address = request[len('host:disconnect:'):]
+                if address not in server.devices:
+                    self.fail(f"no such device '{address}'")
+                    return
+                server.remove_device(address)
+                self.okay()
+                self.send_string(f"disconnected {address}")
+                return
+            if request.startswith('host-serial:') or request.startswith('host:'):
+                device = server.resolve(request)
+                service = request.split(':')[-1]
+                if device is None and request.startswith('host-serial:'):
+                    self.fail('device not found')
+                    return
+                if request.startswith('host:transport'):
+                    if device is None:
+                        self.fail('no devices/emulators found' if not server.devices else
+                                  'more than one device/emulator')
+                        return
+                    if device.state != 'device':
+                        self.fail(f"device {device.state}")
+                        return
+                    self.okay()
+                    continue
+                if service == 'features':
+                    self.okay()
+                    self.send_string('shell_v2,cmd,stat_v2,ls_v2,fixed_push_mkdir,apex,abb,abb_exec')
+                elif service == 'get-serialno':
+                    serials = [serial for serial, item in server.devices.items() if item.state == 'device']
+                    if len(serials) != 1:
+                        self.fail('more than one device/emulator' if serials else 'no devices/emulators found')
+                    else:
+                        self.okay()
+                        self.send_string(serials[0])
+                elif ':forward:' in request or ':killforward' in request:
+                    self.serve_forward(device, request)
+                elif service.startswith('wait-for'):
+                    self.okay()
+                    self.okay()
+                else:
+                    self.fail(f"unknown host service {request}")
+                return
+            if device is None:
+                self.fail('no transport selected')
+                return
+            fault = device.fault()
+            if fault == 'fail':
+                self.fail('device offline')
+            elif fault is None:
+                self.serve_device(device, request)
+            return
+
+    def serve_forward(self, device, request):
+        # Forwards are only bookkeeping here: nothing listens on the local port.
+        _, _, spec = request.partition(':killforward:' if ':killforward:' in request else ':forward:')
+        if request.endswith(':killforward-all'):
+            scope = device.serial if request.startswith('host-serial:') else None
+            for key in [key for key in self.server.forwards if scope in (None, key[0])]:
+                del self.server.forwards[key]
+        elif ':killforward:' in request:
+            if self.server.forwards.pop((device.serial if device else None, spec), None) is None:
+                self.fail(f"listener '{spec}' not found")
+                return
+        else:
+            if device is None:
+                self.fail('no devices/emulators found')
+                return
+            local, _, remote = spec.partition(';')
+            self.server.forwards[(device.serial, local.replace('norebind:', ''))] = remote
+        self.okay()
+        self.okay()
+
+    def serve_reverse(self, device, command):
+        if command == 'list-forward':
+            self.okay()
+            self.send_string(''.join(f"host {remote} {local}\n" for remote, local in list(device.reverses.items())))
+            return
+        if command == 'killforward-all':
+            device.reverses.clear()
+        elif command.startswith('killforward:'):
+            if device.reverses.pop(command[len('killforward:'):], None) is None:
+                self.okay()
+                self.fail(f"listener '{command[len('killforward:'):]}' not found")
+                return
+        elif command.startswith('forward:'):
+            remote, _, local = command[len('forward:'):].partition(';')
+            device.reverses[remote.replace('norebind:', '')] = local
+        self.okay()
+        self.okay()
+
+    def serve_stream(self, device, port):
+        # The device's localhost is the host's here, so tcp:PORT reaches a
+        # server the test started on this machine.
+        try:
+            upstream = socket.create_connection(('127.0.0.1', port))
+        except OSError as e:
+            self.fail(f"connect failed: {e}")
+            return
+        self.okay()
+
+        def copy(source, destination):
+            try:
+                while True:
+                    data = source.recv(SYNC_DATA_MAX)
+                    if not data:
+                        break
+                    self.server.send_throttled(destination, data, device)
+            except OSError:
+                pass
+            try:
+                destination.shutdown(socket.SHUT_WR)
+            except OSError:
+                pass
+        thread = threading.Thread(target=copy, args=(self.request, upstream), daemon=True)
+        thread.start()
+        copy(upstream, self.request)
+        thread.join()
+        upstream.close()
+
+    def serve_device(self, device, request):
+        service, _, command = request.partition(':')
+        if service == 'shell,v2,raw':
+            self.okay()
+            exit_code, output = device.run(command)
+            self.server.send_throttled(self.request, struct.pack('<BI', 1, len(output)) + output, device)
+            self.request.sendall(struct.pack('<BIB', 3, 1, exit_code & 0xff))
+        elif request == 'exec:sh':
+            self.okay()
+            self.serve_pool(device)
+        elif service == 'exec' and command.startswith('cmd package install'):
+            self.okay()
+            self.serve_install(device, command)
+        elif service in ('shell', 'exec'):
+            self.okay()
+            self.server.send_throttled(self.request, device.run(command)[1], device)
+        elif service == 'sync':
+            self.okay()
+            self.serve_sync(device)
+        elif service == 'backup':
+            self.okay()
+            self.serve_backup(device, command.split())
+        elif service == 'restore':
+            self.okay()
+            self.serve_restore(device)
+        elif service == 'reverse':
+            self.serve_reverse(device, command)
+        elif service == 'tcp' and command.isdigit():
+            self.serve_stream(device, int(command))
+        else:
+            self.fail(f"unknown service {service}")
+
+    def serve_pool(self, device):
+        buffer = b''
+        while True:
+            chunk = self.request.recv(SYNC_DATA_MAX)
+            if not chunk:
+                return
+            buffer += chunk
+            # Latency is per round trip, so commands pipelined in one write share it.
+            delayed = False
+            while True:
+                match = POOL_COMMAND.search(buffer)
+                if not match:
+                    break
+                buffer = buffer[match.end():]
+                if device.state != 'device' or device.fault():
+                    # A pooled session dies with its device; the client has to reconnect.
+                    return
+                if not delayed:
+                    self.server.delay(device)
+                    delayed = True
+                exit_code, output = device.run(match.group(1).decode(errors='replace'))
+                self.server.send_throttled(self.request, output + b'\n' + match.group(2) + b'%d\n' % exit_code,
+                                           device)
+
+    def serve_install(self, device, command):
+        args = command.split()
+        if 'install-create' in args:
+            self.request.sendall(b'Success: created install session [1]\n')
+            return
+        if 'install-commit' in args or 'install-abandon' in args:
+            self.request.sendall(b'Success\n')
+            return
+        size = int(args[args.index('-S') + 1]) if '-S' in args else 0
+        device.installs.append(self.server.receive_throttled(self, size, device))
+        self.request.sendall(b'Success\n')
+
+    def serve_backup(self, device, args):
+        # An unencrypted, version 5 backup stream: the text header, then a
+        # tar of the selected entries, deflated unless -nocompress is given.
+        packages = [arg for arg in args if not arg.startswith('-')]
+        tar = io.BytesIO()
+        with tarfile.open(fileobj=tar, mode='w', format=tarfile.PAX_FORMAT) as archive:
+            for path, data in device.backup_entries:
+                parts = path.split('/')
+                if packages and not (parts[0] == 'apps' and parts[1] in packages):
+                    continue
+                info = tarfile.TarInfo(path)
+                info.size = len(data)
+                archive.addfile(info, io.BytesIO(data))
+        body = tar.getvalue()
+        compressed = '-nocompress' not in args
+        header = f"ANDROID BACKUP\n5\n{int(compressed)}\nnone\n".encode()
+        self.server.send_throttled(self.request, header + (zlib.compress(body) if compressed else body), device)
+
+    def serve_restore(self, device):
+        data = bytearray()
+        while True:
+            chunk = self.request.recv(SYNC_DATA_MAX)
+            if not chunk:
+                break
+            data += chunk
+        header_end = 0
+        for _ in range(4):
+            header_end = data.index(b'\n', header_end) + 1
+        body = bytes(data[header_end:])
+        if data[:header_end].split(b'\n')[2] == b'1':
+            body = zlib.decompress(body)
+        with tarfile.open(fileobj=io.BytesIO(body), mode='r') as archive:
+            for info in archive:
+                device.restored.append((info.name, archive.extractfile(info).read()))
+
+    def serve_sync(self, device):
+        while True:
+            command = self.read_exactly(4)
+            length = struct.unpack('<I', self.read_exactly(4))[0]
+            if command == b'QUIT':
+                return
+            path = self.read_exactly(length).decode(errors='replace')
+            if command == b'STAT':
+                entry = device.files.get(path)
+                if entry:
+                    mode, mtime, data = entry
+                    reply = struct.pack('<III', mode, len(data), mtime)
+                elif any(name.startswith(path.rstrip('/') + '/') for name in device.files) or path in ('/', '/sdcard'):
+                    reply = struct.pack('<III', 0o40755, 4096, int(time.time()))
+                else:
+                    reply = struct.pack('<III', 0, 0, 0)
+                self.request.sendall(b'STAT' + reply)
+            elif command == b'LIST':
+                prefix = path.rstrip('/') + '/'
+                for name, (mode, mtime, data) in list(device.files.items()):
+                    if name.startswith(prefix) and '/' not in name[len(prefix):]:
+                        encoded = name[len(prefix):].encode()
+                        self.request.sendall(b'DENT' + struct.pack('<IIII', mode, len(data), mtime, len(encoded)) + encoded)
+                self.request.sendall(b'DONE' + b'\0' * 16)
+            elif command == b'SEND':
+                remote_path, _, mode = path.rpartition(',')
+                chunks = []
+                while True:
+                    packet = self.read_exactly(4)
+                    size = struct.unpack('<I', self.read_exactly(4))[0]
+                    if packet == b'DONE':
+                        break
+                    chunks.append(self.server.receive_throttled(self, size, device))
+                device.files[remote_path] = (int(mode), size, b''.join(chunks))
+                self.request.sendall(b'OKAY' + b'\0' * 4)
+            elif command == b'RECV':
+                entry = device.files.get(path)
+                if entry is None:
+                    message = b'No such file or directory'
+                    self.request.sendall(b'FAIL' + struct.pack('<I', len(message)) + message)
+                    continue
+                data = entry[2]
+                for offset in range(0, len(data), SYNC_DATA_MAX):
+                    chunk = data[offset:offset + SYNC_DATA_MAX]
+                    self.server.send_throttled(self.request, b'DATA' + struct.pack('<I', len(chunk)) + chunk, device)
+                self.request.sendall(b'DONE' + b'\0' * 4)
+            else:
+                self.fail(f"unknown sync command {command!r}")
+                return
+
+
+class FakeAdbServer(socketserver.ThreadingTCPServer):
+    # latency is added once per request and per pooled command; bandwidth
+    # (bytes per second, 0 for unlimited) throttles bulk data both ways.
+    # Both are defaults that a device's own settings override.
+    allow_reuse_address = True
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, devices, host='127.0.0.1', port=0, latency=0.0, bandwidth=0):
+        super().__init__((host, port), FakeAdbHandler)
+        self.devices = {device.serial: device for device in devices}
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.forwards = {}
+        self.wireless = {}
+        self._trackers = []
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        self.shutdown()
+        self.server_close()
+        for device in self.wireless.values():
+            device.listener.close()
+
+    def delay(self, device=None):
+        latency = self.latency if device is None or device.latency is None else device.latency
+        if device is not None and device.jitter:
+            latency += device.random.uniform(0, device.jitter)
+        if latency:
+            time.sleep(latency)
+
+    def bandwidth_for(self, device):
+        return self.bandwidth if device is None or device.bandwidth is None else device.bandwidth
+
+    def send_throttled(self, sock, data, device=None):
+        bandwidth = self.bandwidth_for(device)
+        if not bandwidth:
+            sock.sendall(data)
+            return
+        for offset in range(0, len(data), SYNC_DATA_MAX):
+            chunk = data[offset:offset + SYNC_DATA_MAX]
+            started = time.perf_counter()
+            sock.sendall(chunk)
+            time.sleep(max(0, len(chunk) / bandwidth - (time.perf_counter() - started)))
+
+    def receive_throttled(self, handler, size, device=None):
+        bandwidth = self.bandwidth_for(device)
+        started = time.perf_counter()
+        data = handler.read_exactly(size)
+        if bandwidth:
+            time.sleep(max(0, size / bandwidth - (time.perf_counter() - started)))
+        return data
+
+    def resolve(self, request):
+        # Picks the device a host request addresses, or None.
+        if request.startswith('host:transport:'):
+            return self.devices.get(request[len('host:transport:'):])
+        if request.startswith('host-serial:'):
+            rest = request[len('host-serial:'):]
+            for serial in self.devices:
+                if rest.startswith(serial + ':'):
+                    return self.devices[serial]
+            return None
+        ready = [device for device in self.devices.values() if device.state == 'device']
+        return ready[0] if len(ready) == 1 else None
+
+    def device_list(self, long=False):
+        lines = []
+        for number, device in enumerate(self.devices.values(), 1):
+            if long:
+                lines.append(f"{device.serial}               {device.state} usb:1-{number // 8}.{number % 8} "
+                             f"product:virtual model:{device.props['ro.product.model'].replace(' ', '_')} "
+                             f"device:virtual transport_id:{number}")
+            else:
+                lines.append(f"{device.serial}\t{device.state}")
+        return ''.join(line + '\n' for line in lines)
+
+    def track(self, handler, long):
+        with self._lock:
+            self._trackers.append((handler, long))
+        handler.send_string(self.device_list(long))
+        try:
+            while handler.request.recv(1):
+                pass
+        finally:
+            with self._lock:
+                self._trackers.remove((handler, long))
+
+    def notify(self):
+        # Pushes the current device list to every track-devices client.
+        with self._lock:
+            trackers = list(self._trackers)
+        for handler, long in trackers:
+            try:
+                handler.send_string(self.device_list(long))
+            except OSError:
+                pass
+
+    def add_device(self, device):
+        self.devices[device.serial] = device
+        self.notify()
+
+    def remove_device(self, serial):
+        # Like adb, forwards and reverses die with the device's connection.
+        device = self.devices.pop(serial, None)
+        if device:
+            device.reverses.clear()
+        for key in [key for key in self.forwards if key[0] == serial]:
+            del self.forwards[key]
+        self.notify()
+
+    def add_wireless(self, **settings):
+        # A device reachable over "Wi-Fi": its own port on localhost answers
+        # the adb handshake, it is advertised over mDNS, and it joins the
+        # device list once connected. Returns the device; its serial is
+        # the address to connect to.
+        listener = socket.create_server(('127.0.0.1', 0))
+        device = FakeDevice(f"127.0.0.1:{listener.getsockname()[1]}", **settings)
+        device.listener = listener
+        self.wireless[device.serial] = device
+
+        def answer_handshakes():
+            while not self._stopped.is_set():
+                try:
+                    sock, _ = listener.accept()
+                except OSError:
+                    return
+                with sock:
+                    try:
+                        sock.recv(SYNC_DATA_MAX)
+                        payload = b'device::ro.product.model=Virtual_Device;\0'
+                        command = struct.unpack('<I', b'CNXN')[0]
+                        sock.sendall(struct.pack('<6I', command, 0x01000001, 256 * 1024, len(payload),
+                                                 sum(payload), command ^ 0xffffffff) + payload)
+                    except OSError:
+                        pass
+        threading.Thread(target=answer_handshakes, daemon=True).start()
+        return device
+
+    def connect(self, address):
+        # Mirrors the messages of `adb connect`, which always answers OKAY.
+        device = self.wireless.get(address)
+        if device is None or device.fault():
+            return f"failed to connect to {address}: Connection refused"
+        if address in self.devices:
+            return f"already connected to {address}"
+        device.state = 'device'
+        self.add_device(device)
+        return f"connected to {address}"
+
+    def set_state(self, serial, state):
+        self.devices[serial].state = state
+        self.notify()
+
+    def start_churn(self, interval, seed=None):
+        # Every interval seconds one random device drops offline, or an
+        # offline one comes back, as on a farm with flaky USB hubs.
+        chooser = random.Random(seed)
+
+        def churn():
+            while not self._stopped.wait(interval):
+                device = chooser.choice(list(self.devices.values()))
+                self.set_state(device.serial, 'offline' if device.state == 'device' else 'device')
+        threading.Thread(target=churn, daemon=True).start()
+        return self
+
+
+def build_farm(scenario):
+    # Builds the devices a scenario describes. Top-level keys apply to every
+    # device; each entry in "profiles" overrides them for the serials its
+    # "match" glob selects, with later profiles winning. props and
+    # responses are merged rather than replaced. Times are in
+    # milliseconds and bandwidth in MB/s, as on the command line.
+    serial_format = scenario.get('serial_format', 'virtual-{:04d}')
+    devices = []
+    for number in range(1, scenario.get('devices', 4) + 1):
+        serial = serial_format.format(number)
+        settings = dict(scenario, props=dict(scenario.get('props', {})),
+                        responses=dict(scenario.get('responses', {})))
+        for profile in scenario.get('profiles', []):
+            if fnmatch.fnmatchcase(serial, profile.get('match', '*')):
+                settings.update({key: value for key, value in profile.items() if key not in ('props', 'responses')})
+                settings['props'].update(profile.get('props', {}))
+                settings['responses'].update(profile.get('responses', {}))
+        latency, bandwidth = settings.get('latency_ms'), settings.get('bandwidth_mb_s')
+        devices.append(FakeDevice(
+            serial,
+            props=settings['props'],
+            screen_size=tuple(settings.get('screen_size', SCREEN_SIZE)),
+            packages=settings.get('packages'),
+            responses=settings['responses'],
+            latency=None if latency is None else latency / 1000,
+            jitter=settings.get('jitter_ms', 0) / 1000,
+            bandwidth=None if bandwidth is None else bandwidth * 2 ** 20,
+            failure_rate=settings.get('failure_rate', 0.0),
+            drop_rate=settings.get('drop_rate', 0.0),
+            state=settings.get('state', 'device'),
+        ))
+    return devices
+
+def load_scenario(path):
+    # A scenario is a JSON object, for example:
+    #   {"devices": 300, "serial_format": "farm-{:04d}", "latency_ms": 5, "jitter_ms": 10,
+    #    "bandwidth_mb_s": 20, "failure_rate": 0.01,
+    #    "responses": {"dumpsys battery": "level: 40\n", "pm list packages": {"output": "", "exit": 1}},
+    #    "profiles": [{"match": "farm-00[0-4]?", "latency_ms": 80, "props": {"ro.build.version.sdk": "29"}},
+    #                 {"match": "farm-0299", "state": "unauthorized"}]}
+    # A scripted response is either the output text or an object with
+    # "output", "exit" and "delay_ms"; "{serial}" in the output is replaced.
+    with open(path) as scenario_file:
+        return json.load(scenario_file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a stand-in adb server with simulated devices.")
+    parser.add_argument('-P', '--port', type=int, default=5038, help="port to listen on")
+    parser.add_argument('-n', '--devices', type=int, help="number of simulated devices (default 4)")
+    parser.add_argument('--scenario', help="JSON file describing the device farm")
+    parser.add_argument('--latency', type=float, help="added delay per request, in milliseconds")
+    parser.add_argument('--jitter', type=float, help="random extra delay per request, up to this many ms")
+    parser.add_argument('--bandwidth', type=float, help="bulk transfer limit in MB/s (0: unlimited)")
+    parser.add_argument('--failure-rate', type=float, help="share of device requests answered with FAIL")
+    parser.add_argument('--drop-rate', type=float, help="share of device requests whose connection is cut")
+    parser.add_argument('--churn', type=float, metavar='SECONDS',
+                        help="toggle a random device offline/online this often")
+    parser.add_argument('--wireless', type=int, default=0,
+                        help="also simulate this many Wi-Fi devices, advertised over mDNS and waiting for `connect`")
+    args = parser.parse_args()
+    scenario = load_scenario(args.scenario) if args.scenario else {}
+    # Command-line options override the scenario's top-level settings.
+    for option, key in (('devices', 'devices'), ('latency', 'latency_ms'), ('jitter', 'jitter_ms'),
+                        ('bandwidth', 'bandwidth_mb_s'), ('failure_rate', 'failure_rate'),
+                        ('drop_rate', 'drop_rate')):
+        if getattr(args, option) is not None:
+            scenario[key] = getattr(args, option)
+    devices = build_farm(scenario)
+    server = FakeAdbServer(devices, port=args.port)
+    for _ in range(args.wireless):
+        server.add_wireless(failure_rate=scenario.get('failure_rate', 0.0))
+    if args.churn:
+        server.start_churn(args.churn)
+    print(f"Serving {len(devices)} simulated device(s) on 127.0.0.1:{server.port}. Press Ctrl+C to stop.")
+    if server.wireless:
+        print(f"Wi-Fi devices listen on: {', '.join(server.wireless)}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,1337 +1,5831 @@
-import os
-import subprocess
-import sys
-import platform
-import time
-
-PLATFORM_TOOLS_PATH = r"platform-tools" 
-
-def run_adb_command(command):
-    try:
-        result = subprocess.check_output([os.path.join(PLATFORM_TOOLS_PATH, 'adb'), command]).decode()
-        return result
-    except subprocess.CalledProcessError:
-        return None
-
-def get_device_info(adb_path, device_id):
-    info = {}
-    try:
-        result = subprocess.run([adb_path, '-s', device_id, 'shell', 'dumpsys', 'battery'], capture_output=True, text=True, check=True)
-        info['Battery Info'] = result.stdout.strip().split('\n')
-    except subprocess.CalledProcessError as e:
-        info['Error'] = str(e)
-    return info
-
-def list_adb_devices():
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    
-    try:
-        result = subprocess.run([adb_path, 'devices'], capture_output=True, text=True, check=True)
-        
-        devices_output = result.stdout.strip().split('\n')[1:]
-        devices = [line.split()[0] for line in devices_output if line]
-        
-        if not devices:
-            print("No devices connected.")
-            sys.exit()
-        else:
-            print("Connected devices:")
-            for device in devices:
-                print(f"\nDevice ID: {device}")
-                info = get_device_info(adb_path, device)
-                for key, value in info.items():
-                    if key == 'Battery Info':
-                        print(f"{key}:")
-                        for line in value:
-                            print(f"  {line}")
-                    else:
-                        print(f"{key}: {value}")
-
-            input("\nPress Enter to continue to the device options...")
-            os.system(f'python {os.path.join(os.path.dirname(__file__), "connected.py")}')
-    
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred while running adb: {e}")
-    except FileNotFoundError:
-        print("ADB binary not found.")
-    except Exception as e:
-        print(f"An unexpected error occurred: {e}")
-
-def clear_screen():
-    os.system('cls' if platform.system() == 'Windows' else 'clear')
-
-def display_banner():
-    banner = """
- _____                   _    ____  ____  
-| ____|__ _ ___ _   _   / \\  |  _ \\| __ ) 
-|  _| / _` / __| | | | / _ \\ | | | |  _ \\ 
-| |__| (_| \\__ \\ |_| |/ ___ \\| |_| | |_) |
-|_____\\__,_|___/\\__, /_/   \\_\\____/|____/ 
-                |___/                     
-By: Awiones
-    """
-    print(banner)
-
-def display_menu():
-    clear_screen()
-    display_banner()
-    menu = """
-[1] Device Management
-[2] App Management
-[3] File Management
-[4] System Management
-[5] Shell and Command Execution
-[6] Screen Management
-[7] Network Management
-[8] Data Management
-[9] Development and Testing
-[10] Root Access and File Permissions
-[11] Remote Control
-[12] Power Management
-[13] Permissions and Security
-[14] Battery Management
-[15] Advanced Usage
-[0] Exit
-    """
-    print(menu)
-
-
-def device_management():
-    while True:
-        clear_screen()
-        display_banner()
-        print("Device Management")
-        menu = """
-[1] Lists all the connected Android devices and emulators.
-[2] Connects to a device over Wi-Fi.
-[3] Disconnects from a device.
-[4] Pairs a device with ADB over Wi-Fi (Android 11 and above).
-[0] Return to the main menu.
-        """
-        print(menu)
-        choice = input("Select an option: ").strip()
-        
-        if choice == "1":
-            list_adb_devices()
-            input("\nPress Enter to return to the Device Management menu...")
-        elif choice == "2":
-            connect_over_wifi()
-        elif choice == "3":
-            disconnect_device()
-        elif choice == "4":
-            pair_device_over_wifi()
-        elif choice == "0":
-            break
-        else:
-            print("Invalid option, please select again.")
-
-def connect_over_wifi():
-    clear_screen()
-    print("Connect to a device over Wi-Fi")
-    ip = input("Enter the device IP address: ").strip()
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'tcpip', '5555'], check=True)
-        subprocess.run([adb_path, 'connect', ip], check=True)
-        print(f"Successfully connected to {ip}.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the Device Management menu...")
-
-def disconnect_device():
-    clear_screen()
-    print("Disconnect a device")
-    ip = input("Enter the device IP address to disconnect: ").strip()
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'disconnect', ip], check=True)
-        print(f"Successfully disconnected from {ip}.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the Device Management menu...")
-
-def pair_device_over_wifi():
-    clear_screen()
-    print("Pair a device with ADB over Wi-Fi (Android 11 and above)")
-    ip = input("Enter the device IP address: ").strip()
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'pair', ip], check=True)
-        print(f"Successfully paired with {ip}.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the Device Management menu...")
-
-def app_management():
-    while True:
-        clear_screen()
-        display_banner()
-        print("App Management")
-        menu = """
-[1] Install an APK file.
-[2] Uninstall an app.
-[3] Install multiple APKs.
-[4] Reinstall an app, keeping its data.
-[0] Return to the main menu.
-        """
-        print(menu)
-        choice = input("Select an option: ").strip()
-
-        if choice == "1":
-            install_apk()
-        elif choice == "2":
-            uninstall_app()
-        elif choice == "3":
-            install_multiple_apks()
-        elif choice == "4":
-            reinstall_apk()
-        elif choice == "0":
-            break
-        else:
-            print("Invalid option, please select again.")
-
-def install_apk():
-    clear_screen()
-    print("Install APK")
-    apk_path = input("Enter the path to the APK file: ").strip()
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'install', apk_path], check=True)
-        print("APK installed successfully.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the App Management menu...")
-
-def uninstall_app():
-    clear_screen()
-    print("Uninstall App")
-    package_name = input("Enter the package name of the app to uninstall: ").strip()
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'uninstall', package_name], check=True)
-        print("App uninstalled successfully.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the App Management menu...")
-
-def install_multiple_apks():
-    clear_screen()
-    print("Install Multiple APKs")
-    apks = input("Enter the paths to the APK files separated by spaces: ").strip().split()
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'install-multiple'] + apks, check=True)
-        print("Multiple APKs installed successfully.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the App Management menu...")
-
-def reinstall_apk():
-    clear_screen()
-    print("Reinstall APK")
-    apk_path = input("Enter the path to the APK file: ").strip()
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'install', '-r', apk_path], check=True)
-        print("APK reinstalled successfully.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the App Management menu...")
-
-
-def file_management():
-    while True:
-        clear_screen()
-        display_banner()
-        print("File Management")
-        menu = """
-[1] Push a file to the device.
-[2] Pull a file from the device.
-[3] Delete a file on the device.
-[0] Return to the main menu.
-        """
-        print(menu)
-        choice = input("Select an option: ").strip()
-
-        if choice == "1":
-            push_file()
-        elif choice == "2":
-            pull_file()
-        elif choice == "3":
-            delete_file()
-        elif choice == "0":
-            break
-        else:
-            print("Invalid option, please select again.")
-
-def push_file():
-    clear_screen()
-    print("Push File to Device")
-    local_path = input("Enter the local file path: ").strip()
-    remote_path = input("Enter the remote path on the device: ").strip()
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'push', local_path, remote_path], check=True)
-        print("File pushed successfully.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the File Management menu...")
-
-def pull_file():
-    clear_screen()
-    print("Pull File from Device")
-    remote_path = input("Enter the remote file path on the device: ").strip()
-    local_path = input("Enter the local path to save the file: ").strip()
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'pull', remote_path, local_path], check=True)
-        print("File pulled successfully.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the File Management menu...")
-
-def delete_file():
-    clear_screen()
-    print("Delete File on Device")
-    remote_path = input("Enter the remote file path on the device to delete: ").strip()
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'shell', 'rm', remote_path], check=True)
-        print("File deleted successfully.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the File Management menu...")
-
-
-def system_management():
-    while True:
-        clear_screen()
-        display_banner()
-        print("System Management")
-        menu = """
-[1] Stream system logs.
-[2] Save logs to a file.
-[3] Generate a bug report.
-[4] Dump system service information.
-[5] Display real-time system processes.
-[0] Return to the main menu.
-        """
-        print(menu)
-        choice = input("Select an option: ").strip()
-
-        if choice == "1":
-            stream_logs()
-        elif choice == "2":
-            save_logs_to_file()
-        elif choice == "3":
-            generate_bug_report()
-        elif choice == "4":
-            dump_system_service_info()
-        elif choice == "5":
-            display_system_processes()
-        elif choice == "0":
-            break
-        else:
-            print("Invalid option, please select again.")
-
-def stream_logs():
-    clear_screen()
-    print("Streaming System Logs")
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'logcat'], check=True)
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the System Management menu...")
-
-def save_logs_to_file():
-    clear_screen()
-    print("Saving Logs to File")
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        with open('logcat.txt', 'w') as log_file:
-            subprocess.run([adb_path, 'logcat', '-d'], stdout=log_file, check=True)
-        print("Logs saved to logcat.txt.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the System Management menu...")
-
-def generate_bug_report():
-    clear_screen()
-    print("Generating Bug Report")
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'bugreport'], check=True)
-        print("Bug report generated.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the System Management menu...")
-
-def dump_system_service_info():
-    clear_screen()
-    print("Dumping System Service Information")
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'shell', 'dumpsys'], check=True)
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the System Management menu...")
-
-def display_system_processes():
-    clear_screen()
-    print("Displaying Real-Time System Processes")
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'shell', 'top'], check=True)
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the System Management menu...")
-
-def shell_and_command_execution():
-    while True:
-        clear_screen()
-        display_banner()
-        print("Shell and Command Execution")
-        menu = """
-[1] Start an interactive shell on the device.
-[2] Run a specific command on the device's shell.
-[3] List all installed packages on the device.
-[4] Uninstall a package via shell.
-[0] Return to the main menu.
-        """
-        print(menu)
-        choice = input("Select an option: ").strip()
-
-        if choice == "1":
-            start_interactive_shell()
-        elif choice == "2":
-            run_specific_command()
-        elif choice == "3":
-            list_installed_packages()
-        elif choice == "4":
-            uninstall_package()
-        elif choice == "0":
-            break
-        else:
-            print("Invalid option, please select again.")
-
-def start_interactive_shell():
-    clear_screen()
-    print("Starting Interactive Shell")
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'shell'], check=True)
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the Shell and Command Execution menu...")
-
-def run_specific_command():
-    clear_screen()
-    print("Run a Specific Command")
-    command = input("Enter the command to run: ").strip()
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        result = subprocess.check_output([adb_path, 'shell'] + command.split()).decode()
-        print(result)
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the Shell and Command Execution menu...")
-
-def list_installed_packages():
-    clear_screen()
-    print("Listing Installed Packages")
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        result = subprocess.check_output([adb_path, 'shell', 'pm', 'list', 'packages']).decode()
-        print(result)
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the Shell and Command Execution menu...")
-
-def uninstall_package():
-    clear_screen()
-    print("Uninstall a Package")
-    package_name = input("Enter the package name to uninstall: ").strip()
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'shell', 'pm', 'uninstall', package_name], check=True)
-        print(f"Package {package_name} has been uninstalled.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the Shell and Command Execution menu...")
-
-def screen_management():
-    while True:
-        clear_screen()
-        display_banner()
-        print("Screen Management")
-        menu = """
-[1] Take a screenshot of the device screen.
-[2] Record the screen to a video file.
-[3] Get or set the screen resolution.
-[4] Get or set the screen density.
-[0] Return to the main menu.
-        """
-        print(menu)
-        choice = input("Select an option: ").strip()
-
-        if choice == "1":
-            take_screenshot()
-        elif choice == "2":
-            record_screen()
-        elif choice == "3":
-            manage_screen_resolution()
-        elif choice == "4":
-            manage_screen_density()
-        elif choice == "0":
-            break
-        else:
-            print("Invalid option, please select again.")
-
-def take_screenshot():
-    clear_screen()
-    print("Taking a Screenshot")
-    filename = input("Enter the filename to save the screenshot: ").strip()
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'shell', 'screencap', '/sdcard/' + filename], check=True)
-        subprocess.run([adb_path, 'pull', '/sdcard/' + filename, filename], check=True)
-        print(f"Screenshot saved as {filename}.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the Screen Management menu...")
-
-def record_screen():
-    clear_screen()
-    print("Recording the Screen")
-    filename = input("Enter the filename to save the video: ").strip()
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'shell', 'screenrecord', '/sdcard/' + filename], check=True)
-        subprocess.run([adb_path, 'pull', '/sdcard/' + filename, filename], check=True)
-        print(f"Screen recording saved as {filename}.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the Screen Management menu...")
-
-def manage_screen_resolution():
-    clear_screen()
-    print("Get or Set Screen Resolution")
-    action = input("Enter 'get' to get the resolution or 'set' to set a new resolution: ").strip().lower()
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    if action == 'get':
-        try:
-            result = subprocess.check_output([adb_path, 'shell', 'wm', 'size']).decode()
-            print(result)
-        except subprocess.CalledProcessError as e:
-            print(f"Error occurred: {e}")
-    elif action == 'set':
-        new_resolution = input("Enter the new resolution (e.g., 1080x1920): ").strip()
-        try:
-            subprocess.run([adb_path, 'shell', 'wm', 'size', new_resolution], check=True)
-            print(f"Screen resolution set to {new_resolution}.")
-        except subprocess.CalledProcessError as e:
-            print(f"Error occurred: {e}")
-    else:
-        print("Invalid option.")
-    input("\nPress Enter to return to the Screen Management menu...")
-
-def manage_screen_density():
-    clear_screen()
-    print("Get or Set Screen Density")
-    action = input("Enter 'get' to get the density or 'set' to set a new density: ").strip().lower()
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    if action == 'get':
-        try:
-            result = subprocess.check_output([adb_path, 'shell', 'wm', 'density']).decode()
-            print(result)
-        except subprocess.CalledProcessError as e:
-            print(f"Error occurred: {e}")
-    elif action == 'set':
-        new_density = input("Enter the new density (e.g., 320): ").strip()
-        try:
-            subprocess.run([adb_path, 'shell', 'wm', 'density', new_density], check=True)
-            print(f"Screen density set to {new_density}.")
-        except subprocess.CalledProcessError as e:
-            print(f"Error occurred: {e}")
-    else:
-        print("Invalid option.")
-    input("\nPress Enter to return to the Screen Management menu...")
-
-def network_management():
-    while True:
-        clear_screen()
-        display_banner()
-        print("Network Management")
-        menu = """
-[1] Forward a local port to a remote port on the device.
-[2] Forward a remote port to a local port.
-[3] Display network interface configurations.
-[4] Enable or disable airplane mode.
-[5] Enable or disable Wi-Fi.
-[0] Return to the main menu.
-        """
-        print(menu)
-        choice = input("Select an option: ").strip()
-
-        if choice == "1":
-            forward_local_to_remote()
-        elif choice == "2":
-            forward_remote_to_local()
-        elif choice == "3":
-            display_network_configurations()
-        elif choice == "4":
-            toggle_airplane_mode()
-        elif choice == "5":
-            toggle_wifi()
-        elif choice == "0":
-            break
-        else:
-            print("Invalid option, please select again.")
-
-def forward_local_to_remote():
-    clear_screen()
-    print("Forwarding Local Port to Remote Port")
-    local_port = input("Enter the local port: ").strip()
-    remote_port = input("Enter the remote port: ").strip()
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'forward', f'tcp:{local_port}', f'tcp:{remote_port}'], check=True)
-        print(f"Local port {local_port} forwarded to remote port {remote_port}.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the Network Management menu...")
-
-def forward_remote_to_local():
-    clear_screen()
-    print("Forwarding Remote Port to Local Port")
-    remote_port = input("Enter the remote port: ").strip()
-    local_port = input("Enter the local port: ").strip()
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'reverse', f'tcp:{remote_port}', f'tcp:{local_port}'], check=True)
-        print(f"Remote port {remote_port} forwarded to local port {local_port}.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the Network Management menu...")
-
-def display_network_configurations():
-    clear_screen()
-    print("Displaying Network Interface Configurations")
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        result = subprocess.check_output([adb_path, 'shell', 'netcfg']).decode()
-        print(result)
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the Network Management menu...")
-
-def toggle_airplane_mode():
-    clear_screen()
-    print("Toggle Airplane Mode")
-    action = input("Enter 'enable' to enable or 'disable' to disable airplane mode: ").strip().lower()
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    if action == 'enable':
-        try:
-            subprocess.run([adb_path, 'shell', 'settings', 'put', 'global', 'airplane_mode_on', '1'], check=True)
-            print("Airplane mode enabled.")
-        except subprocess.CalledProcessError as e:
-            print(f"Error occurred: {e}")
-    elif action == 'disable':
-        try:
-            subprocess.run([adb_path, 'shell', 'settings', 'put', 'global', 'airplane_mode_on', '0'], check=True)
-            print("Airplane mode disabled.")
-        except subprocess.CalledProcessError as e:
-            print(f"Error occurred: {e}")
-    else:
-        print("Invalid option.")
-    input("\nPress Enter to return to the Network Management menu...")
-
-def toggle_wifi():
-    clear_screen()
-    print("Toggle Wi-Fi")
-    action = input("Enter 'enable' to enable or 'disable' to disable Wi-Fi: ").strip().lower()
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    if action == 'enable':
-        try:
-            subprocess.run([adb_path, 'shell', 'svc', 'wifi', 'enable'], check=True)
-            print("Wi-Fi enabled.")
-        except subprocess.CalledProcessError as e:
-            print(f"Error occurred: {e}")
-    elif action == 'disable':
-        try:
-            subprocess.run([adb_path, 'shell', 'svc', 'wifi', 'disable'], check=True)
-            print("Wi-Fi disabled.")
-        except subprocess.CalledProcessError as e:
-            print(f"Error occurred: {e}")
-    else:
-        print("Invalid option.")
-    input("\nPress Enter to return to the Network Management menu...")
-
-def data_management():
-    while True:
-        clear_screen()
-        display_banner()
-        print("Data Management")
-        menu = """
-[1] Create a full backup of the device.
-[2] Restore a backup to the device.
-[3] Clear app data for a specified package.
-[0] Return to the main menu.
-        """
-        print(menu)
-        choice = input("Select an option: ").strip()
-
-        if choice == "1":
-            create_backup()
-        elif choice == "2":
-            restore_backup()
-        elif choice == "3":
-            clear_app_data()
-        elif choice == "0":
-            break
-        else:
-            print("Invalid option, please select again.")
-
-def create_backup():
-    clear_screen()
-    print("Creating a Full Backup")
-    filename = input("Enter the filename to save the backup: ").strip()
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'backup', '-f', filename, '-apk', '-shared', '-all'], check=True)
-        print(f"Backup saved as {filename}.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the Data Management menu...")
-
-def restore_backup():
-    clear_screen()
-    print("Restoring a Backup")
-    filename = input("Enter the filename of the backup to restore: ").strip()
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'restore', filename], check=True)
-        print(f"Backup {filename} restored.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the Data Management menu...")
-
-def clear_app_data():
-    clear_screen()
-    print("Clearing App Data")
-    package_name = input("Enter the package name of the app to clear data for: ").strip()
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'shell', 'am', 'clear', package_name], check=True)
-        print(f"App data for {package_name} cleared.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the Data Management menu...")
-
-def development_testing():
-    while True:
-        clear_screen()
-        display_banner()
-        print("Development and Testing")
-        menu = """
-[1] Run a stress test using monkey.
-[2] Start an activity.
-[3] Simulate user input.
-[4] Manage device settings.
-[0] Return to the main menu.
-        """
-        print(menu)
-        choice = input("Select an option: ").strip()
-
-        if choice == "1":
-            run_monkey_test()
-        elif choice == "2":
-            start_activity()
-        elif choice == "3":
-            simulate_user_input()
-        elif choice == "4":
-            manage_device_settings()
-        elif choice == "0":
-            break
-        else:
-            print("Invalid option, please select again.")
-
-def run_monkey_test():
-    clear_screen()
-    print("Running Monkey Stress Test")
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'shell', 'monkey', '-v', '500'], check=True)
-        print("Monkey test completed.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the Development and Testing menu...")
-
-def start_activity():
-    clear_screen()
-    print("Starting Activity")
-    component = input("Enter the component name (e.g., com.example/.MainActivity): ").strip()
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'shell', 'am', 'start', '-n', component], check=True)
-        print(f"Activity {component} started.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the Development and Testing menu...")
-
-def simulate_user_input():
-    clear_screen()
-    print("Simulating User Input")
-    command = input("Enter the input command (e.g., tap, swipe, text): ").strip()
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'shell', 'input', command], check=True)
-        print(f"Simulated input command: {command}.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the Development and Testing menu...")
-
-def manage_device_settings():
-    clear_screen()
-    print("Managing Device Settings")
-    command = input("Enter the settings command (e.g., settings put global <key> <value>): ").strip()
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'shell', 'settings'] + command.split(), check=True)
-        print(f"Executed settings command: {command}.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the Development and Testing menu...")
-
-def root_access_permissions():
-    while True:
-        clear_screen()
-        display_banner()
-        print("Root Access and File Permissions")
-        menu = """
-[1] Restart adbd daemon with root privileges.
-[2] Restart adbd daemon without root privileges.
-[3] Remount the system partitions as writable.
-[4] Change file permissions.
-[0] Return to the main menu.
-        """
-        print(menu)
-        choice = input("Select an option: ").strip()
-
-        if choice == "1":
-            restart_adbd_root()
-        elif choice == "2":
-            restart_adbd_unroot()
-        elif choice == "3":
-            remount_system_partitions()
-        elif choice == "4":
-            change_file_permissions()
-        elif choice == "0":
-            break
-        else:
-            print("Invalid option, please select again.")
-
-def restart_adbd_root():
-    clear_screen()
-    print("Restarting adbd with root privileges")
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'root'], check=True)
-        print("adbd daemon restarted with root privileges.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the Root Access and File Permissions menu...")
-
-def restart_adbd_unroot():
-    clear_screen()
-    print("Restarting adbd without root privileges")
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'unroot'], check=True)
-        print("adbd daemon restarted without root privileges.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the Root Access and File Permissions menu...")
-
-def remount_system_partitions():
-    clear_screen()
-    print("Remounting system partitions as writable")
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'remount'], check=True)
-        print("System partitions remounted as writable.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the Root Access and File Permissions menu...")
-
-def change_file_permissions():
-    clear_screen()
-    print("Changing File Permissions")
-    file_path = input("Enter the file path on the device: ").strip()
-    permissions = input("Enter the new permissions (e.g., 755): ").strip()
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'shell', 'chmod', permissions, file_path], check=True)
-        print(f"Permissions for {file_path} changed to {permissions}.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the Root Access and File Permissions menu...")
-
-def remote_control():
-    while True:
-        clear_screen()
-        display_banner()
-        print("Remote Control")
-        menu = """
-[1] Send a key event.
-[2] Simulate a tap at specified coordinates.
-[3] Simulate a swipe.
-[0] Return to the main menu.
-        """
-        print(menu)
-        choice = input("Select an option: ").strip()
-
-        if choice == "1":
-            send_key_event()
-        elif choice == "2":
-            simulate_tap()
-        elif choice == "3":
-            simulate_swipe()
-        elif choice == "0":
-            break
-        else:
-            print("Invalid option, please select again.")
-
-def send_key_event():
-    clear_screen()
-    print("Sending Key Event")
-    keycode = input("Enter the keycode (e.g., 3 for Home, 4 for Back): ").strip()
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'shell', 'input', 'keyevent', keycode], check=True)
-        print(f"Key event {keycode} sent.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the Remote Control menu...")
-
-def simulate_tap():
-    clear_screen()
-    print("Simulating Tap")
-    x = input("Enter the x-coordinate: ").strip()
-    y = input("Enter the y-coordinate: ").strip()
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'shell', 'input', 'tap', x, y], check=True)
-        print(f"Tap simulated at coordinates ({x}, {y}).")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the Remote Control menu...")
-
-def simulate_swipe():
-    clear_screen()
-    print("Simulating Swipe")
-    x1 = input("Enter the start x-coordinate: ").strip()
-    y1 = input("Enter the start y-coordinate: ").strip()
-    x2 = input("Enter the end x-coordinate: ").strip()
-    y2 = input("Enter the end y-coordinate: ").strip()
-    duration = input("Enter the swipe duration in milliseconds: ").strip()
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'shell', 'input', 'swipe', x1, y1, x2, y2, duration], check=True)
-        print(f"Swipe simulated from ({x1}, {y1}) to ({x2}, {y2}) over {duration} ms.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the Remote Control menu...")
-
-def power_management():
-    while True:
-        clear_screen()
-        display_banner()
-        print("Power Management")
-        menu = """
-[1] Reboot the device.
-[2] Reboot the device into bootloader.
-[3] Reboot the device into recovery mode.
-[4] Power off the device.
-[0] Return to the main menu.
-        """
-        print(menu)
-        choice = input("Select an option: ").strip()
-
-        if choice == "1":
-            reboot_device()
-        elif choice == "2":
-            reboot_bootloader()
-        elif choice == "3":
-            reboot_recovery()
-        elif choice == "4":
-            power_off_device()
-        elif choice == "0":
-            break
-        else:
-            print("Invalid option, please select again.")
-
-def reboot_device():
-    clear_screen()
-    print("Rebooting Device")
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'reboot'], check=True)
-        print("Device is rebooting.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the Power Management menu...")
-
-def reboot_bootloader():
-    clear_screen()
-    print("Rebooting Device into Bootloader")
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'reboot', 'bootloader'], check=True)
-        print("Device is rebooting into bootloader.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the Power Management menu...")
-
-def reboot_recovery():
-    clear_screen()
-    print("Rebooting Device into Recovery Mode")
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'reboot', 'recovery'], check=True)
-        print("Device is rebooting into recovery mode.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the Power Management menu...")
-
-def power_off_device():
-    clear_screen()
-    print("Powering Off Device")
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'shell', 'reboot', '-p'], check=True)
-        print("Device is powering off.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the Power Management menu...")
-
-def permissions_security():
-    while True:
-        clear_screen()
-        display_banner()
-        print("Permissions and Security")
-        menu = """
-[1] Grant a specific permission to an app.
-[2] Revoke a specific permission from an app.
-[3] Manage device policies.
-[0] Return to the main menu.
-        """
-        print(menu)
-        choice = input("Select an option: ").strip()
-
-        if choice == "1":
-            grant_permission()
-        elif choice == "2":
-            revoke_permission()
-        elif choice == "3":
-            manage_device_policies()
-        elif choice == "0":
-            break
-        else:
-            print("Invalid option, please select again.")
-
-def grant_permission():
-    clear_screen()
-    print("Granting Permission")
-    package = input("Enter the package name: ").strip()
-    permission = input("Enter the permission (e.g., android.permission.CAMERA): ").strip()
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'shell', 'pm', 'grant', package, permission], check=True)
-        print(f"Permission {permission} granted to {package}.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the Permissions and Security menu...")
-
-def revoke_permission():
-    clear_screen()
-    print("Revoking Permission")
-    package = input("Enter the package name: ").strip()
-    permission = input("Enter the permission (e.g., android.permission.CAMERA): ").strip()
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'shell', 'pm', 'revoke', package, permission], check=True)
-        print(f"Permission {permission} revoked from {package}.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the Permissions and Security menu...")
-
-def manage_device_policies():
-    clear_screen()
-    print("Managing Device Policies")
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        # Attempt to run the device policy manager command
-        result = subprocess.run([adb_path, 'shell', 'device_policy_manager'], capture_output=True, text=True, check=True)
-        print(result.stdout)
-    except subprocess.CalledProcessError as e:
-        # Specific handling for command not found or inaccessible
-        if 'not found' in e.stderr or 'inaccessible' in e.stderr:
-            print("The 'device_policy_manager' command is not available on this device.")
-            print("Possible reasons:")
-            print("- The device may not support this command.")
-            print("- The device may need to be rooted to access this feature.")
-            print("- The command may require a different syntax or different device policies.")
-        else:
-            print(f"Error occurred: {e}")
-    except FileNotFoundError:
-        print("ADB binary not found.")
-    except Exception as e:
-        print(f"An unexpected error occurred: {e}")
-    input("\nPress Enter to return to the Permissions and Security menu...")
-
-
-
-
-def battery_management():
-    while True:
-        clear_screen()
-        display_banner()
-        print("Battery Management")
-        menu = """
-[1] Dump the current battery status.
-[2] Set the battery level (useful for testing).
-[3] Reset the battery status.
-[0] Return to the main menu.
-        """
-        print(menu)
-        choice = input("Select an option: ").strip()
-
-        if choice == "1":
-            dump_battery_status()
-        elif choice == "2":
-            set_battery_level()
-        elif choice == "3":
-            reset_battery_status()
-        elif choice == "0":
-            break
-        else:
-            print("Invalid option, please select again.")
-
-def dump_battery_status():
-    clear_screen()
-    print("Dumping Battery Status")
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        result = subprocess.run([adb_path, 'shell', 'dumpsys', 'battery'], capture_output=True, text=True, check=True)
-        print(result.stdout)
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the Battery Management menu...")
-
-def set_battery_level():
-    clear_screen()
-    print("Setting Battery Level")
-    level = input("Enter the battery level (e.g., 50): ").strip()
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'shell', 'dumpsys', 'battery', 'set', 'level', level], check=True)
-        print(f"Battery level set to {level}.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the Battery Management menu...")
-
-def reset_battery_status():
-    clear_screen()
-    print("Resetting Battery Status")
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'shell', 'dumpsys', 'battery', 'reset'], check=True)
-        print("Battery status reset.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the Battery Management menu...")
-
-def advanced_usage():
-    while True:
-        clear_screen()
-        display_banner()
-        print("Advanced Usage")
-        menu = """
-[1] Wait for device connection.
-[2] Enter superuser mode.
-[3] Get device properties.
-[4] Set device properties.
-[0] Return to the main menu.
-        """
-        print(menu)
-        choice = input("Select an option: ").strip()
-
-        if choice == "1":
-            wait_for_device()
-        elif choice == "2":
-            enter_superuser_mode()
-        elif choice == "3":
-            get_device_properties()
-        elif choice == "4":
-            set_device_properties()
-        elif choice == "0":
-            break
-        else:
-            print("Invalid option, please select again.")
-
-def wait_for_device():
-    clear_screen()
-    print("Waiting for Device Connection")
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'wait-for-device'], check=True)
-        print("Device is now connected.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the Advanced Usage menu...")
-
-def enter_superuser_mode():
-    clear_screen()
-    print("Entering Superuser Mode")
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'shell', 'su'], check=True)
-        print("Entered superuser mode.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the Advanced Usage menu...")
-
-def get_device_properties():
-    clear_screen()
-    print("Getting Device Properties")
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        result = subprocess.run([adb_path, 'shell', 'getprop'], capture_output=True, text=True, check=True)
-        print(result.stdout)
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the Advanced Usage menu...")
-
-def set_device_properties():
-    clear_screen()
-    print("Setting Device Properties")
-    prop_name = input("Enter the property name (e.g., sys.debuggable): ").strip()
-    prop_value = input("Enter the property value: ").strip()
-    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
-    adb_path = os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
-    try:
-        subprocess.run([adb_path, 'shell', 'setprop', prop_name, prop_value], check=True)
-        print(f"Property {prop_name} set to {prop_value}.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error occurred: {e}")
-    input("\nPress Enter to return to the Advanced Usage menu...")
-
-
-def exit_program():
-    clear_screen()
-    print("Exiting EasyADB.")
-    sys.exit()
-
-# Main function
-def main():
-    display_banner()
-    list_adb_devices()
-
-    while True:
-        display_menu()
-        choice = input("Select an option: ").strip()
-        if choice == "1":
-            device_management()
-        elif choice == "2":
-            app_management()
-        elif choice == "3":
-            file_management()
-        elif choice == "4":
-            system_management()
-        elif choice == "5":
-            shell_and_command_execution()
-        elif choice == "6":
-            screen_management()
-        elif choice == "7":
-            network_management()
-        elif choice == "8":
-            data_management()
-        elif choice == "9":
-            development_testing()
-        elif choice == "10":
-            root_access_permissions()
-        elif choice == "11":
-            remote_control()
-        elif choice == "12":
-            power_management()
-        elif choice == "13":
-            permissions_security()
-        elif choice == "14":
-            battery_management()
-        elif choice == "15":
-            advanced_usage()
-        elif choice == "0":
-            exit_program()
-        else:
-            print("Invalid option, please select again.")
-
-if __name__ == "__main__":
+import os
+import json
+import gzip
+import hashlib
+import zlib
+import re
+import bisect
+import contextlib
+import io
+import ipaddress
+import zipfile
+import argparse
+import asyncio
+import subprocess
+import sys
+import platform
+import time
+import socket
+import struct
+import stat
+import shlex
+import select
+import statistics
+import posixpath
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import uuid
+from collections import namedtuple, deque, Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+
+try:
+    import readline
+except ImportError:
+    readline = None
+
+try:
+    import tomllib
+except ImportError:
+    tomllib = None
+
+PLATFORM_TOOLS_PATH = r"platform-tools"
+
+ADB_SERVER_HOST = os.environ.get('ANDROID_ADB_SERVER_ADDRESS', '127.0.0.1')
+ADB_SERVER_PORT = int(os.environ.get('ANDROID_ADB_SERVER_PORT', '5037'))
+SYNC_DATA_MAX = 64 * 1024
+SHELL_EXIT_MARKER = ':EASYADB_EXIT:'
+SHELL_SESSIONS_PER_DEVICE = 4
+SHELL_SESSION_IDLE_CHECK = 30
+SHELL_SESSION_TIMEOUT = 120
+TRACKER_RECONNECT_DELAY = 1
+TRACKER_START_TIMEOUT = 10
+LATENCY_BUCKETS = [0.0001 * 2 ** power for power in range(22)]
+TRACE_EVENT_LIMIT = 500000
+DEVICE_PROBE_WORKERS = 16
+DEVICE_PROBE_TIMEOUT = 5
+EASYADB_HOME = os.path.join(os.path.expanduser('~'), '.easyadb')
+PROFILE_CACHE_PATH = os.path.join(EASYADB_HOME, 'device_profiles.json')
+PROFILE_TTL = 6 * 60 * 60
+PACKAGE_INDEX_DIR = os.path.join(EASYADB_HOME, 'packages')
+PACKAGE_INDEX_TTL = 5 * 60
+PACKAGE_MATCHES_SHOWN = 20
+FILE_INDEX_DIR = os.path.join(EASYADB_HOME, 'files')
+FILE_INDEX_TTL = 5 * 60
+FILE_MATCHES_SHOWN = 40
+DUMPSYS_TTL = 15
+INSTALLS_PER_HUB = 4
+APK_CACHE_DIR = os.path.join(EASYADB_HOME, 'apks')
+APK_CACHE_KEEP = 3
+ANDROID_ATTR_VERSION_CODE = 0x0101021b
+JOB_MAX_PARALLEL = 8
+JOB_MAX_PER_DEVICE = 1
+LOG_ROTATE_BYTES = 64 * 1024 * 1024
+LOG_ROTATE_SECONDS = 60 * 60
+LOG_KEEP_FILES = 48
+LOG_RECONNECT_DELAY = 5
+LOG_PRIORITIES = '??VDIWEFS'
+MONITOR_INTERVAL = 15
+MONITOR_HISTORY = 240
+MONITOR_PORT = 9137
+BUGREPORT_SECTION_PREVIEW = 200
+BACKUP_BLOCK_BYTES = 1024 * 1024
+BACKUP_COMPRESS_WORKERS = os.cpu_count() or 2
+BACKUP_COMPRESS_LEVEL = 6
+TAR_BLOCK = 512
+SHELL_BATCH_ARGS = 200
+BURST_WORKERS = 2
+FRAMEBUFFER_BYTES_PER_PIXEL = {1: 4, 2: 4, 3: 3}
+SCREENRECORD_TIME_LIMIT = 180
+FORWARD_WARM_STREAMS = 2
+FORWARD_LATENCY_SAMPLES = 200
+FORWARD_STATS_INTERVAL = 1
+WIFI_DEFAULT_PORT = 5555
+WIFI_MAX_TARGETS = 4096
+WIFI_PROBE_CONCURRENCY = 256
+WIFI_PROBE_TIMEOUT = 0.5
+WIFI_CONNECT_PARALLEL = 16
+WIFI_CONNECT_ATTEMPTS = 5
+WIFI_BACKOFF_BASE = 1
+WIFI_BACKOFF_MAX = 30
+
+ShellResult = namedtuple('ShellResult', ['exit_code', 'stdout', 'stderr'])
+Framebuffer = namedtuple('Framebuffer', ['width', 'height', 'format', 'pixels'])
+RemoteFile = namedtuple('RemoteFile', ['path', 'mode', 'size', 'mtime'])
+PackageInfo = namedtuple('PackageInfo', ['name', 'path', 'uid', 'version_code', 'installer', 'enabled', 'system'])
+LogEntry = namedtuple('LogEntry', ['seconds', 'nanoseconds', 'pid', 'tid', 'priority', 'tag', 'message'])
+
+def get_adb_path():
+    adb_binary = 'adb' if platform.system() != 'Windows' else 'adb.exe'
+    return os.path.join(PLATFORM_TOOLS_PATH, adb_binary)
+
+def run_adb_command(command):
+    try:
+        result = subprocess.check_output([os.path.join(PLATFORM_TOOLS_PATH, 'adb'), command]).decode()
+        return result
+    except subprocess.CalledProcessError:
+        return None
+
+def open_apk(apk_path, contents=None):
+    # Multi-device installs read each APK once and share the bytes.
+    if contents is not None and apk_path in contents:
+        return io.BytesIO(contents[apk_path])
+    return open(apk_path, 'rb')
+
+def format_shell_command(command):
+    if isinstance(command, str):
+        return command
+    return ' '.join(shlex.quote(str(arg)) for arg in command)
+
+
+def parse_device_list(text):
+    # Parses `devices -l` output: serial, state, then key:value details.
+    devices = []
+    for line in text.splitlines():
+        fields = line.split()
+        if len(fields) < 2:
+            continue
+        device = {'serial': fields[0], 'state': fields[1]}
+        for field in fields[2:]:
+            key, _, value = field.partition(':')
+            device[key] = value
+        devices.append(device)
+    return devices
+
+
+class AdbError(Exception):
+    pass
+
+
+class ShellSessionError(AdbError):
+    # A pooled shell failed. results holds the commands of the batch that
+    # completed; written says whether any of the batch reached the device,
+    # in which case the rest may or may not have run.
+    def __init__(self, message, results=(), written=True):
+        super().__init__(message)
+        self.results = list(results)
+        self.written = written
+
+
+def operation_name(request):
+    # Collapses a service request into a low-cardinality name for stats:
+    # "host:forward:tcp:1:tcp:2" -> "host:forward", "shell,v2,raw:ls -l" -> "shell ls".
+    service, _, argument = request.partition(':')
+    if service == 'host':
+        return 'host:' + argument.split(':')[0]
+    if service.startswith('shell') or service in ('exec', 'pool'):
+        words = argument.split()
+        return f"{service.split(',')[0]} {posixpath.basename(words[0]) if words else ''}".rstrip()
+    if service == 'reverse':
+        return 'reverse:' + argument.split(':')[0]
+    return service
+
+
+class Instrumentation:
+    # Every adb call reports here: latency histograms and byte counts per
+    # operation, totals per device, and, while tracing, one trace event per
+    # call. Recording is a dict update under a lock, cheap enough to leave on.
+    def __init__(self, trace_limit=TRACE_EVENT_LIMIT):
+        self.origin = time.perf_counter()
+        self.tracing = False
+        self.events = deque(maxlen=trace_limit)
+        self.operations = {}
+        self.devices = {}
+        self._lock = threading.Lock()
+
+    def record(self, operation, serial, start, duration, sent=0, received=0, status=0):
+        failed = status not in (0, None)
+        with self._lock:
+            stats = self.operations.get(operation)
+            if stats is None:
+                stats = self.operations[operation] = {'count': 0, 'total': 0.0, 'max': 0.0, 'failures': 0,
+                                                      'sent': 0, 'received': 0,
+                                                      'buckets': [0] * (len(LATENCY_BUCKETS) + 1)}
+            stats['count'] += 1
+            stats['total'] += duration
+            stats['max'] = max(stats['max'], duration)
+            stats['failures'] += failed
+            stats['sent'] += sent
+            stats['received'] += received
+            stats['buckets'][bisect.bisect_left(LATENCY_BUCKETS, duration)] += 1
+            device = self.devices.setdefault(serial or 'default', {'count': 0, 'total': 0.0, 'failures': 0})
+            device['count'] += 1
+            device['total'] += duration
+            device['failures'] += failed
+            if self.tracing:
+                self.events.append((operation, serial, start, duration, sent, received, status,
+                                    threading.get_ident()))
+
+    @contextlib.contextmanager
+    def span(self, operation, serial=None):
+        # For work that is not a socket call, e.g. the adb binary for interactive shells.
+        start = time.perf_counter()
+        status = 'error'
+        try:
+            yield
+            status = 0
+        finally:
+            self.record(operation, serial, start, time.perf_counter() - start, status=status)
+
+    def percentile(self, stats, fraction):
+        # Upper bound of the histogram bucket holding the requested rank.
+        rank = stats['count'] * fraction
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS + [stats['max']], stats['buckets']):
+            seen += count
+            if seen >= rank:
+                return min(bound, stats['max'])
+        return stats['max']
+
+    def summary(self):
+        with self._lock:
+            operations = {name: dict(stats) for name, stats in self.operations.items()}
+            devices = {serial: dict(stats) for serial, stats in self.devices.items()}
+        lines = [f"{'Operation':<28}{'Calls':>7}{'Fail':>6}{'Mean ms':>10}{'p50 ms':>9}{'p90 ms':>9}"
+                 f"{'p99 ms':>9}{'Max ms':>9}{'Sent KB':>10}{'Recv KB':>10}"]
+        for name, stats in sorted(operations.items(), key=lambda item: -item[1]['total']):
+            lines.append(f"{name[:27]:<28}{stats['count']:>7}{stats['failures']:>6}"
+                         f"{stats['total'] / stats['count'] * 1000:>10.1f}"
+                         f"{self.percentile(stats, 0.5) * 1000:>9.1f}{self.percentile(stats, 0.9) * 1000:>9.1f}"
+                         f"{self.percentile(stats, 0.99) * 1000:>9.1f}{stats['max'] * 1000:>9.1f}"
+                         f"{stats['sent'] / 1024:>10.1f}{stats['received'] / 1024:>10.1f}")
+        lines.append(f"\n{'Device':<28}{'Calls':>7}{'Fail':>6}{'Mean ms':>10}{'Total s':>10}")
+        for serial, stats in sorted(devices.items(), key=lambda item: -item[1]['total']):
+            lines.append(f"{serial[:27]:<28}{stats['count']:>7}{stats['failures']:>6}"
+                         f"{stats['total'] / stats['count'] * 1000:>10.1f}{stats['total']:>10.2f}")
+        return '\n'.join(lines)
+
+    def export_trace(self, path):
+        # Chrome trace-event format (chrome://tracing, Perfetto): one process
+        # row per device, one thread row per host thread.
+        with self._lock:
+            events = list(self.events)
+        serials = sorted({event[1] or 'default' for event in events})
+        pids = {serial: number for number, serial in enumerate(serials, 1)}
+        trace = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'args': {'name': serial}}
+                 for serial, pid in pids.items()]
+        for operation, serial, start, duration, sent, received, status, thread in events:
+            trace.append({'name': operation, 'cat': 'adb', 'ph': 'X', 'pid': pids[serial or 'default'],
+                          'tid': thread, 'ts': round((start - self.origin) * 1e6, 1),
+                          'dur': round(duration * 1e6, 1),
+                          'args': {'sent': sent, 'received': received, 'status': status}})
+        with open(path, 'w') as trace_file:
+            json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms'}, trace_file)
+        return len(events)
+
+
+class AdbConnection:
+    # One socket to the adb server, speaking the smart-socket host protocol.
+    # When instrumented, the whole life of the socket is one recorded call.
+    def __init__(self, sock, instrumentation=None):
+        self.sock = sock
+        self.instrumentation = instrumentation
+        self.operation = None
+        self.serial = None
+        self.status = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.started = time.perf_counter()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is not None and self.status == 0:
+            self.status = 'error'
+        self.close()
+
+    def close(self):
+        if self.instrumentation and self.operation:
+            self.instrumentation.record(self.operation, self.serial, self.started,
+                                        time.perf_counter() - self.started,
+                                        self.bytes_sent, self.bytes_received, self.status)
+            self.operation = None
+        # shutdown() first so a recv() blocked in another thread returns immediately.
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+    def send_request(self, request):
+        data = request.encode()
+        self.sock.sendall(b'%04x' % len(data) + data)
+        if request.startswith('host-serial:'):
+            # The serial may itself contain a colon (host:port).
+            parts = request.split(':')[1:]
+            length = 2 if len(parts) > 2 and parts[1].isdigit() else 1
+            self.serial = ':'.join(parts[:length])
+            request = 'host:' + ':'.join(parts[length:])
+        self.operation = operation_name(request)
+        self.bytes_sent += len(data) + 4
+
+    def send(self, data):
+        self.sock.sendall(data)
+        self.bytes_sent += len(data)
+
+    def shutdown_write(self):
+        try:
+            self.sock.shutdown(socket.SHUT_WR)
+        except OSError:
+            pass
+
+    def read_exactly(self, size):
+        chunks = []
+        while size:
+            chunk = self.sock.recv(min(size, SYNC_DATA_MAX))
+            if not chunk:
+                raise AdbError("Connection closed by the adb server.")
+            chunks.append(chunk)
+            size -= len(chunk)
+            self.bytes_received += len(chunk)
+        return b''.join(chunks)
+
+    def read_status(self):
+        status = self.read_exactly(4)
+        if status == b'OKAY':
+            return
+        if status == b'FAIL':
+            self.status = 'FAIL'
+            raise AdbError(self.read_string())
+        raise AdbError(f"Unexpected response from the adb server: {status!r}")
+
+    def read_string(self):
+        length = int(self.read_exactly(4), 16)
+        return self.read_exactly(length).decode(errors='replace')
+
+    def iter_chunks(self, size=SYNC_DATA_MAX):
+        while True:
+            chunk = self.sock.recv(size)
+            if not chunk:
+                return
+            self.bytes_received += len(chunk)
+            yield chunk
+
+    def read_all(self):
+        return b''.join(self.iter_chunks())
+
+
+class AdbSyncConnection:
+    # File transfer over the sync: service (STAT/LIST/SEND/RECV).
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        try:
+            self.conn.send(b'QUIT' + struct.pack('<I', 0))
+        except OSError:
+            pass
+        self.conn.close()
+
+    def _send_packet(self, packet_id, data):
+        self.conn.send(packet_id + struct.pack('<I', len(data)) + data)
+
+    def _read_failure(self, length):
+        return AdbError(self.conn.read_exactly(length).decode(errors='replace'))
+
+    def stat(self, path):
+        self._send_packet(b'STAT', path.encode())
+        reply = self.conn.read_exactly(16)
+        if reply[:4] != b'STAT':
+            raise AdbError(f"Unexpected sync response: {reply[:4]!r}")
+        return struct.unpack('<III', reply[4:])
+
+    def list(self, path):
+        self._send_packet(b'LIST', path.encode())
+        entries = []
+        while True:
+            reply = self.conn.read_exactly(20)
+            packet_id = reply[:4]
+            if packet_id == b'DONE':
+                return entries
+            if packet_id == b'FAIL':
+                raise self._read_failure(struct.unpack('<I', reply[4:8])[0])
+            if packet_id != b'DENT':
+                raise AdbError(f"Unexpected sync response: {packet_id!r}")
+            mode, size, mtime, name_length = struct.unpack('<IIII', reply[4:])
+            name = self.conn.read_exactly(name_length).decode(errors='replace')
+            if name not in ('.', '..'):
+                entries.append((name, mode, size, mtime))
+
+    def push_stream(self, stream, remote_path, mode=0o644, mtime=None):
+        self._send_packet(b'SEND', f"{remote_path},{stat.S_IFREG | (mode & 0o777)}".encode())
+        sent = 0
+        while True:
+            data = stream.read(SYNC_DATA_MAX)
+            if not data:
+                break
+            self._send_packet(b'DATA', data)
+            sent += len(data)
+        self.conn.send(b'DONE' + struct.pack('<I', int(mtime if mtime is not None else time.time())))
+        reply = self.conn.read_exactly(8)
+        if reply[:4] == b'FAIL':
+            raise self._read_failure(struct.unpack('<I', reply[4:])[0])
+        if reply[:4] != b'OKAY':
+            raise AdbError(f"Unexpected sync response: {reply[:4]!r}")
+        return sent
+
+    def push(self, local_path, remote_path):
+        local_stat = os.stat(local_path)
+        with open(local_path, 'rb') as local_file:
+            return self.push_stream(local_file, remote_path, local_stat.st_mode, local_stat.st_mtime)
+
+    def pull_stream(self, remote_path, stream):
+        self._send_packet(b'RECV', remote_path.encode())
+        received = 0
+        while True:
+            reply = self.conn.read_exactly(8)
+            packet_id = reply[:4]
+            length = struct.unpack('<I', reply[4:])[0]
+            if packet_id == b'DONE':
+                return received
+            if packet_id == b'FAIL':
+                raise self._read_failure(length)
+            if packet_id != b'DATA':
+                raise AdbError(f"Unexpected sync response: {packet_id!r}")
+            stream.write(self.conn.read_exactly(length))
+            received += length
+
+    def pull(self, remote_path, local_path):
+        with open(local_path, 'wb') as local_file:
+            return self.pull_stream(remote_path, local_file)
+
+
+class AdbClient:
+    # In-process client for the adb server on localhost:5037. Every menu
+    # action goes through here instead of forking the adb binary.
+    def __init__(self, host=ADB_SERVER_HOST, port=ADB_SERVER_PORT, timeout=None, instrumentation=None):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.instrumentation = instrumentation
+        self._features = {}
+
+    def start_server(self):
+        try:
+            with self.instrumentation.span('adb start-server') if self.instrumentation else contextlib.nullcontext():
+                subprocess.run([get_adb_path(), 'start-server'], capture_output=True, check=True)
+        except FileNotFoundError:
+            raise AdbError("ADB binary not found.")
+        except subprocess.CalledProcessError as e:
+            raise AdbError(f"Could not start the adb server: {e}")
+
+    def connect(self):
+        try:
+            sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        except ConnectionRefusedError:
+            self.start_server()
+            try:
+                sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            except OSError as e:
+                raise AdbError(f"Cannot reach the adb server: {e}")
+        except OSError as e:
+            raise AdbError(f"Cannot reach the adb server: {e}")
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return AdbConnection(sock, self.instrumentation)
+
+    def host_query(self, service):
+        with self.connect() as conn:
+            conn.send_request(service)
+            conn.read_status()
+            return conn.read_string()
+
+    def host_command(self, service):
+        with self.connect() as conn:
+            conn.send_request(service)
+            conn.read_status()
+            conn.read_status()
+
+    def host_service(self, service, serial=None):
+        if serial:
+            return f"host-serial:{serial}:{service}"
+        return f"host:{service}"
+
+    def version(self):
+        return int(self.host_query('host:version'), 16)
+
+    def devices_long(self):
+        return parse_device_list(self.host_query('host:devices-l'))
+
+    def devices(self):
+        devices = []
+        for line in self.host_query('host:devices').splitlines():
+            fields = line.split('\t')
+            if len(fields) == 2:
+                devices.append((fields[0], fields[1]))
+        return devices
+
+    def features(self, serial=None):
+        if serial not in self._features:
+            features = self.host_query(self.host_service('features', serial))
+            self._features[serial] = set(features.strip().split(','))
+        return self._features[serial]
+
+    def open_service(self, service, serial=None):
+        conn = self.connect()
+        try:
+            conn.send_request(f"host:transport:{serial}" if serial else 'host:transport-any')
+            conn.read_status()
+            conn.send_request(service)
+            conn.serial = serial
+            conn.read_status()
+        except (AdbError, OSError):
+            conn.close()
+            raise
+        return conn
+
+    def service_output(self, service, serial=None):
+        with self.open_service(service, serial) as conn:
+            return conn.read_all().decode(errors='replace')
+
+    def shell(self, command, serial=None, check=False):
+        command = format_shell_command(command)
+        if 'shell_v2' in self.features(serial):
+            result = self._shell_v2(command, serial)
+        else:
+            result = self._shell_legacy(command, serial)
+        if check and result.exit_code:
+            raise AdbError(f"Command '{command}' returned non-zero exit status {result.exit_code}.")
+        return result
+
+    def _shell_v2(self, command, serial):
+        stdout, stderr, exit_code = [], [], None
+        with self.open_service(f"shell,v2,raw:{command}", serial) as conn:
+            while exit_code is None:
+                packet_id, length = struct.unpack('<BI', conn.read_exactly(5))
+                data = conn.read_exactly(length)
+                if packet_id == 1:
+                    stdout.append(data)
+                elif packet_id == 2:
+                    stderr.append(data)
+                elif packet_id == 3:
+                    exit_code = data[0]
+            conn.status = exit_code
+        return ShellResult(exit_code, b''.join(stdout).decode(errors='replace'),
+                           b''.join(stderr).decode(errors='replace'))
+
+    def _shell_legacy(self, command, serial):
+        output = self.service_output(f"shell:{command}; echo {SHELL_EXIT_MARKER}$?", serial)
+        body, _, exit_code = output.rpartition(SHELL_EXIT_MARKER)
+        if not _:
+            return ShellResult(0, output, '')
+        return ShellResult(int(exit_code.strip() or 0), body, '')
+
+    def exec_out(self, command, serial=None):
+        with self.open_service(f"exec:{format_shell_command(command)}", serial) as conn:
+            return conn.read_all()
+
+    def open_shell_stream(self, command, serial=None):
+        return self.open_service(f"shell:{format_shell_command(command)}", serial)
+
+    def sync(self, serial=None):
+        return AdbSyncConnection(self.open_service('sync:', serial))
+
+    def push(self, local_path, remote_path, serial=None):
+        with self.sync(serial) as sync:
+            mode = sync.stat(remote_path)[0]
+            if stat.S_ISDIR(mode):
+                remote_path = posixpath.join(remote_path, os.path.basename(os.path.normpath(local_path)))
+            if not os.path.isdir(local_path):
+                return sync.push(local_path, remote_path)
+            sent = 0
+            for root, _, files in os.walk(local_path):
+                relative_root = os.path.relpath(root, local_path).replace(os.sep, '/')
+                remote_root = posixpath.normpath(posixpath.join(remote_path, relative_root))
+                for name in files:
+                    sent += sync.push(os.path.join(root, name), posixpath.join(remote_root, name))
+            return sent
+
+    def pull(self, remote_path, local_path, serial=None):
+        with self.sync(serial) as sync:
+            mode = sync.stat(remote_path)[0]
+            if mode == 0:
+                raise AdbError(f"remote object '{remote_path}' does not exist")
+            if os.path.isdir(local_path):
+                local_path = os.path.join(local_path, posixpath.basename(remote_path.rstrip('/')))
+            if not stat.S_ISDIR(mode):
+                return sync.pull(remote_path, local_path)
+            return self._pull_directory(sync, remote_path, local_path)
+
+    def _pull_directory(self, sync, remote_path, local_path):
+        os.makedirs(local_path, exist_ok=True)
+        received = 0
+        for name, mode, _, _ in sync.list(remote_path):
+            remote_child = posixpath.join(remote_path, name)
+            local_child = os.path.join(local_path, name)
+            if stat.S_ISDIR(mode):
+                received += self._pull_directory(sync, remote_child, local_child)
+            elif stat.S_ISREG(mode):
+                received += sync.pull(remote_child, local_child)
+        return received
+
+    def _stream_to_package_manager(self, command, stream, serial):
+        with self.open_service(f"exec:cmd package {command}", serial) as conn:
+            while True:
+                data = stream.read(SYNC_DATA_MAX)
+                if not data:
+                    break
+                conn.send(data)
+            output = conn.read_all().decode(errors='replace').strip()
+        if 'Success' not in output:
+            raise AdbError(output or "Package manager returned no output.")
+        return output
+
+    def install(self, apk_path, serial=None, options=(), contents=None):
+        options = ' '.join(options)
+        if 'cmd' not in self.features(serial):
+            remote_path = '/data/local/tmp/' + os.path.basename(apk_path)
+            self.push(apk_path, remote_path, serial)
+            try:
+                result = self.shell(f"pm install {options} {shlex.quote(remote_path)}", serial)
+            finally:
+                self.shell(['rm', '-f', remote_path], serial)
+            if 'Success' not in result.stdout:
+                raise AdbError(result.stdout.strip() or result.stderr.strip())
+            return result.stdout.strip()
+        with open_apk(apk_path, contents) as apk_file:
+            return self._stream_to_package_manager(
+                f"install {options} -S {os.path.getsize(apk_path)}", apk_file, serial)
+
+    def install_multiple(self, apk_paths, serial=None, options=(), contents=None):
+        options = ' '.join(options)
+        total_size = sum(os.path.getsize(path) for path in apk_paths)
+        output = self.exec_out(f"cmd package install-create {options} -S {total_size}", serial).decode()
+        if '[' not in output:
+            raise AdbError(output.strip())
+        session_id = output[output.index('[') + 1:output.index(']')]
+        try:
+            for index, apk_path in enumerate(apk_paths):
+                with open_apk(apk_path, contents) as apk_file:
+                    self._stream_to_package_manager(
+                        f"install-write -S {os.path.getsize(apk_path)} {session_id} {index}_{os.path.basename(apk_path)} -",
+                        apk_file, serial)
+        except AdbError:
+            self.exec_out(f"cmd package install-abandon {session_id}", serial)
+            raise
+        result = self.exec_out(f"cmd package install-commit {session_id}", serial).decode().strip()
+        if 'Success' not in result:
+            raise AdbError(result)
+        return result
+
+    def forward(self, local, remote, serial=None):
+        self.host_command(self.host_service(f"forward:{local};{remote}", serial))
+
+    def reverse(self, remote, local, serial=None):
+        with self.open_service(f"reverse:forward:{remote};{local}", serial) as conn:
+            conn.read_status()
+
+    def list_forwards(self):
+        # Every forward the server holds, for all devices.
+        forwards = []
+        for line in self.host_query('host:list-forward').splitlines():
+            fields = line.split()
+            if len(fields) == 3:
+                forwards.append({'serial': fields[0], 'local': fields[1], 'remote': fields[2]})
+        return forwards
+
+    def remove_forward(self, local, serial=None):
+        self.host_command(self.host_service(f"killforward:{local}", serial))
+
+    def remove_all_forwards(self, serial=None):
+        # Without a serial this removes the forwards of every device.
+        self.host_command(self.host_service('killforward-all', serial))
+
+    def list_reverses(self, serial=None):
+        # Reverses live on the device, so each one has to be asked.
+        # Unlike forward and killforward, adbd answers with the listing alone.
+        with self.open_service('reverse:list-forward', serial) as conn:
+            text = conn.read_string()
+        reverses = []
+        for line in text.splitlines():
+            fields = line.split()
+            if len(fields) == 3:
+                reverses.append({'serial': serial, 'remote': fields[1], 'local': fields[2]})
+        return reverses
+
+    def remove_reverse(self, remote, serial=None):
+        with self.open_service(f"reverse:killforward:{remote}", serial) as conn:
+            conn.read_status()
+
+    def remove_all_reverses(self, serial=None):
+        with self.open_service('reverse:killforward-all', serial) as conn:
+            conn.read_status()
+
+    def connect_device(self, address):
+        message = self.host_query(f"host:connect:{address}")
+        if 'connected to' not in message:
+            raise AdbError(message)
+        return message
+
+    def mdns_services(self):
+        # Wireless-debugging services the server has seen advertised, as
+        # "name<TAB>type<TAB>ip:port" lines.
+        services = []
+        for line in self.host_query('host:mdns:services').splitlines():
+            fields = line.split('\t')
+            if len(fields) == 3:
+                services.append({'name': fields[0], 'type': fields[1].rstrip('.'), 'address': fields[2]})
+        return services
+
+    def disconnect_device(self, address):
+        return self.host_query(f"host:disconnect:{address}")
+
+    def pair_device(self, address, pairing_code):
+        message = self.host_query(f"host:pair:{pairing_code}:{address}")
+        if not message.startswith('Successfully'):
+            raise AdbError(message)
+        return message
+
+    def wait_for_device(self, serial=None):
+        self.host_command(self.host_service('wait-for-any-device', serial))
+
+    def get_serial(self, serial=None):
+        return serial or self.host_query('host:get-serialno')
+
+
+class DeviceTracker:
+    # Live device table fed by the server's host:track-devices stream. The
+    # server pushes the full list on every change, so reads never cost a
+    # round trip and listeners hear about hotplug events as they happen.
+    def __init__(self, client, reconnect_delay=TRACKER_RECONNECT_DELAY):
+        self.client = client
+        self.reconnect_delay = reconnect_delay
+        self._devices = {}
+        self._listeners = []
+        self._changed = threading.Condition()
+        self._synced = False
+        self._error = None
+        self._thread = None
+        self._conn = None
+        self._stopped = False
+
+    def add_listener(self, callback):
+        # callback(event, device, previous) with event 'connected',
+        # 'disconnected' or 'state'; runs on the tracker thread.
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        self._listeners.remove(callback)
+
+    def start(self, timeout=TRACKER_START_TIMEOUT):
+        with self._changed:
+            if self._thread is None:
+                self._stopped = False
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            if not self._changed.wait_for(lambda: self._synced or self._error, timeout):
+                raise AdbError("Timed out waiting for the adb server's device list.")
+            if not self._synced:
+                raise AdbError(self._error)
+
+    def stop(self):
+        self._stopped = True
+        if self._conn:
+            self._conn.close()
+        if self._thread:
+            self._thread.join()
+        with self._changed:
+            self._thread = None
+            self._synced = False
+            self._devices = {}
+
+    def _open(self):
+        conn = self.client.connect()
+        try:
+            conn.send_request('host:track-devices-l')
+            conn.read_status()
+        except AdbError:
+            # Servers older than platform-tools 29 only know the short form.
+            conn.close()
+            conn = self.client.connect()
+            conn.send_request('host:track-devices')
+            conn.read_status()
+        return conn
+
+    def _run(self):
+        while not self._stopped:
+            try:
+                self._conn = self._open()
+                with self._conn:
+                    while True:
+                        self._update(parse_device_list(self._conn.read_string()))
+            except (AdbError, OSError) as e:
+                if self._stopped:
+                    return
+                with self._changed:
+                    self._error = f"Lost the adb server's device stream: {e}"
+                    self._synced = False
+                    self._changed.notify_all()
+                # The table is unknown until the server answers again.
+                self._update([], synced=False)
+                time.sleep(self.reconnect_delay)
+
+    def _update(self, devices, synced=True):
+        current = {device['serial']: device for device in devices}
+        events = []
+        with self._changed:
+            previous = self._devices
+            for serial, device in current.items():
+                if serial not in previous:
+                    events.append(('connected', device, None))
+                elif previous[serial]['state'] != device['state']:
+                    events.append(('state', device, previous[serial]))
+            for serial, device in previous.items():
+                if serial not in current:
+                    events.append(('disconnected', device, device))
+            self._devices = current
+            if synced:
+                self._synced = True
+                self._error = None
+            self._changed.notify_all()
+        for event, device, before in events:
+            for callback in list(self._listeners):
+                try:
+                    callback(event, device, before)
+                except Exception:
+                    pass
+
+    def devices_long(self):
+        self.start()
+        with self._changed:
+            return [dict(device) for device in self._devices.values()]
+
+    def devices(self):
+        return [(device['serial'], device['state']) for device in self.devices_long()]
+
+    def ready(self):
+        return [serial for serial, state in self.devices() if state == 'device']
+
+    def wait_for(self, serial=None, state='device', timeout=None):
+        # Blocks until the given device (or any device) reaches the state
+        # and returns its serial.
+        self.start()
+
+        def match():
+            for device in self._devices.values():
+                if (serial is None or device['serial'] == serial) and device['state'] == state:
+                    return device['serial']
+            return None
+        with self._changed:
+            found = self._changed.wait_for(match, timeout)
+        if not found:
+            raise AdbError(f"Timed out waiting for {serial or 'a device'} to be {state}.")
+        return found
+
+
+class ShellSession:
+    # A long-lived `exec:sh` channel. Each command runs in a subshell and is
+    # framed with a unique sentinel line carrying its exit code, so many
+    # commands share one socket.
+    def __init__(self, client, serial=None, timeout=None):
+        self.serial = serial
+        self.instrumentation = client.instrumentation
+        self.conn = client.open_service('exec:sh', serial)
+        self.conn.sock.settimeout(timeout)
+        self.reader = self.conn.sock.makefile('rb')
+        self.last_used = time.monotonic()
+        self.commands_run = 0
+        self.alive = True
+
+    def close(self):
+        self.alive = False
+        try:
+            self.reader.close()
+        except OSError:
+            pass
+        self.conn.close()
+
+    def _frame(self, command):
+        marker = f"__EASYADB_{uuid.uuid4().hex}__"
+        # The subshell keeps `exit`, `cd` and variables from leaking into later commands.
+        script = f"( {format_shell_command(command)}\n) </dev/null 2>&1; printf '\\n{marker}%d\\n' $?\n"
+        return marker, script.encode()
+
+    def _read_result(self, marker):
+        marker = marker.encode()
+        lines = []
+        while True:
+            line = self.reader.readline()
+            if not line:
+                self.alive = False
+                raise AdbError("Shell session closed unexpectedly.")
+            if line.startswith(marker):
+                output = b''.join(lines)[:-1]
+                return ShellResult(int(line[len(marker):].strip()), output.decode(errors='replace'), '')
+            lines.append(line)
+
+    def is_closed(self):
+        # True once the device has closed the channel: it reads as EOF.
+        # Checked before writing, so a stale session costs no command.
+        try:
+            readable, _, _ = select.select([self.conn.sock], [], [], 0)
+            return bool(readable) and not self.conn.sock.recv(1, socket.MSG_PEEK)
+        except (OSError, ValueError):
+            return True
+
+    def run_many(self, commands):
+        framed = [self._frame(command) for command in commands]
+        if not self.alive or self.is_closed():
+            self.alive = False
+            raise ShellSessionError("Shell session closed unexpectedly.", written=False)
+        self.commands_run += len(framed)
+        results = []
+        try:
+            start = time.perf_counter()
+            self.conn.send(b''.join(script for _, script in framed))
+            for (marker, script), command in zip(framed, commands):
+                results.append(self._read_result(marker))
+                if self.instrumentation:
+                    # Pipelined commands are timed from the shared send to their own result.
+                    finished = time.perf_counter()
+                    self.instrumentation.record(operation_name(f"pool:{format_shell_command(command)}"),
+                                                self.serial, start, finished - start, len(script),
+                                                len(results[-1].stdout), results[-1].exit_code)
+        except (OSError, ValueError, AdbError) as e:
+            self.alive = False
+            message = str(e) if isinstance(e, AdbError) else f"Shell session failed: {e}"
+            raise ShellSessionError(message, results) from e
+        self.last_used = time.monotonic()
+        return results
+
+    def run(self, command):
+        return self.run_many([command])[0]
+
+    def is_healthy(self):
+        if not self.alive:
+            return False
+        try:
+            return self.run('echo ok').stdout.strip() == 'ok'
+        except AdbError:
+            return False
+
+
+class ShellSessionPool:
+    def __init__(self, client, max_sessions=SHELL_SESSIONS_PER_DEVICE, timeout=SHELL_SESSION_TIMEOUT):
+        self.client = client
+        self.max_sessions = max_sessions
+        self.timeout = timeout
+        self._idle = {}
+        self._counts = {}
+        self._lock = threading.Condition()
+
+    def _acquire(self, serial):
+        with self._lock:
+            while True:
+                idle = self._idle.setdefault(serial, [])
+                if idle:
+                    session = idle.pop()
+                    break
+                if self._counts.get(serial, 0) < self.max_sessions:
+                    self._counts[serial] = self._counts.get(serial, 0) + 1
+                    session = None
+                    break
+                self._lock.wait()
+        if session is not None:
+            if time.monotonic() - session.last_used < SHELL_SESSION_IDLE_CHECK or session.is_healthy():
+                return session
+            session.close()
+        try:
+            return ShellSession(self.client, serial, self.timeout)
+        except (AdbError, OSError):
+            self._discard(serial)
+            raise
+
+    def _discard(self, serial):
+        with self._lock:
+            self._counts[serial] -= 1
+            self._lock.notify()
+
+    def _release(self, session):
+        if not session.alive:
+            session.close()
+            self._discard(session.serial)
+            return
+        with self._lock:
+            self._idle.setdefault(session.serial, []).append(session)
+            self._lock.notify()
+
+    def run_many(self, commands, serial=None):
+        # A pooled channel found dead before anything was written is swapped
+        # for another. Once the batch has been sent it is never resent, since
+        # commands such as `input tap` or `rm` must not run twice; the
+        # ShellSessionError then carries the results that did come back.
+        while True:
+            session = self._acquire(serial)
+            fresh = session.commands_run == 0
+            try:
+                return session.run_many(commands)
+            except ShellSessionError as e:
+                if fresh or e.written:
+                    raise
+            finally:
+                self._release(session)
+
+    def run(self, command, serial=None, check=False):
+        result = self.run_many([command], serial)[0]
+        if check and result.exit_code:
+            raise AdbError(f"Command '{format_shell_command(command)}' returned non-zero exit status {result.exit_code}.")
+        return result
+
+    def close_device(self, serial):
+        with self._lock:
+            sessions = self._idle.pop(serial, [])
+            for session in sessions:
+                session.close()
+            if sessions:
+                self._counts[serial] -= len(sessions)
+
+    def close_all(self):
+        for serial in list(self._idle):
+            self.close_device(serial)
+
+
+PROFILE_QUERY = ("echo ::props; getprop; echo ::size; wm size; echo ::density; wm density; "
+                 "echo ::uid; id -u; echo ::features; pm list features")
+
+def split_sections(output):
+    sections = {}
+    current = None
+    for line in output.splitlines():
+        if line.startswith('::'):
+            current = line[2:].strip()
+            sections[current] = []
+        elif current is not None:
+            sections[current].append(line)
+    return sections
+
+def parse_getprop(lines):
+    props = {}
+    for line in lines:
+        if line.startswith('[') and ']: [' in line:
+            key, _, value = line[1:].partition(']: [')
+            value = value.rstrip()
+            props[key] = value[:-1] if value.endswith(']') else value
+    return props
+
+def parse_wm_value(lines):
+    values = {}
+    for line in lines:
+        key, _, value = line.partition(':')
+        if value:
+            values[key.strip().split()[0].lower()] = value.strip()
+    return values.get('override', values.get('physical'))
+
+
+class DeviceProfileCache:
+    # Static facts about each device, fetched in one shell round-trip,
+    # kept for PROFILE_TTL seconds and persisted so the next launch starts warm.
+    def __init__(self, client, path=PROFILE_CACHE_PATH, ttl=PROFILE_TTL):
+        self.client = client
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._profiles = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path) as cache_file:
+                return json.load(cache_file)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp_path = self.path + '.tmp'
+            with open(temp_path, 'w') as cache_file:
+                json.dump(self._profiles, cache_file)
+            os.replace(temp_path, self.path)
+        except OSError:
+            pass
+
+    def _fetch(self, serial):
+        sections = split_sections(self.client.shell(PROFILE_QUERY, serial).stdout)
+        props = parse_getprop(sections.get('props', []))
+        uid = ''.join(sections.get('uid', [])).strip()
+        density = parse_wm_value(sections.get('density', []))
+        return {
+            'serial': serial,
+            'fetched_at': time.time(),
+            'sdk': int(props.get('ro.build.version.sdk', 0) or 0),
+            'abi': props.get('ro.product.cpu.abi', ''),
+            'model': props.get('ro.product.model', ''),
+            'resolution': parse_wm_value(sections.get('size', [])),
+            'density': int(density) if density and density.isdigit() else None,
+            'rooted': uid == '0',
+            'features': sorted(line[len('feature:'):] for line in sections.get('features', [])
+                               if line.startswith('feature:')),
+            'props': props,
+        }
+
+    def get(self, serial=None, refresh=False):
+        serial = self.client.get_serial(serial)
+        with self._lock:
+            profile = self._profiles.get(serial)
+        if profile and not refresh and time.time() - profile['fetched_at'] < self.ttl:
+            return profile
+        profile = self._fetch(serial)
+        with self._lock:
+            self._profiles[serial] = profile
+            self._save()
+        return profile
+
+    def invalidate(self, serial=None):
+        serial = self.client.get_serial(serial)
+        with self._lock:
+            if self._profiles.pop(serial, None) is not None:
+                self._save()
+
+
+PACKAGE_QUERY = ("pm list packages -f -U -i --show-versioncode; echo ::disabled; pm list packages -d; "
+                 "echo ::system; pm list packages -s")
+
+def parse_package_line(line):
+    # package:/data/app/~~x==/com.foo-y==/base.apk=com.foo versionCode:12 installer=com.android.vending uid:10123
+    fields = line.split()
+    path, _, name = fields[0][len('package:'):].rpartition('=')
+    details = {'versionCode': 0, 'installer': None, 'uid': None}
+    for field in fields[1:]:
+        key, separator, value = field.replace('=', ':', 1).partition(':')
+        if separator and key in details:
+            details[key] = None if value == 'null' else value
+    return name, path, details
+
+
+class PackageIndex:
+    # Host-side inventory of installed packages per device. Each refresh runs
+    # one rich `pm list` query and applies only the differences to the index.
+    def __init__(self, client, directory=PACKAGE_INDEX_DIR, ttl=PACKAGE_INDEX_TTL):
+        self.client = client
+        self.directory = directory
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._indexes = {}
+
+    def _path(self, serial):
+        return os.path.join(self.directory, serial.replace(':', '_') + '.json')
+
+    def _load(self, serial):
+        try:
+            with open(self._path(serial)) as index_file:
+                data = json.load(index_file)
+            packages = {entry[0]: PackageInfo(*entry) for entry in data['packages']}
+            return {'fetched_at': data['fetched_at'], 'packages': packages, 'names': sorted(packages)}
+        except (OSError, ValueError, KeyError, TypeError):
+            return {'fetched_at': 0, 'packages': {}, 'names': []}
+
+    def _save(self, serial, index):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            temp_path = self._path(serial) + '.tmp'
+            with open(temp_path, 'w') as index_file:
+                json.dump({'fetched_at': index['fetched_at'], 'packages': list(index['packages'].values())}, index_file)
+            os.replace(temp_path, self._path(serial))
+        except OSError:
+            pass
+
+    def _index(self, serial):
+        if serial not in self._indexes:
+            self._indexes[serial] = self._load(serial)
+        return self._indexes[serial]
+
+    def refresh(self, serial=None):
+        serial = self.client.get_serial(serial)
+        sections = split_sections('::packages\n' + self.client.shell(PACKAGE_QUERY, serial, check=True).stdout)
+        disabled = {line[len('package:'):].strip() for line in sections.get('disabled', []) if line.startswith('package:')}
+        system = {line[len('package:'):].strip() for line in sections.get('system', []) if line.startswith('package:')}
+        current = {}
+        for line in sections.get('packages', []):
+            if line.startswith('package:'):
+                name, path, details = parse_package_line(line)
+                current[name] = PackageInfo(name, path, details['uid'], int(details['versionCode']),
+                                            details['installer'], name not in disabled, name in system)
+        with self._lock:
+            index = self._index(serial)
+            packages = index['packages']
+            added = [name for name in current if name not in packages]
+            removed = [name for name in packages if name not in current]
+            changed = [name for name in current if name in packages and packages[name] != current[name]]
+            for name in removed:
+                del packages[name]
+                del index['names'][bisect.bisect_left(index['names'], name)]
+            for name in added:
+                bisect.insort(index['names'], name)
+            for name in added + changed:
+                packages[name] = current[name]
+            index['fetched_at'] = time.time()
+            self._save(serial, index)
+        return added, removed, changed
+
+    def packages(self, serial=None):
+        serial = self.client.get_serial(serial)
+        with self._lock:
+            stale = time.time() - self._index(serial)['fetched_at'] >= self.ttl
+        if stale:
+            self.refresh(serial)
+        return self._indexes[serial]
+
+    def invalidate(self, serial=None):
+        serial = self.client.get_serial(serial)
+        with self._lock:
+            self._index(serial)['fetched_at'] = 0
+
+    def search(self, text='', serial=None, system=None, enabled=None):
+        index = self.packages(serial)
+        names = index['names']
+        if text:
+            # Prefix matches come straight off the sorted name list; substring matches follow.
+            start = bisect.bisect_left(names, text)
+            end = bisect.bisect_left(names, text + '\uffff')
+            prefix = names[start:end]
+            matches = prefix + [name for name in names if text in name and not name.startswith(text)]
+        else:
+            matches = names
+        results = []
+        for name in matches:
+            package = index['packages'][name]
+            if system is not None and package.system != system:
+                continue
+            if enabled is not None and package.enabled != enabled:
+                continue
+            results.append(package)
+        return results
+
+
+FILE_LISTING_FORMAT = '%f %s %Y %n'
+
+def parse_file_listing(output):
+    # `stat -c '%f %s %Y %n'` lines: mode in hex, size, mtime and path.
+    # Anything else (error messages from find or stat) is skipped.
+    entries = {}
+    for line in output.splitlines():
+        fields = line.split(' ', 3)
+        if len(fields) != 4 or not fields[1].isdigit() or not fields[2].isdigit():
+            continue
+        try:
+            mode = int(fields[0], 16)
+        except ValueError:
+            continue
+        path = posixpath.normpath(fields[3])
+        entries[path] = RemoteFile(path, mode, int(fields[1]), int(fields[2]))
+    return entries
+
+def compile_remote_glob(pattern):
+    # * and ? stay within one path segment, ** spans any number of them and
+    # [...] is a character class. Returns the regex and the deepest
+    # directory that contains every possible match.
+    parts = []
+    index = 0
+    while index < len(pattern):
+        if pattern.startswith('**/', index):
+            parts.append('(?:.*/)?')
+            index += 3
+            continue
+        if pattern.startswith('**', index):
+            parts.append('.*')
+            index += 2
+            continue
+        char = pattern[index]
+        end = pattern.find(']', index + 2) if char == '[' else -1
+        if char == '*':
+            parts.append('[^/]*')
+        elif char == '?':
+            parts.append('[^/]')
+        elif end != -1:
+            body = pattern[index + 1:end]
+            parts.append('[' + ('^' + body[1:] if body.startswith('!') else body).replace('\\', '\\\\') + ']')
+            index = end
+        else:
+            parts.append(re.escape(char))
+        index += 1
+    literal = re.split(r'[*?\[]', pattern, maxsplit=1)[0]
+    base = literal if literal == pattern else literal.rpartition('/')[0]
+    return re.compile(''.join(parts) + r'\Z'), posixpath.normpath(base or '/')
+
+
+class RemoteFileIndex:
+    # Host-side index of device files (mode, size, mtime), kept per device
+    # like the package index. A refresh lists one subtree in a single
+    # recursive find/stat pass and replaces only that subtree. Glob
+    # operations match against the index and then act on every match in one
+    # shell invocation, which also reports back what changed.
+    def __init__(self, client, pool, directory=FILE_INDEX_DIR, ttl=FILE_INDEX_TTL):
+        self.client = client
+        self.pool = pool
+        self.directory = directory
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._indexes = {}
+
+    def _path(self, serial):
+        return os.path.join(self.directory, serial.replace(':', '_') + '.json')
+
+    def _load(self, serial):
+        try:
+            with open(self._path(serial)) as index_file:
+                data = json.load(index_file)
+            files = {entry[0]: RemoteFile(*entry) for entry in data['files']}
+            return {'roots': data['roots'], 'files': files, 'paths': sorted(files)}
+        except (OSError, ValueError, KeyError, TypeError):
+            return {'roots': {}, 'files': {}, 'paths': []}
+
+    def _save(self, serial, index):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            temp_path = self._path(serial) + '.tmp'
+            with open(temp_path, 'w') as index_file:
+                json.dump({'roots': index['roots'], 'files': list(index['files'].values())}, index_file)
+            os.replace(temp_path, self._path(serial))
+        except OSError:
+            pass
+
+    def _index(self, serial):
+        if serial not in self._indexes:
+            self._indexes[serial] = self._load(serial)
+        return self._indexes[serial]
+
+    @staticmethod
+    def _bounds(paths, root):
+        # Everything strictly below root is one contiguous run of the sorted list.
+        prefix = root.rstrip('/') + '/'
+        return bisect.bisect_left(paths, prefix), bisect.bisect_left(paths, prefix + '\uffff')
+
+    @staticmethod
+    def _within(path, root):
+        return path == root or path.startswith(root.rstrip('/') + '/')
+
+    def _replace_subtree(self, index, root, current):
+        # current holds root and its descendants as they are now.
+        files, paths = index['files'], index['paths']
+        start, end = self._bounds(paths, root)
+        old = set(paths[start:end]) | ({root} if root in files else set())
+        added = [path for path in current if path not in files]
+        removed = [path for path in old if path not in current]
+        changed = [path for path in current if path in files and files[path] != current[path]]
+        for path in removed:
+            del files[path]
+        files.update(current)
+        paths[start:end] = sorted(path for path in current if path != root)
+        position = bisect.bisect_left(paths, root)
+        present = position < len(paths) and paths[position] == root
+        if root in current and not present:
+            paths.insert(position, root)
+        elif root not in current and present:
+            del paths[position]
+        return added, removed, changed
+
+    def refresh(self, root='/sdcard', serial=None):
+        serial = self.client.get_serial(serial)
+        root = posixpath.normpath(root)
+        # The trailing slash makes find descend into a root that is a symlink,
+        # like /sdcard; for a plain file only the stat answers.
+        command = (f"stat -c '{FILE_LISTING_FORMAT}' {shlex.quote(root)}; "
+                   f"find {shlex.quote(root.rstrip('/') + '/')} -mindepth 1 "
+                   f"-exec stat -c '{FILE_LISTING_FORMAT}' {{}} + 2>/dev/null")
+        current = parse_file_listing(self.pool.run(command, serial).stdout)
+        with self._lock:
+            index = self._index(serial)
+            changes = self._replace_subtree(index, root, {path: entry for path, entry in current.items()
+                                                          if self._within(path, root)})
+            for other in [other for other in index['roots'] if self._within(other, root)]:
+                del index['roots'][other]
+            index['roots'][root] = time.time()
+            self._save(serial, index)
+        return changes
+
+    def ensure(self, root, serial=None):
+        # Refreshes root unless an indexed subtree covering it is still fresh.
+        serial = self.client.get_serial(serial)
+        root = posixpath.normpath(root)
+        now = time.time()
+        with self._lock:
+            roots = self._index(serial)['roots']
+            fresh = any(self._within(root, other) and now - fetched_at < self.ttl
+                        for other, fetched_at in roots.items())
+        if not fresh:
+            self.refresh(root, serial)
+        return serial
+
+    def files(self, root='/sdcard', serial=None, refresh=False):
+        if refresh:
+            serial = self.client.get_serial(serial)
+            self.refresh(root, serial)
+        else:
+            serial = self.ensure(root, serial)
+        root = posixpath.normpath(root)
+        with self._lock:
+            index = self._index(serial)
+            start, end = self._bounds(index['paths'], root)
+            paths = ([root] if root in index['files'] else []) + index['paths'][start:end]
+            return [index['files'][path] for path in paths]
+
+    def children(self, directory, serial=None, refresh=False):
+        directory = posixpath.normpath(directory)
+        depth = directory.rstrip('/').count('/') + 1
+        return [entry for entry in self.files(directory, serial, refresh)
+                if entry.path != directory and entry.path.count('/') == depth]
+
+    def glob(self, pattern, serial=None, refresh=False):
+        if not pattern.startswith('/'):
+            raise ValueError(f"'{pattern}' is not absolute; use a pattern such as /sdcard/DCIM/**/*.jpg")
+        regex, base = compile_remote_glob(pattern)
+        return [entry for entry in self.files(base, serial, refresh) if regex.match(entry.path)]
+
+    def invalidate(self, serial=None, root=None):
+        serial = self.client.get_serial(serial)
+        with self._lock:
+            roots = self._index(serial)['roots']
+            for other in list(roots):
+                if root is None or self._within(other, root) or self._within(root, other):
+                    roots[other] = 0
+
+    def _run_batch(self, serial, command, paths, recursive):
+        # One script for the whole list: the command runs once per chunk of
+        # SHELL_BATCH_ARGS paths, then the same paths are listed again so
+        # the index can be brought in step with the device. Whatever the
+        # command prints is an error message.
+        lister = (f"find {{paths}} -exec stat -c '{FILE_LISTING_FORMAT}' {{{{}}}} +" if recursive
+                  else f"stat -c '{FILE_LISTING_FORMAT}' -- {{paths}}")
+        chunks = [' '.join(shlex.quote(path) for path in paths[start:start + SHELL_BATCH_ARGS])
+                  for start in range(0, len(paths), SHELL_BATCH_ARGS)]
+        script = ('echo ::errors; ' +
+                  ''.join(f"{format_shell_command(command)} -- {chunk}; " for chunk in chunks) +
+                  'echo ::after; ' + ''.join(f"{lister.format(paths=chunk)} 2>/dev/null; " for chunk in chunks) +
+                  # Deleted paths make the listing fail; errors are judged by the output instead.
+                  'true')
+        result = self.pool.run(script, serial)
+        sections = split_sections(result.stdout)
+        after = parse_file_listing('\n'.join(sections.get('after', [])))
+        with self._lock:
+            index = self._index(serial)
+            for path in paths:
+                if recursive or path not in after:
+                    self._replace_subtree(index, path, {other: entry for other, entry in after.items()
+                                                        if self._within(other, path)})
+                else:
+                    if path not in index['files']:
+                        bisect.insort(index['paths'], path)
+                    index['files'][path] = after[path]
+            self._save(serial, index)
+        return [line for line in sections.get('errors', []) if line.strip()]
+
+    @staticmethod
+    def _outermost(entries):
+        # Drops matches inside another matched directory; acting on the directory covers them.
+        paths = []
+        for path in sorted(entry.path for entry in entries):
+            if not paths or not RemoteFileIndex._within(path, paths[-1]):
+                paths.append(path)
+        return paths
+
+    def delete(self, pattern, serial=None):
+        serial = self.client.get_serial(serial)
+        paths = self._outermost(self.glob(pattern, serial))
+        errors = self._run_batch(serial, ['rm', '-rf'], paths, True) if paths else []
+        return paths, errors
+
+    def chmod(self, pattern, mode, serial=None, recursive=False):
+        serial = self.client.get_serial(serial)
+        matches = self.glob(pattern, serial)
+        paths = self._outermost(matches) if recursive else sorted(entry.path for entry in matches)
+        command = ['chmod', '-R', mode] if recursive else ['chmod', mode]
+        errors = self._run_batch(serial, command, paths, recursive) if paths else []
+        return paths, errors
+
+    def pull(self, pattern, local_dir, serial=None):
+        # Every matching regular file over one sync connection, laid out
+        # under local_dir relative to the pattern's fixed directory.
+        serial = self.client.get_serial(serial)
+        _, base = compile_remote_glob(pattern)
+        matches = [entry for entry in self.glob(pattern, serial) if stat.S_ISREG(entry.mode)]
+        received = 0
+        with self.client.sync(serial) as sync:
+            for entry in matches:
+                relative = posixpath.relpath(entry.path, base) if entry.path != base else posixpath.basename(base)
+                local_path = os.path.join(local_dir, *relative.split('/'))
+                os.makedirs(os.path.dirname(local_path) or '.', exist_ok=True)
+                received += sync.pull(entry.path, local_path)
+                os.utime(local_path, (entry.mtime, entry.mtime))
+        return matches, received
+
+
+def parse_dumpsys_services(output):
+    # `dumpsys -l`: a header line followed by one indented service name per line.
+    return sorted(line.strip() for line in output.splitlines() if line.startswith(' ') and line.strip())
+
+def parse_number(text):
+    # Sizes such as "1,234K" lose the unit and separators; any other text,
+    # "OK" included, comes back as it was.
+    text = text.strip()
+    number = text
+    if re.fullmatch(r'[\d,.]+K?', text):
+        number = text.rstrip('K').replace(',', '')
+    try:
+        return int(number)
+    except ValueError:
+        try:
+            return float(number)
+        except ValueError:
+            return {'true': True, 'false': False}.get(text, text)
+
+def parse_dumpsys_battery(output):
+    battery = {}
+    for line in output.splitlines():
+        key, separator, value = line.partition(':')
+        if separator and line.startswith('  ') and value.strip():
+            battery[key.strip()] = parse_number(value)
+    if isinstance(battery.get('temperature'), int):
+        battery['temperature'] /= 10
+    return battery
+
+def parse_dumpsys_meminfo(output):
+    # Summary lines like "Total RAM: 5,678,900K (status normal)" plus the
+    # "Total PSS by process" table; all sizes are in KB.
+    meminfo = {'processes': []}
+    in_processes = False
+    for line in output.splitlines():
+        stripped = line.strip()
+        if stripped.startswith('Total PSS by process'):
+            in_processes = True
+            continue
+        if in_processes:
+            size, separator, rest = stripped.partition(': ')
+            if separator and size.endswith('K') and line.startswith('    '):
+                name, _, pid = rest.partition(' (pid ')
+                meminfo['processes'].append({'pss_kb': parse_number(size), 'name': name,
+                                             'pid': parse_number(pid.split()[0].rstrip(')')) if pid else None})
+                continue
+            in_processes = bool(line.startswith(' ') and stripped)
+        for label in ('Total RAM', 'Free RAM', 'Used RAM', 'Lost RAM'):
+            if stripped.startswith(label + ':'):
+                value = stripped[len(label) + 1:].split()[0]
+                meminfo[label.lower().replace(' ', '_') + '_kb'] = parse_number(value)
+    return meminfo
+
+def parse_dumpsys_cpuinfo(output):
+    # "Load: 1.2 / 0.9 / 0.8", then "12% 1234/system_server: 8% user + 4% kernel"
+    # per process and a closing "25% TOTAL: ..." line.
+    cpuinfo = {'load': None, 'total_percent': None, 'processes': []}
+    for line in output.splitlines():
+        stripped = line.strip()
+        if stripped.startswith('Load:'):
+            cpuinfo['load'] = [parse_number(value) for value in stripped[5:].split('/')]
+            continue
+        percent, _, rest = stripped.partition('% ')
+        percent = parse_number(percent.lstrip('+-'))
+        if not isinstance(percent, (int, float)) or ': ' not in rest:
+            continue
+        name = rest.partition(': ')[0]
+        if name == 'TOTAL':
+            cpuinfo['total_percent'] = percent
+            continue
+        pid, _, process = name.partition('/')
+        if pid.isdigit():
+            cpuinfo['processes'].append({'percent': percent, 'pid': int(pid), 'name': process})
+    return cpuinfo
+
+def activity_component(record):
+    # ActivityRecord{8a1b2c u0 com.example/.MainActivity t42} -> com.example/.MainActivity
+    for field in record.split():
+        if '/' in field and not field.startswith('{'):
+            return field.rstrip('}')
+    return None
+
+def parse_dumpsys_activity(output):
+    activity = {'resumed': None, 'tasks': []}
+    for line in output.splitlines():
+        stripped = line.strip()
+        if activity['resumed'] is None and ('ResumedActivity' in stripped) and 'ActivityRecord{' in stripped:
+            activity['resumed'] = activity_component(stripped.partition('ActivityRecord{')[2])
+        elif stripped.startswith('* Task{') or stripped.startswith('* TaskRecord{'):
+            fields = stripped.split()
+            task = {'id': None, 'affinity': None, 'visible': None}
+            for field in fields:
+                if field.startswith('#') and field[1:].isdigit():
+                    task['id'] = int(field[1:])
+                elif field.startswith('A=') or field.startswith('A:'):
+                    task['affinity'] = field[2:].partition(':')[2] or field[2:]
+                elif field.startswith('visible='):
+                    task['visible'] = field[8:] == 'true'
+            activity['tasks'].append(task)
+    return activity
+
+PACKAGE_DUMP_FIELDS = {'versionCode': int, 'minSdk': int, 'targetSdk': int, 'userId': int, 'appId': int,
+                      'versionName': str, 'codePath': str, 'dataDir': str, 'installerPackageName': str}
+
+def parse_dumpsys_package(output):
+    # Only the first package record is parsed; permissions are split into the
+    # requested list and the granted install and runtime permissions.
+    package = {'requested_permissions': [], 'granted_permissions': []}
+    block = None
+    for line in output.splitlines():
+        stripped = line.strip()
+        if stripped.endswith('permissions:'):
+            block = stripped[:-1]
+            continue
+        if block == 'requested permissions' and line.startswith('      ') and stripped:
+            package['requested_permissions'].append(stripped.split(':')[0])
+            continue
+        if block in ('install permissions', 'runtime permissions') and ': granted=' in stripped:
+            if 'granted=true' in stripped:
+                package['granted_permissions'].append(stripped.split(':')[0])
+            continue
+        block = None
+        if stripped.startswith(('firstInstallTime=', 'lastUpdateTime=')):
+            key, _, value = stripped.partition('=')
+            package.setdefault(key, value)
+            continue
+        for field in stripped.split():
+            key, separator, value = field.partition('=')
+            if separator and key in PACKAGE_DUMP_FIELDS and key not in package:
+                package[key] = parse_number(value) if PACKAGE_DUMP_FIELDS[key] is int else value
+    return package
+
+def parse_dumpsys_window(output):
+    window = {'current_focus': None, 'focused_app': None, 'display': None}
+    for line in output.splitlines():
+        stripped = line.strip()
+        if stripped.startswith('mCurrentFocus=') and window['current_focus'] is None:
+            window['current_focus'] = activity_component(stripped.partition('{')[2])
+        elif stripped.startswith('mFocusedApp=') and window['focused_app'] is None:
+            window['focused_app'] = activity_component(stripped.partition('{')[2])
+        elif stripped.startswith('init=') and window['display'] is None:
+            # init=1080x2400 420dpi cur=1080x2400 app=1080x2274 rng=...
+            fields = dict(field.partition('=')[::2] for field in stripped.split() if '=' in field)
+            width, _, height = fields.get('cur', fields['init']).partition('x')
+            density = stripped.split()[1]
+            window['display'] = {'width': int(width), 'height': int(height),
+                                 'density': int(density[:-3]) if density.endswith('dpi') else None}
+    return window
+
+# service name -> (extra dumpsys arguments, parser)
+DUMPSYS_PARSERS = {
+    'battery': ((), parse_dumpsys_battery),
+    'meminfo': ((), parse_dumpsys_meminfo),
+    'cpuinfo': ((), parse_dumpsys_cpuinfo),
+    'activity': (('activities',), parse_dumpsys_activity),
+    'package': ((), parse_dumpsys_package),
+    'window': (('displays',), parse_dumpsys_window),
+}
+
+
+class DumpsysCache:
+    # Fetches one dumpsys service at a time instead of the whole system dump
+    # and keeps the text for a few seconds, so menus that look at the same
+    # service repeatedly in one session only pay for it once.
+    def __init__(self, client, pool, ttl=DUMPSYS_TTL):
+        self.client = client
+        self.pool = pool
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def _cached(self, key, fetch, refresh):
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry and not refresh and time.monotonic() - entry[0] < self.ttl:
+            return entry[1]
+        value = fetch()
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+        return value
+
+    def services(self, serial=None, refresh=False):
+        serial = self.client.get_serial(serial)
+        return self._cached((serial, '-l'), lambda: parse_dumpsys_services(
+            self.pool.run(['dumpsys', '-l'], serial, check=True).stdout), refresh)
+
+    def text(self, service, serial=None, args=(), refresh=False):
+        serial = self.client.get_serial(serial)
+        command = ['dumpsys', service] + list(args)
+        return self._cached((serial, service) + tuple(args),
+                            lambda: self.pool.run(command, serial, check=True).stdout, refresh)
+
+    def parsed(self, service, serial=None, args=None, refresh=False):
+        default_args, parser = DUMPSYS_PARSERS[service]
+        return parser(self.text(service, serial, default_args if args is None else args, refresh))
+
+    def package(self, name, serial=None, refresh=False):
+        return self.parsed('package', serial, (name,), refresh)
+
+    def invalidate(self, serial=None, service=None):
+        serial = self.client.get_serial(serial)
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == serial and service in (None, key[1])]:
+                del self._entries[key]
+
+
+instrumentation = Instrumentation()
+adb_client = AdbClient(instrumentation=instrumentation)
+shell_pool = ShellSessionPool(adb_client)
+device_profiles = DeviceProfileCache(adb_client)
+package_index = PackageIndex(adb_client)
+file_index = RemoteFileIndex(adb_client, shell_pool)
+device_tracker = DeviceTracker(adb_client)
+dumpsys_cache = DumpsysCache(adb_client, shell_pool)
+
+def drop_device_sessions(event, device, previous):
+    # Pooled shells to an unplugged device are dead; do not hand them out again.
+    if event == 'disconnected' or device['state'] != 'device':
+        shell_pool.close_device(device['serial'])
+
+device_tracker.add_listener(drop_device_sessions)
+
+def use_adb_server(host, port):
+    # Points every shared client at another adb server, e.g. a remote one or a stand-in for tests.
+    shell_pool.close_all()
+    device_tracker.stop()
+    adb_client.host = host
+    adb_client.port = port
+
+def get_device_info(device_id, client=None):
+    client = client or adb_client
+    info = {}
+    try:
+        result = client.shell(['dumpsys', 'battery'], device_id, check=True)
+        info['Battery Info'] = result.stdout.strip().split('\n')
+    except socket.timeout:
+        info['Error'] = f"No response within {DEVICE_PROBE_TIMEOUT} seconds."
+    except (AdbError, OSError) as e:
+        info['Error'] = str(e)
+    return info
+
+def print_device_info(device, info):
+    print(f"\nDevice ID: {device}")
+    for key, value in info.items():
+        if key == 'Battery Info':
+            print(f"{key}:")
+            for line in value:
+                print(f"  {line}")
+        else:
+            print(f"{key}: {value}")
+
+def probe_devices(devices, on_result):
+    # Probe every ready device on a bounded thread pool and hand each result
+    # back as soon as it arrives, so one slow phone cannot hold up the rest.
+    probe_client = AdbClient(timeout=DEVICE_PROBE_TIMEOUT, instrumentation=adb_client.instrumentation)
+    ready = []
+    for serial, state in devices:
+        if state == 'device':
+            ready.append(serial)
+        else:
+            on_result(serial, {'Error': f"Device is {state}."})
+    if not ready:
+        return
+    with ThreadPoolExecutor(max_workers=min(DEVICE_PROBE_WORKERS, len(ready))) as executor:
+        futures = {executor.submit(get_device_info, serial, probe_client): serial for serial in ready}
+        for future in as_completed(futures):
+            on_result(futures[future], future.result())
+
+def list_adb_devices():
+    try:
+        devices = device_tracker.devices()
+        
+        if not devices:
+            print("No devices connected. Waiting for one to be attached (press Ctrl+C to cancel)...")
+            device_tracker.wait_for()
+            devices = device_tracker.devices()
+        print("Connected devices:")
+        probe_devices(devices, print_device_info)
+
+        input("\nPress Enter to continue to the device options...")
+        os.system(f'python {os.path.join(os.path.dirname(__file__), "connected.py")}')
+    
+    except KeyboardInterrupt:
+        print("\nStopped waiting for a device.")
+    except AdbError as e:
+        print(f"Error occurred while running adb: {e}")
+    except Exception as e:
+        print(f"An unexpected error occurred: {e}")
+
+def choose_devices():
+    ready = device_tracker.ready()
+    selection = input("Enter device serials separated by spaces, or press Enter for all connected devices: ").split()
+    if not selection:
+        return ready
+    missing = [serial for serial in selection if serial not in ready]
+    if missing:
+        raise AdbError(f"Device(s) not ready: {', '.join(missing)}")
+    return selection
+
+def prompt_package_name(prompt):
+    # Tab-completes from the package index where readline is available, and
+    # offers a numbered pick list when the typed text is not an exact name.
+    try:
+        names = package_index.packages()['names']
+    except AdbError:
+        names = []
+    if readline is not None and names:
+        readline.parse_and_bind('tab: complete')
+        readline.set_completer_delims(' ')
+        readline.set_completer(lambda text, state: ([name for name in names if name.startswith(text)] + [None])[state])
+    try:
+        text = input(prompt).strip()
+    finally:
+        if readline is not None:
+            readline.set_completer(None)
+    if not text or not names or text in names:
+        return text
+    matches = package_index.search(text)[:PACKAGE_MATCHES_SHOWN]
+    if not matches:
+        return text
+    for number, package in enumerate(matches, 1):
+        print(f"[{number}] {package.name}")
+    choice = input("Select a package number, or press Enter to use what you typed: ").strip()
+    if choice.isdigit() and 1 <= int(choice) <= len(matches):
+        return matches[int(choice) - 1].name
+    return text
+
+def clear_screen():
+    os.system('cls' if platform.system() == 'Windows' else 'clear')
+
+def display_banner():
+    banner = """
+ _____                   _    ____  ____  
+| ____|__ _ ___ _   _   / \\  |  _ \\| __ ) 
+|  _| / _` / __| | | | / _ \\ | | | |  _ \\ 
+| |__| (_| \\__ \\ |_| |/ ___ \\| |_| | |_) |
+|_____\\__,_|___/\\__, /_/   \\_\\____/|____/ 
+                |___/                     
+By: Awiones
+    """
+    print(banner)
+
+def display_menu():
+    clear_screen()
+    display_banner()
+    menu = """
+[1] Device Management
+[2] App Management
+[3] File Management
+[4] System Management
+[5] Shell and Command Execution
+[6] Screen Management
+[7] Network Management
+[8] Data Management
+[9] Development and Testing
+[10] Root Access and File Permissions
+[11] Remote Control
+[12] Power Management
+[13] Permissions and Security
+[14] Battery Management
+[15] Advanced Usage
+[0] Exit
+    """
+    print(menu)
+
+
+def device_management():
+    while True:
+        clear_screen()
+        display_banner()
+        print("Device Management")
+        menu = """
+[1] Lists all the connected Android devices and emulators.
+[2] Connects to a device over Wi-Fi.
+[3] Disconnects from a device.
+[4] Pairs a device with ADB over Wi-Fi (Android 11 and above).
+[5] Watch devices connect and disconnect live.
+[6] Discover wireless devices (mDNS or a subnet scan) and connect to them.
+[0] Return to the main menu.
+        """
+        print(menu)
+        choice = input("Select an option: ").strip()
+        
+        if choice == "1":
+            list_adb_devices()
+            input("\nPress Enter to return to the Device Management menu...")
+        elif choice == "2":
+            connect_over_wifi()
+        elif choice == "3":
+            disconnect_device()
+        elif choice == "4":
+            pair_device_over_wifi()
+        elif choice == "5":
+            watch_devices()
+        elif choice == "6":
+            discover_and_connect()
+        elif choice == "0":
+            break
+        else:
+            print("Invalid option, please select again.")
+
+DEVICE_EVENT_MESSAGES = {
+    'connected': "connected ({state})",
+    'disconnected': "disconnected",
+    'state': "changed from {previous} to {state}",
+}
+
+def watch_devices():
+    clear_screen()
+    print("Watching Devices")
+
+    def report(event, device, previous):
+        message = DEVICE_EVENT_MESSAGES[event].format(state=device['state'],
+                                                      previous=previous['state'] if previous else '')
+        print(f"{time.strftime('%H:%M:%S')}  {device['serial']} {message}")
+    try:
+        devices = device_tracker.devices_long()
+        print(f"{len(devices)} device(s) attached:")
+        for device in devices:
+            print(f"  {device['serial']}\t{device['state']}\t{device.get('model', '')}")
+        print("\nPlug or unplug devices to see events. Press Ctrl+C to stop.\n")
+        device_tracker.add_listener(report)
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            device_tracker.remove_listener(report)
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Device Management menu...")
+
+def connect_over_wifi():
+    clear_screen()
+    print("Connect to a device over Wi-Fi")
+    ip = input("Enter the device IP address: ").strip()
+    try:
+        adb_client.service_output('tcpip:5555')
+        adb_client.connect_device(ip if ':' in ip else f"{ip}:5555")
+        print(f"Successfully connected to {ip}.")
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Device Management menu...")
+
+def disconnect_device():
+    clear_screen()
+    print("Disconnect a device")
+    ip = input("Enter the device IP address to disconnect: ").strip()
+    try:
+        # Otherwise a device connected in bulk would be reconnected right away.
+        wireless_connector.forget(ip)
+        adb_client.disconnect_device(ip)
+        print(f"Successfully disconnected from {ip}.")
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Device Management menu...")
+
+def pair_device_over_wifi():
+    clear_screen()
+    print("Pair a device with ADB over Wi-Fi (Android 11 and above)")
+    ip = input("Enter the device IP address: ").strip()
+    pairing_code = input("Enter the pairing code: ").strip()
+    try:
+        adb_client.pair_device(ip, pairing_code)
+        print(f"Successfully paired with {ip}.")
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Device Management menu...")
+
+def parse_targets(text, port=WIFI_DEFAULT_PORT):
+    # "192.168.1.0/24", "192.168.1.20-80", "10.0.0.7" or "10.0.0.7:5556",
+    # separated by commas or spaces, into a list of (host, port).
+    targets = []
+    for item in text.replace(',', ' ').split():
+        host, _, item_port = item.partition(':') if item.count(':') == 1 else (item, '', '')
+        item_port = int(item_port) if item_port else port
+        if '/' in host:
+            network = ipaddress.ip_network(host, strict=False)
+            if network.num_addresses > WIFI_MAX_TARGETS:
+                raise ValueError(f"{host} has {network.num_addresses} addresses; scan at most {WIFI_MAX_TARGETS}.")
+            hosts = network.hosts() if network.num_addresses > 2 else network
+        elif '-' in host:
+            first, _, last = host.partition('-')
+            start = ipaddress.ip_address(first)
+            end = ipaddress.ip_address(last) if '.' in last else ipaddress.ip_address(first.rsplit('.', 1)[0] + '.' + last)
+            if int(end) < int(start) or int(end) - int(start) >= WIFI_MAX_TARGETS:
+                raise ValueError(f"Invalid address range: {host}")
+            hosts = (ipaddress.ip_address(number) for number in range(int(start), int(end) + 1))
+        else:
+            hosts = [ipaddress.ip_address(host)]
+        targets += [(str(address), item_port) for address in hosts]
+    if len(targets) > WIFI_MAX_TARGETS:
+        raise ValueError(f"{len(targets)} addresses to scan; scan at most {WIFI_MAX_TARGETS}.")
+    return targets
+
+def adb_handshake_packet():
+    # A bare CNXN message, as an adb host sends first. adbd answers with
+    # CNXN, AUTH or STLS; it shows no prompt until a key is offered.
+    payload = b'host::\0'
+    command = struct.unpack('<I', b'CNXN')[0]
+    return struct.pack('<6I', command, 0x01000001, 256 * 1024, len(payload), sum(payload),
+                       command ^ 0xffffffff) + payload
+
+ADB_HANDSHAKE_REPLIES = {b'CNXN': 'ready', b'AUTH': 'needs authorization', b'STLS': 'tls'}
+
+async def probe_adb_port(host, port, limit, timeout=WIFI_PROBE_TIMEOUT):
+    # Returns the handshake reply of an adbd listening there, or None.
+    async with limit:
+        try:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        except (OSError, asyncio.TimeoutError):
+            return None
+        try:
+            writer.write(adb_handshake_packet())
+            header = await asyncio.wait_for(reader.readexactly(24), timeout)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+            return None
+        finally:
+            writer.close()
+        return ADB_HANDSHAKE_REPLIES.get(header[:4])
+
+async def scan_targets(targets, concurrency=WIFI_PROBE_CONCURRENCY, timeout=WIFI_PROBE_TIMEOUT):
+    # Connection attempts overlap on one event loop; the semaphore bounds
+    # the sockets open at once so a /22 does not exhaust file descriptors.
+    limit = asyncio.Semaphore(concurrency)
+    replies = await asyncio.gather(*(probe_adb_port(host, port, limit, timeout) for host, port in targets))
+    return [{'address': f"{host}:{port}", 'source': 'scan', 'detail': reply}
+            for (host, port), reply in zip(targets, replies) if reply]
+
+def discover_wireless_devices(targets=(), use_mdns=True, client=None):
+    client = client or adb_client
+    found = {}
+    if use_mdns:
+        for service in client.mdns_services():
+            # Pairing services need a code first; see pair_device_over_wifi.
+            if service['type'].startswith('_adb-tls-pairing'):
+                continue
+            found[service['address']] = {'address': service['address'], 'source': 'mdns', 'detail': service['name']}
+    if targets:
+        for device in asyncio.run(scan_targets(targets)):
+            found.setdefault(device['address'], device)
+    return sorted(found.values(), key=lambda device: device['address'])
+
+
+class WirelessConnector:
+    # Connects many network devices through the adb server, a bounded
+    # number at a time, retrying each with exponential backoff. Addresses
+    # it connected are watched: when one drops off or goes offline it is
+    # reconnected in the background with the same backoff.
+    def __init__(self, client, tracker, parallel=WIFI_CONNECT_PARALLEL, attempts=WIFI_CONNECT_ATTEMPTS,
+                 backoff=WIFI_BACKOFF_BASE, max_backoff=WIFI_BACKOFF_MAX):
+        self.client = client
+        self.tracker = tracker
+        self.parallel = parallel
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.watched = set()
+        self._reconnecting = set()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        tracker.add_listener(self._on_device)
+
+    def connect(self, address, on_progress=None):
+        # Returns (ok, message, attempts used); retries stop early once stopped.
+        message = ''
+        for attempt in range(self.attempts):
+            try:
+                message = self.client.connect_device(address)
+                return True, message, attempt + 1
+            except (AdbError, OSError) as e:
+                message = str(e)
+            if attempt + 1 < self.attempts:
+                delay = min(self.max_backoff, self.backoff * 2 ** attempt)
+                if on_progress:
+                    on_progress(address, f"attempt {attempt + 1} failed ({message}); retrying in {delay:g}s")
+                if self._stopped.wait(delay):
+                    break
+        return False, message, attempt + 1
+
+    def connect_all(self, addresses, watch=True, on_progress=None):
+        addresses = list(dict.fromkeys(addresses))
+        if not addresses:
+            return []
+        self._stopped.clear()
+
+        def connect_one(address):
+            ok, message, attempts = self.connect(address, on_progress)
+            if ok and watch:
+                with self._lock:
+                    self.watched.add(address)
+            if on_progress:
+                on_progress(address, 'connected' if ok else 'failed')
+            return {'address': address, 'ok': ok, 'message': message, 'attempts': attempts}
+        with ThreadPoolExecutor(max_workers=min(self.parallel, len(addresses))) as executor:
+            return list(executor.map(connect_one, addresses))
+
+    def _on_device(self, event, device, previous):
+        address = device['serial']
+        if address not in self.watched or (event != 'disconnected' and device['state'] == 'device'):
+            return
+        with self._lock:
+            if address in self._reconnecting:
+                return
+            self._reconnecting.add(address)
+        # Listeners run on the tracker thread, which must not wait out a backoff.
+        threading.Thread(target=self._reconnect, args=(address,), daemon=True).start()
+
+    def _reconnect(self, address):
+        try:
+            # The server answers "already connected" for an offline entry, so drop it first.
+            with contextlib.suppress(AdbError, OSError):
+                self.client.disconnect_device(address)
+            ok, _, _ = self.connect(address)
+            if not ok:
+                with self._lock:
+                    self.watched.discard(address)
+        finally:
+            with self._lock:
+                self._reconnecting.discard(address)
+
+    def forget(self, address):
+        # Stops watching an address the user disconnects on purpose; adb
+        # takes a bare host to mean the default port.
+        with self._lock:
+            self.watched.discard(address)
+            self.watched.discard(address if ':' in address else f"{address}:{WIFI_DEFAULT_PORT}")
+
+    def stop(self):
+        self._stopped.set()
+        with self._lock:
+            self.watched.clear()
+
+
+wireless_connector = WirelessConnector(adb_client, device_tracker)
+
+def print_connect_summary(results):
+    print(f"\n{'Address':<24} {'Result':<8} {'Tries':>5}  Message")
+    for result in sorted(results, key=lambda result: result['address']):
+        print(f"{result['address']:<24} {'OK' if result['ok'] else 'FAILED':<8} {result['attempts']:>5}  {result['message']}")
+    print(f"\n{sum(result['ok'] for result in results)} of {len(results)} device(s) connected.")
+
+def discover_and_connect():
+    clear_screen()
+    print("Discover and Connect Wireless Devices")
+    text = input("Enter addresses to scan (e.g. 192.168.1.0/24 or 192.168.1.20-80), "
+                 "or press Enter to use mDNS only: ").strip()
+    try:
+        targets = parse_targets(text)
+        print("Searching...")
+        start = time.perf_counter()
+        devices = discover_wireless_devices(targets)
+        print(f"Found {len(devices)} device(s) in {time.perf_counter() - start:.1f} seconds"
+              f"{f' ({len(targets)} addresses scanned)' if targets else ''}.")
+        for device in devices:
+            print(f"  {device['address']:<24} {device['source']:<5} {device['detail']}")
+        if devices and input("\nConnect to all of them? (y/n): ").strip().lower() == 'y':
+            device_tracker.start()
+            results = wireless_connector.connect_all(
+                [device['address'] for device in devices],
+                on_progress=lambda address, status: print(f"{address}: {status}"))
+            print_connect_summary(results)
+            print("Connected devices are reconnected automatically if they drop off while EasyADB runs.")
+    except (AdbError, OSError, ValueError) as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Device Management menu...")
+
+def app_management():
+    while True:
+        clear_screen()
+        display_banner()
+        print("App Management")
+        menu = """
+[1] Install an APK file.
+[2] Uninstall an app.
+[3] Install multiple APKs.
+[4] Reinstall an app, keeping its data.
+[5] Install APKs on several devices in parallel.
+[0] Return to the main menu.
+        """
+        print(menu)
+        choice = input("Select an option: ").strip()
+
+        if choice == "1":
+            install_apk()
+        elif choice == "2":
+            uninstall_app()
+        elif choice == "3":
+            install_multiple_apks()
+        elif choice == "4":
+            reinstall_apk()
+        elif choice == "5":
+            install_on_devices_menu()
+        elif choice == "0":
+            break
+        else:
+            print("Invalid option, please select again.")
+
+def parse_string_pool(data, offset):
+    string_count, _, flags, strings_start = struct.unpack_from('<IIII', data, offset + 8)
+    offsets = struct.unpack_from(f'<{string_count}I', data, offset + 28)
+    strings = []
+    for string_offset in offsets:
+        position = offset + strings_start + string_offset
+        if flags & 0x100:
+            position += 2 if data[position] & 0x80 else 1
+            length = data[position]
+            if length & 0x80:
+                length = ((length & 0x7f) << 8) | data[position + 1]
+                position += 1
+            position += 1
+            strings.append(data[position:position + length].decode('utf-8', errors='replace'))
+        else:
+            length = struct.unpack_from('<H', data, position)[0]
+            position += 2
+            if length & 0x8000:
+                length = ((length & 0x7fff) << 16) | struct.unpack_from('<H', data, position)[0]
+                position += 2
+            strings.append(data[position:position + length * 2].decode('utf-16-le', errors='replace'))
+    return strings
+
+def read_apk_manifest(apk_path):
+    # Package name and versionCode from the binary AndroidManifest.xml.
+    with zipfile.ZipFile(apk_path) as apk:
+        data = apk.read('AndroidManifest.xml')
+    strings, resource_ids = [], []
+    offset = 8
+    while offset < len(data):
+        chunk_type, _, chunk_size = struct.unpack_from('<HHI', data, offset)
+        if chunk_type == 0x0001:
+            strings = parse_string_pool(data, offset)
+        elif chunk_type == 0x0180:
+            resource_ids = struct.unpack_from(f'<{(chunk_size - 8) // 4}I', data, offset + 8)
+        elif chunk_type == 0x0102:
+            attribute_start, attribute_size, attribute_count = struct.unpack_from('<HHH', data, offset + 24)
+            package, version_code = None, 0
+            for index in range(attribute_count):
+                position = offset + 16 + attribute_start + index * attribute_size
+                _, name, raw_value, _, _, data_type, value = struct.unpack_from('<IIIHBBI', data, position)
+                resource_id = resource_ids[name] if name < len(resource_ids) else None
+                if strings[name] == 'package':
+                    package = strings[raw_value] if raw_value != 0xFFFFFFFF else strings[value]
+                elif resource_id == ANDROID_ATTR_VERSION_CODE or strings[name] == 'versionCode':
+                    version_code = value if data_type != 3 else int(strings[value])
+            return package, version_code
+        offset += chunk_size
+    raise ValueError(f"{apk_path} has no manifest element")
+
+def installed_apk_state(package, serial=None):
+    command = (f"p=$(pm path {shlex.quote(package)} 2>/dev/null | head -n 1); p=${{p#package:}}; "
+               f"[ -n \"$p\" ] || exit 0; echo \"path=$p\"; sha1sum \"$p\"; "
+               f"dumpsys package {shlex.quote(package)} | grep -m 1 versionCode=")
+    state = {}
+    for line in shell_pool.run(command, serial).stdout.splitlines():
+        line = line.strip()
+        if line.startswith('path='):
+            state['path'] = line[len('path='):]
+        elif line.startswith('versionCode='):
+            state['version_code'] = int(line.split()[0].split('=')[1])
+        elif 'path' in state and 'sha1' not in state and line.endswith(state['path']):
+            state['sha1'] = line.split()[0]
+    return state if 'sha1' in state else None
+
+def cached_apk_path(package, sha1):
+    return os.path.join(APK_CACHE_DIR, f"{package}-{sha1}.apk")
+
+def remember_installed_apk(apk_path, package, sha1):
+    # Keep a copy of what was installed so a later delta install knows the device's exact bytes.
+    try:
+        os.makedirs(APK_CACHE_DIR, exist_ok=True)
+        target = cached_apk_path(package, sha1)
+        if not os.path.exists(target):
+            with open(apk_path, 'rb') as source, open(target + '.tmp', 'wb') as copy:
+                for block in iter(lambda: source.read(1024 * 1024), b''):
+                    copy.write(block)
+            os.replace(target + '.tmp', target)
+        os.utime(target)
+        cached = sorted((name for name in os.listdir(APK_CACHE_DIR) if name.startswith(package + '-')),
+                        key=lambda name: os.path.getmtime(os.path.join(APK_CACHE_DIR, name)))
+        for name in cached[:-APK_CACHE_KEEP]:
+            os.remove(os.path.join(APK_CACHE_DIR, name))
+    except OSError:
+        pass
+
+def zip_entry_ranges(apk_path):
+    ranges = []
+    with zipfile.ZipFile(apk_path) as apk, open(apk_path, 'rb') as apk_file:
+        for info in apk.infolist():
+            apk_file.seek(info.header_offset + 26)
+            name_length, extra_length = struct.unpack('<HH', apk_file.read(4))
+            start = info.header_offset + 30 + name_length + extra_length
+            ranges.append((info.filename, info.CRC, info.compress_size, start))
+    return sorted(ranges, key=lambda entry: entry[3])
+
+def plan_apk_delta(old_path, new_path):
+    # Rebuild new_path as a list of byte ranges: zip entries whose CRC and size
+    # match are copied from the APK already on the device, everything else
+    # (changed entries, headers, signing block, central directory) is patched in.
+    old_entries = {name: (crc, size, start) for name, crc, size, start in zip_entry_ranges(old_path)}
+    segments = []
+    patch = bytearray()
+
+    def add_segment(source, offset, length):
+        if length <= 0:
+            return
+        if segments and segments[-1][0] == source and segments[-1][1] + segments[-1][2] == offset:
+            segments[-1] = (source, segments[-1][1], segments[-1][2] + length)
+        else:
+            segments.append((source, offset, length))
+
+    with open(new_path, 'rb') as new_file:
+        def add_patch(start, end):
+            new_file.seek(start)
+            add_segment('patch', len(patch), end - start)
+            patch.extend(new_file.read(end - start))
+
+        position = 0
+        for name, crc, size, start in zip_entry_ranges(new_path):
+            old = old_entries.get(name)
+            if old and size and old[0] == crc and old[1] == size:
+                add_patch(position, start)
+                add_segment('old', old[2], size)
+                position = start + size
+        add_patch(position, os.path.getsize(new_path))
+    return segments, bytes(patch)
+
+def delta_install(apk_path, package, sha1, state, serial=None, options=()):
+    segments, patch = plan_apk_delta(cached_apk_path(package, state['sha1']), apk_path)
+    patch_path = '/data/local/tmp/easyadb-delta.patch'
+    target_path = '/data/local/tmp/easyadb-delta.apk'
+    with adb_client.sync(serial) as sync:
+        sync.push_stream(io.BytesIO(patch), patch_path)
+    sources = {'old': shlex.quote(state['path']), 'patch': patch_path}
+    parts = [f"tail -c +{offset + 1} {sources[source]} | head -c {length}" for source, offset, length in segments]
+    try:
+        output = shell_pool.run(f"{{ {'; '.join(parts)}; }} > {target_path} && sha1sum {target_path}", serial).stdout
+        if not output.startswith(sha1):
+            return None
+        result = shell_pool.run(['pm', 'install'] + list(options) + [target_path], serial)
+        if 'Success' not in result.stdout:
+            raise AdbError(result.stdout.strip())
+        return len(patch)
+    finally:
+        shell_pool.run(['rm', '-f', patch_path, target_path], serial)
+
+def install_if_changed(apk_path, serial=None, options=(), delta=False):
+    # Returns 'skipped', 'delta' or 'installed'.
+    sha1 = file_sha1(apk_path)
+    try:
+        package, version_code = read_apk_manifest(apk_path)
+    except (KeyError, ValueError, IndexError, struct.error, zipfile.BadZipFile):
+        package = None
+    state = installed_apk_state(package, serial) if package else None
+    if state and state['sha1'] == sha1 and state.get('version_code') == version_code:
+        return 'skipped'
+    mode = 'installed'
+    if delta and state and os.path.exists(cached_apk_path(package, state['sha1'])):
+        if delta_install(apk_path, package, sha1, state, serial, options) is not None:
+            mode = 'delta'
+    if mode == 'installed':
+        adb_client.install(apk_path, serial, options)
+    if package:
+        remember_installed_apk(apk_path, package, sha1)
+    return mode
+
+INSTALL_MESSAGES = {
+    'skipped': "The same build is already installed, skipped the transfer.",
+    'delta': "APK installed successfully (delta transfer).",
+}
+
+def install_apk():
+    clear_screen()
+    print("Install APK")
+    apk_path = input("Enter the path to the APK file: ").strip()
+    delta = input("Send only changed zip entries when possible (delta mode)? (y/n): ").strip().lower() == 'y'
+    try:
+        mode = install_if_changed(apk_path, delta=delta)
+        package_index.invalidate()
+        print(INSTALL_MESSAGES.get(mode, "APK installed successfully."))
+    except (AdbError, OSError) as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the App Management menu...")
+
+def uninstall_app():
+    clear_screen()
+    print("Uninstall App")
+    package_name = prompt_package_name("Enter the package name of the app to uninstall: ")
+    try:
+        adb_client.shell(['pm', 'uninstall', package_name], check=True)
+        package_index.invalidate()
+        print("App uninstalled successfully.")
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the App Management menu...")
+
+def install_multiple_apks():
+    clear_screen()
+    print("Install Multiple APKs")
+    apks = input("Enter the paths to the APK files separated by spaces: ").strip().split()
+    try:
+        adb_client.install_multiple(apks)
+        package_index.invalidate()
+        print("Multiple APKs installed successfully.")
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the App Management menu...")
+
+def reinstall_apk():
+    clear_screen()
+    print("Reinstall APK")
+    apk_path = input("Enter the path to the APK file: ").strip()
+    delta = input("Send only changed zip entries when possible (delta mode)? (y/n): ").strip().lower() == 'y'
+    try:
+        mode = install_if_changed(apk_path, options=['-r'], delta=delta)
+        package_index.invalidate()
+        print(INSTALL_MESSAGES.get(mode, "APK reinstalled successfully."))
+    except (AdbError, OSError) as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the App Management menu...")
+
+def usb_hub_of(device):
+    # "usb:1-4.2" sits on hub "1-4"; network and emulator devices share one group.
+    usb = device.get('usb')
+    if not usb:
+        return 'network'
+    return usb.rsplit('.', 1)[0] if '.' in usb else usb.rsplit('-', 1)[0]
+
+def install_on_devices(apk_paths, serials, options=(), on_progress=None):
+    contents = {}
+    for apk_path in apk_paths:
+        with open(apk_path, 'rb') as apk_file:
+            contents[apk_path] = apk_file.read()
+    hubs = {device['serial']: usb_hub_of(device) for device in device_tracker.devices_long()}
+    hub_limits = {hub: threading.Semaphore(INSTALLS_PER_HUB) for hub in set(hubs.values()) | {'network'}}
+
+    def install_one(serial):
+        hub = hubs.get(serial, 'network')
+        with hub_limits[hub]:
+            if on_progress:
+                on_progress(serial, 'installing')
+            start = time.perf_counter()
+            try:
+                if len(apk_paths) == 1:
+                    adb_client.install(apk_paths[0], serial, options, contents)
+                else:
+                    adb_client.install_multiple(apk_paths, serial, options, contents)
+                reason = None
+            except (AdbError, OSError) as e:
+                reason = str(e) or e.__class__.__name__
+            package_index.invalidate(serial)
+            result = {'serial': serial, 'hub': hub, 'ok': reason is None, 'reason': reason,
+                      'duration': time.perf_counter() - start}
+        if on_progress:
+            on_progress(serial, 'Success' if result['ok'] else 'Failed')
+        return result
+
+    if not serials:
+        return []
+    with ThreadPoolExecutor(max_workers=len(serials)) as executor:
+        return list(executor.map(install_one, serials))
+
+def print_install_summary(results):
+    print(f"\n{'Device':<24} {'Hub':<10} {'Result':<8} {'Seconds':>8}  Reason")
+    for result in sorted(results, key=lambda result: result['serial']):
+        status = 'OK' if result['ok'] else 'FAILED'
+        print(f"{result['serial']:<24} {result['hub']:<10} {status:<8} {result['duration']:>8.2f}  {result['reason'] or ''}")
+    succeeded = sum(result['ok'] for result in results)
+    print(f"\n{succeeded} of {len(results)} device(s) installed successfully.")
+
+def install_on_devices_menu():
+    clear_screen()
+    print("Install APKs on Several Devices")
+    apks = input("Enter the APK file, or the split APK files separated by spaces: ").strip().split()
+    reinstall = input("Keep existing app data (reinstall)? (y/n): ").strip().lower() == 'y'
+    try:
+        serials = choose_devices()
+        start = time.perf_counter()
+        results = install_on_devices(apks, serials, ['-r'] if reinstall else [],
+                                     lambda serial, status: print(f"{serial}: {status}"))
+        print_install_summary(results)
+        print(f"Total time: {time.perf_counter() - start:.2f} seconds.")
+    except (AdbError, OSError) as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the App Management menu...")
+
+
+def file_management():
+    while True:
+        clear_screen()
+        display_banner()
+        print("File Management")
+        menu = """
+[1] Push a file to the device.
+[2] Pull a file from the device.
+[3] Delete files on the device (a path or a pattern such as /sdcard/Download/*.tmp).
+[4] Sync a directory to or from the device.
+[5] Browse files on the device.
+[6] Change permissions of files matching a pattern.
+[7] Pull files matching a pattern.
+[0] Return to the main menu.
+        """
+        print(menu)
+        choice = input("Select an option: ").strip()
+
+        if choice == "1":
+            push_file()
+        elif choice == "2":
+            pull_file()
+        elif choice == "3":
+            delete_file()
+        elif choice == "4":
+            sync_directory_menu()
+        elif choice == "5":
+            browse_device_files()
+        elif choice == "6":
+            chmod_matching_files()
+        elif choice == "7":
+            pull_matching_files()
+        elif choice == "0":
+            break
+        else:
+            print("Invalid option, please select again.")
+
+def push_file():
+    clear_screen()
+    print("Push File to Device")
+    local_path = input("Enter the local file path: ").strip()
+    remote_path = input("Enter the remote path on the device: ").strip()
+    try:
+        adb_client.push(local_path, remote_path)
+        file_index.invalidate(root=remote_path)
+        print("File pushed successfully.")
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the File Management menu...")
+
+def pull_file():
+    clear_screen()
+    print("Pull File from Device")
+    remote_path = input("Enter the remote file path on the device: ").strip()
+    local_path = input("Enter the local path to save the file: ").strip()
+    try:
+        adb_client.pull(remote_path, local_path)
+        print("File pulled successfully.")
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the File Management menu...")
+
+def delete_file():
+    clear_screen()
+    print("Delete Files on Device")
+    remote_path = input("Enter the remote file path or pattern to delete: ").strip()
+    try:
+        if not any(char in remote_path for char in '*?['):
+            shell_pool.run(['rm', remote_path], check=True)
+            file_index.invalidate(root=remote_path)
+            print("File deleted successfully.")
+        elif confirm_matches(remote_path, "Delete"):
+            paths, errors = file_index.delete(remote_path)
+            print_batch_result("Deleted", paths, errors)
+    except (AdbError, ValueError) as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the File Management menu...")
+
+def format_remote_file(entry):
+    modified = time.strftime('%Y-%m-%d %H:%M', time.localtime(entry.mtime))
+    return f"{stat.filemode(entry.mode)} {entry.size:>12} {modified}  {entry.path}"
+
+def confirm_matches(pattern, action):
+    matches = file_index.glob(pattern)
+    if not matches:
+        print(f"Nothing on the device matches {pattern}.")
+        return False
+    for entry in matches[:FILE_MATCHES_SHOWN]:
+        print(format_remote_file(entry))
+    if len(matches) > FILE_MATCHES_SHOWN:
+        print(f"... and {len(matches) - FILE_MATCHES_SHOWN} more.")
+    return input(f"\n{action} these {len(matches)} item(s)? (y/n): ").strip().lower() == 'y'
+
+def print_batch_result(action, paths, errors):
+    for line in errors:
+        print(line)
+    print(f"{action} {len(paths)} item(s) in one shell invocation{' with errors' if errors else ''}.")
+
+def browse_device_files():
+    directory = '/sdcard'
+    refresh = False
+    while True:
+        clear_screen()
+        print(f"Browsing {directory}\n")
+        try:
+            entries = sorted(file_index.children(directory, refresh=refresh),
+                             key=lambda entry: (not stat.S_ISDIR(entry.mode), entry.path))
+        except AdbError as e:
+            print(f"Error occurred: {e}")
+            input("\nPress Enter to return to the File Management menu...")
+            return
+        refresh = False
+        for entry in entries:
+            print(format_remote_file(entry))
+        if not entries:
+            print("(empty)")
+        choice = input("\nEnter a directory name or path to open, '..' to go up, 'r' to refresh, "
+                       "or press Enter to return: ").strip()
+        if not choice:
+            return
+        if choice == 'r':
+            refresh = True
+        else:
+            directory = posixpath.normpath(posixpath.join(directory, choice))
+
+def chmod_matching_files():
+    clear_screen()
+    print("Change Permissions of Matching Files")
+    pattern = input("Enter a path pattern (e.g. /data/local/tmp/**/*.sh): ").strip()
+    mode = input("Enter the new mode (e.g. 755 or u+x): ").strip()
+    recursive = input("Apply to directory contents too? (y/n): ").strip().lower() == 'y'
+    try:
+        if mode and confirm_matches(pattern, f"chmod {mode}"):
+            paths, errors = file_index.chmod(pattern, mode, recursive=recursive)
+            print_batch_result("Changed", paths, errors)
+    except (AdbError, ValueError) as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the File Management menu...")
+
+def pull_matching_files():
+    clear_screen()
+    print("Pull Matching Files")
+    pattern = input("Enter a path pattern (e.g. /sdcard/DCIM/**/*.jpg): ").strip()
+    local_dir = input("Enter the local directory to save them in: ").strip() or '.'
+    try:
+        start = time.perf_counter()
+        matches, received = file_index.pull(pattern, local_dir)
+        print(f"Pulled {len(matches)} file(s) ({received} bytes) in {time.perf_counter() - start:.2f} seconds.")
+    except (AdbError, OSError, ValueError) as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the File Management menu...")
+
+def file_sha1(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as local_file:
+        for block in iter(lambda: local_file.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def build_local_manifest(root):
+    manifest = {}
+    for directory, _, files in os.walk(root):
+        for name in files:
+            path = os.path.join(directory, name)
+            relative = os.path.relpath(path, root).replace(os.sep, '/')
+            info = os.stat(path)
+            manifest[relative] = (info.st_size, int(info.st_mtime))
+    return manifest
+
+def build_remote_manifest(root, serial=None):
+    # Sizes, mtimes and SHA-1s for the whole tree in a single shell invocation.
+    quoted_root = shlex.quote(root)
+    command = (f"cd {quoted_root} 2>/dev/null || exit 0; "
+               "find . -type f -exec stat -c '%s %Y %n' {} +; echo ::sha1; find . -type f -exec sha1sum {} +")
+    manifest = {}
+    hashes = {}
+    in_hashes = False
+    for line in adb_client.shell(command, serial).stdout.splitlines():
+        if line == '::sha1':
+            in_hashes = True
+        elif in_hashes:
+            digest, _, path = line.partition('  ')
+            hashes[path[2:]] = digest
+        elif line:
+            size, mtime, path = line.split(' ', 2)
+            manifest[path[2:]] = (int(size), int(mtime))
+    return {path: (size, mtime, hashes.get(path)) for path, (size, mtime) in manifest.items()}
+
+def diff_manifests(local_root, local_manifest, remote_manifest, source):
+    changed = []
+    source_manifest = local_manifest if source == 'local' else remote_manifest
+    target_manifest = remote_manifest if source == 'local' else local_manifest
+    for path, entry in source_manifest.items():
+        target = target_manifest.get(path)
+        if target is None or target[0] != entry[0]:
+            changed.append(path)
+        elif target[1] != entry[1]:
+            # Same size, different mtime: only the content hash can tell.
+            remote_hash = remote_manifest[path][2]
+            if remote_hash is None or remote_hash != file_sha1(os.path.join(local_root, path)):
+                changed.append(path)
+    extras = [path for path in target_manifest if path not in source_manifest]
+    return sorted(changed), sorted(extras)
+
+def run_batched(command, paths, serial=None):
+    for start in range(0, len(paths), SHELL_BATCH_ARGS):
+        shell_pool.run(command + list(paths[start:start + SHELL_BATCH_ARGS]), serial, check=True)
+
+def sync_directory(local_root, remote_root, direction='push', delete=False, serial=None):
+    local_manifest = build_local_manifest(local_root) if os.path.isdir(local_root) else {}
+    remote_manifest = build_remote_manifest(remote_root, serial)
+    changed, extras = diff_manifests(local_root, local_manifest, remote_manifest,
+                                     'local' if direction == 'push' else 'remote')
+    transferred = 0
+    with adb_client.sync(serial) as sync:
+        for path in changed:
+            local_path = os.path.join(local_root, *path.split('/'))
+            remote_path = posixpath.join(remote_root, path)
+            if direction == 'push':
+                transferred += sync.push(local_path, remote_path)
+            else:
+                os.makedirs(os.path.dirname(local_path), exist_ok=True)
+                transferred += sync.pull(remote_path, local_path)
+                mtime = remote_manifest[path][1]
+                os.utime(local_path, (mtime, mtime))
+    if delete and extras:
+        if direction == 'push':
+            run_batched(['rm', '-f'], [posixpath.join(remote_root, path) for path in extras], serial)
+        else:
+            for path in extras:
+                os.remove(os.path.join(local_root, *path.split('/')))
+    if direction == 'push':
+        file_index.invalidate(serial, remote_root)
+    source_count = len(local_manifest if direction == 'push' else remote_manifest)
+    return {
+        'transferred': len(changed),
+        'unchanged': source_count - len(changed),
+        'deleted': len(extras) if delete else 0,
+        'extras': len(extras),
+        'bytes': transferred,
+    }
+
+def sync_directory_menu():
+    clear_screen()
+    print("Sync a Directory")
+    direction = input("Enter 'push' to sync host to device or 'pull' to sync device to host: ").strip().lower()
+    if direction not in ('push', 'pull'):
+        print("Invalid option.")
+        input("\nPress Enter to return to the File Management menu...")
+        return
+    local_root = input("Enter the local directory: ").strip()
+    remote_root = input("Enter the remote directory on the device: ").strip()
+    delete = input("Delete files that only exist on the destination? (y/n): ").strip().lower() == 'y'
+    try:
+        start = time.perf_counter()
+        summary = sync_directory(local_root, remote_root, direction, delete)
+        print(f"Transferred {summary['transferred']} file(s) ({summary['bytes']} bytes), "
+              f"{summary['unchanged']} unchanged, {summary['deleted']} deleted "
+              f"in {time.perf_counter() - start:.2f} seconds.")
+        if summary['extras'] and not delete:
+            print(f"{summary['extras']} file(s) exist only on the destination and were left in place.")
+    except (AdbError, OSError) as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the File Management menu...")
+
+
+def system_management():
+    while True:
+        clear_screen()
+        display_banner()
+        print("System Management")
+        menu = """
+[1] Stream system logs.
+[2] Save logs to a file.
+[3] Generate a bug report.
+[4] Dump system service information.
+[5] Display real-time system processes.
+[6] Capture logs to rotated, compressed files.
+[7] Monitor device health and export metrics.
+[8] Browse sections of a bug report.
+[0] Return to the main menu.
+        """
+        print(menu)
+        choice = input("Select an option: ").strip()
+
+        if choice == "1":
+            stream_logs()
+        elif choice == "2":
+            save_logs_to_file()
+        elif choice == "3":
+            generate_bug_report()
+        elif choice == "4":
+            dump_system_service_info()
+        elif choice == "5":
+            display_system_processes()
+        elif choice == "6":
+            capture_logs_to_files()
+        elif choice == "7":
+            monitor_device_health()
+        elif choice == "8":
+            browse_bug_report()
+        elif choice == "0":
+            break
+        else:
+            print("Invalid option, please select again.")
+
+def iter_logcat_entries(chunks):
+    # Parses `logcat -B` binary records as they arrive. Only one partial
+    # record is ever buffered, so memory stays flat on multi-day captures.
+    buffer = bytearray()
+    for chunk in chunks:
+        buffer += chunk
+        offset = 0
+        while len(buffer) - offset >= 4:
+            payload_length, header_size = struct.unpack_from('<HH', buffer, offset)
+            header_size = header_size or 20
+            if len(buffer) - offset < header_size + payload_length:
+                break
+            pid, tid, seconds, nanoseconds = struct.unpack_from('<iiII', buffer, offset + 4)
+            payload = bytes(buffer[offset + header_size:offset + header_size + payload_length])
+            offset += header_size + payload_length
+            if not payload:
+                continue
+            tag, _, message = payload[1:].partition(b'\0')
+            yield LogEntry(seconds, nanoseconds, pid, tid, payload[0],
+                           tag.decode(errors='replace'), message.rstrip(b'\0\n').decode(errors='replace'))
+        del buffer[:offset]
+
+def parse_log_filter(spec):
+    # e.g. "tag=ActivityManager,WindowManager priority=W pid=1234"
+    tags, pids, min_priority = None, None, 0
+    for token in spec.split():
+        key, _, value = token.partition('=')
+        if key == 'tag':
+            tags = set(value.split(','))
+        elif key == 'pid':
+            pids = {int(pid) for pid in value.split(',')}
+        elif key == 'priority' and len(value) == 1 and value.upper() in LOG_PRIORITIES:
+            min_priority = LOG_PRIORITIES.index(value.upper())
+        else:
+            raise ValueError(f"unknown filter '{token}'")
+
+    def matches(entry):
+        return (entry.priority >= min_priority
+                and (tags is None or entry.tag in tags)
+                and (pids is None or entry.pid in pids))
+    return matches
+
+def format_log_entry(entry):
+    priority = LOG_PRIORITIES[entry.priority] if entry.priority < len(LOG_PRIORITIES) else '?'
+    stamp = time.strftime('%m-%d %H:%M:%S', time.localtime(entry.seconds))
+    millis = entry.nanoseconds // 1000000
+    return f"{stamp}.{millis:03d} {entry.pid:5d} {entry.tid:5d} {priority} {entry.tag}: {entry.message}"
+
+def open_logcat_stream(serial=None, since=None):
+    command = ['logcat', '-B']
+    if since is not None:
+        seconds, nanoseconds = since
+        command += ['-T', f"{seconds}.{nanoseconds // 1000000:03d}"]
+    return adb_client.open_service(f"exec:{format_shell_command(command)}", serial)
+
+
+class RotatingLogWriter:
+    # Gzip-compressed log files, rolled over by size or age, oldest pruned.
+    def __init__(self, directory, max_bytes=LOG_ROTATE_BYTES, max_seconds=LOG_ROTATE_SECONDS,
+                 keep_files=LOG_KEEP_FILES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.keep_files = keep_files
+        self.file = None
+        self.sequence = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _open(self):
+        self.sequence += 1
+        name = time.strftime('logcat-%Y%m%d-%H%M%S') + f"-{self.sequence:04d}.log.gz"
+        self.file = gzip.open(os.path.join(self.directory, name), 'wt', encoding='utf-8')
+        self.opened_at = time.monotonic()
+        self.written = 0
+        files = sorted(name for name in os.listdir(self.directory) if name.startswith('logcat-'))
+        for old_name in files[:-self.keep_files]:
+            os.remove(os.path.join(self.directory, old_name))
+
+    def write_line(self, line):
+        if self.file is None or self.written >= self.max_bytes or \
+                time.monotonic() - self.opened_at >= self.max_seconds:
+            self.close()
+            self._open()
+        self.file.write(line + '\n')
+        self.written += len(line) + 1
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+def capture_logcat(serial, writer, matches, stop_event, connections):
+    # A reconnect resumes with `-T` at the last timestamp seen, which logcat
+    # rounds down to the millisecond, so the replayed head is skipped here:
+    # everything before that (sec, nsec), and at it, the entries already
+    # seen. Distinct entries sharing that exact timestamp still get through.
+    last_timestamp, seen_at_last = None, Counter()
+    while not stop_event.is_set():
+        try:
+            with open_logcat_stream(serial, last_timestamp) as conn:
+                connections[serial] = conn
+                replayed = Counter(seen_at_last)
+                for entry in iter_logcat_entries(conn.iter_chunks()):
+                    timestamp = (entry.seconds, entry.nanoseconds)
+                    identity = (entry.pid, entry.tid, entry.message)
+                    if last_timestamp is not None and timestamp < last_timestamp:
+                        continue
+                    if timestamp == last_timestamp:
+                        if replayed[identity]:
+                            replayed[identity] -= 1
+                            continue
+                    else:
+                        last_timestamp, seen_at_last = timestamp, Counter()
+                    seen_at_last[identity] += 1
+                    if matches(entry):
+                        writer.write_line(format_log_entry(entry))
+        except (AdbError, OSError):
+            pass
+        # The stream ended (device rebooted or unplugged); resume from the last entry seen.
+        stop_event.wait(LOG_RECONNECT_DELAY)
+    writer.close()
+
+def stream_logs():
+    clear_screen()
+    print("Streaming System Logs")
+    spec = input("Enter filters (e.g., tag=ActivityManager priority=W pid=1234), or press Enter for all logs: ").strip()
+    try:
+        matches = parse_log_filter(spec)
+        with open_logcat_stream() as conn:
+            for entry in iter_logcat_entries(conn.iter_chunks()):
+                if matches(entry):
+                    print(format_log_entry(entry))
+    except ValueError as e:
+        print(f"Invalid filter: {e}")
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    except KeyboardInterrupt:
+        pass
+    input("\nPress Enter to return to the System Management menu...")
+
+def save_logs_to_file():
+    clear_screen()
+    print("Saving Logs to File")
+    try:
+        with open('logcat.txt', 'wb') as log_file:
+            log_file.write(adb_client.exec_out(['logcat', '-d']))
+        print("Logs saved to logcat.txt.")
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the System Management menu...")
+
+def create_bugreport(serial=None, directory='.', on_progress=None):
+    # `bugreportz -p` prints BEGIN:, PROGRESS:done/total and finally OK:path
+    # or FAIL:reason. The finished zip is then pulled over sync straight
+    # into the output file, so it never sits in host memory.
+    remote_path = None
+    with adb_client.open_service('exec:bugreportz -p', serial) as conn:
+        pending = b''
+        for chunk in conn.iter_chunks():
+            *lines, pending = (pending + chunk).split(b'\n')
+            for line in lines:
+                kind, _, value = line.decode(errors='replace').strip().partition(':')
+                if kind == 'PROGRESS' and on_progress:
+                    done, _, total = value.partition('/')
+                    on_progress('generating', int(done), int(total or 100))
+                elif kind == 'OK':
+                    remote_path = value
+                elif kind == 'FAIL':
+                    raise AdbError(f"bugreportz failed: {value}")
+    if not remote_path:
+        raise AdbError("bugreportz finished without reporting a file; the device may be too old for -p.")
+    local_path = os.path.join(directory, posixpath.basename(remote_path))
+    with adb_client.sync(serial) as sync:
+        size = sync.stat(remote_path)[1]
+        received = [0, -1]
+
+        class ProgressFile:
+            # Reports at most once per percent instead of once per sync packet.
+            def write(self, data):
+                local_file.write(data)
+                received[0] += len(data)
+                percent = received[0] * 100 // size if size else 100
+                if on_progress and percent != received[1]:
+                    received[1] = percent
+                    on_progress('pulling', received[0], size)
+        with open(local_path, 'wb') as local_file:
+            sync.pull_stream(remote_path, ProgressFile())
+    return local_path
+
+def print_bugreport_progress(stage, done, total):
+    percent = done * 100 // total if total else 100
+    detail = f" ({done / 2 ** 20:.1f} of {total / 2 ** 20:.1f} MB)" if stage == 'pulling' else ''
+    sys.stdout.write(f"\r{stage.capitalize()}: {percent:3d}%{detail}   ")
+    sys.stdout.flush()
+
+def generate_bug_report():
+    clear_screen()
+    print("Generating Bug Report")
+    try:
+        local_path = create_bugreport(on_progress=print_bugreport_progress)
+        print(f"\nBug report generated: {local_path}.")
+    except AdbError as e:
+        print(f"\nError occurred: {e}")
+    input("\nPress Enter to return to the System Management menu...")
+
+
+class BugreportIndex:
+    # Random access into a bugreport zip. The zip's central directory already
+    # lists every entry; the main text file is scanned once as a stream to
+    # record where each section starts, and that index is saved next to the
+    # zip. Reading a section later decompresses only up to its end.
+    SECTION_PREFIX = b'------ '
+    SERVICE_PREFIX = b'DUMP OF SERVICE '
+
+    def __init__(self, path):
+        self.path = path
+        self.zip = zipfile.ZipFile(path)
+        self.main_entry = self._main_entry()
+        self.sections = self._load() or self._build()
+
+    def close(self):
+        self.zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _main_entry(self):
+        # main_entry.txt names the report text; very old zips just have one bugreport-*.txt.
+        if 'main_entry.txt' in self.zip.namelist():
+            return self.zip.read('main_entry.txt').decode().strip()
+        for name in self.zip.namelist():
+            if posixpath.basename(name).startswith('bugreport') and name.endswith('.txt'):
+                return name
+        raise ValueError(f"{self.path} does not look like a bug report.")
+
+    def _index_path(self):
+        return self.path + '.index.json'
+
+    def _signature(self):
+        info = os.stat(self.path)
+        return [info.st_size, int(info.st_mtime)]
+
+    def _load(self):
+        try:
+            with open(self._index_path()) as index_file:
+                data = json.load(index_file)
+            if data['signature'] == self._signature():
+                return data['sections']
+        except (OSError, ValueError, KeyError):
+            pass
+        return None
+
+    def _build(self):
+        sections = []
+        offset = 0
+        top_level = None
+        with self.zip.open(self.main_entry) as report:
+            for line in report:
+                name = None
+                if line.startswith(self.SECTION_PREFIX) and line.rstrip().endswith(b' ------') \
+                        and b' was the duration of ' not in line:
+                    name = line.rstrip()[7:-7].decode(errors='replace')
+                    top_level = name
+                elif line.startswith(self.SERVICE_PREFIX):
+                    name = f"{top_level} / {line[len(self.SERVICE_PREFIX):].rstrip().rstrip(b':').decode(errors='replace')}"
+                if name:
+                    if sections:
+                        sections[-1]['length'] = offset - sections[-1]['offset']
+                    sections.append({'name': name, 'offset': offset, 'length': None})
+                offset += len(line)
+        if sections:
+            sections[-1]['length'] = offset - sections[-1]['offset']
+        try:
+            with open(self._index_path(), 'w') as index_file:
+                json.dump({'signature': self._signature(), 'sections': sections}, index_file)
+        except OSError:
+            pass
+        return sections
+
+    def entries(self):
+        return [(info.filename, info.file_size, info.compress_size) for info in self.zip.infolist()]
+
+    def find(self, text):
+        text = text.lower()
+        return [section for section in self.sections if text in section['name'].lower()]
+
+    def iter_section(self, section):
+        with self.zip.open(self.main_entry) as report:
+            report.seek(section['offset'])
+            remaining = section['length']
+            while remaining > 0:
+                line = report.readline(remaining)
+                if not line:
+                    return
+                remaining -= len(line)
+                yield line.decode(errors='replace')
+
+
+def browse_bug_report():
+    clear_screen()
+    print("Browsing a Bug Report")
+    path = input("Enter the path to the bug report zip: ").strip()
+    try:
+        with BugreportIndex(path) as report:
+            print(f"{len(report.entries())} zip entries, {len(report.sections)} sections in {report.main_entry}.")
+            while True:
+                query = input("\nEnter part of a section name (e.g., SYSTEM LOG, ANR, dumpsys battery), "
+                              "'entries' to list files, or press Enter to finish: ").strip()
+                if not query:
+                    break
+                if query == 'entries':
+                    for name, size, _ in report.entries():
+                        print(f"{size:>12}  {name}")
+                    continue
+                matches = report.find(query)
+                for number, section in enumerate(matches[:BUGREPORT_SECTION_PREVIEW], 1):
+                    print(f"[{number}] {section['name']} ({section['length']} bytes)")
+                if not matches:
+                    print("No section matches.")
+                    continue
+                choice = input("Select a section to print (default: 1): ").strip() or '1'
+                if choice.isdigit() and 1 <= int(choice) <= len(matches):
+                    for line in report.iter_section(matches[int(choice) - 1]):
+                        sys.stdout.write(line)
+    except (OSError, ValueError, zipfile.BadZipFile) as e:
+        print(f"Error occurred: {e}")
+    except KeyboardInterrupt:
+        pass
+    input("\nPress Enter to return to the System Management menu...")
+
+def format_dumpsys_summary(value, indent=''):
+    lines = []
+    for key, item in value.items():
+        if isinstance(item, dict):
+            lines.append(f"{indent}{key}:")
+            lines += format_dumpsys_summary(item, indent + '  ')
+        elif isinstance(item, list):
+            lines.append(f"{indent}{key}: {len(item)} entr{'y' if len(item) == 1 else 'ies'}")
+            for entry in item[:10]:
+                lines.append(f"{indent}  {', '.join(f'{k}={v}' for k, v in entry.items()) if isinstance(entry, dict) else entry}")
+        else:
+            lines.append(f"{indent}{key}: {item}")
+    return lines
+
+def dump_system_service_info():
+    clear_screen()
+    print("Dumping System Service Information")
+    try:
+        services = dumpsys_cache.services()
+        print(f"{len(services)} services are running. Services with a summary view: {', '.join(DUMPSYS_PARSERS)}.")
+        service = input("Enter a service name (press Enter to list all services): ").strip()
+        if not service:
+            print('\n'.join(services))
+        elif service not in services:
+            print(f"No service named '{service}' is running.")
+        elif service == 'package':
+            name = input("Enter the package name: ").strip()
+            print('\n'.join(format_dumpsys_summary(dumpsys_cache.package(name))))
+        elif service in DUMPSYS_PARSERS and input("Show the full output instead of a summary? (y/n): ").strip().lower() != 'y':
+            print('\n'.join(format_dumpsys_summary(dumpsys_cache.parsed(service))))
+        else:
+            print(dumpsys_cache.text(service))
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the System Management menu...")
+
+def display_system_processes():
+    clear_screen()
+    print("Displaying Real-Time System Processes")
+    try:
+        with adb_client.open_shell_stream('top') as conn:
+            for chunk in conn.iter_chunks():
+                sys.stdout.write(chunk.decode(errors='replace'))
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    except KeyboardInterrupt:
+        pass
+    input("\nPress Enter to return to the System Management menu...")
+
+def capture_logs_to_files():
+    clear_screen()
+    print("Capturing Logs to Rotated, Compressed Files")
+    try:
+        devices = choose_devices()
+        directory = input("Enter the output directory (default: logs): ").strip() or 'logs'
+        matches = parse_log_filter(input("Enter filters (e.g., tag=ActivityManager priority=W), or press Enter for all logs: "))
+    except ValueError as e:
+        print(f"Invalid filter: {e}")
+        input("\nPress Enter to return to the System Management menu...")
+        return
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+        input("\nPress Enter to return to the System Management menu...")
+        return
+    stop_event = threading.Event()
+    connections = {}
+    threads = []
+    for serial in devices:
+        writer = RotatingLogWriter(os.path.join(directory, serial))
+        thread = threading.Thread(target=capture_logcat, args=(serial, writer, matches, stop_event, connections),
+                                  daemon=True)
+        thread.start()
+        threads.append(thread)
+    print(f"Capturing logs from {len(devices)} device(s) into {directory}. Press Ctrl+C to stop.")
+    try:
+        while any(thread.is_alive() for thread in threads):
+            time.sleep(1)
+    except KeyboardInterrupt:
+        stop_event.set()
+        for conn in list(connections.values()):
+            conn.close()
+        for thread in threads:
+            thread.join()
+    print("Log capture stopped.")
+    input("\nPress Enter to return to the System Management menu...")
+
+HEALTH_QUERY = ("echo ::battery; dumpsys battery; echo ::cpu; head -n 1 /proc/stat; "
+                "echo ::memory; cat /proc/meminfo; echo ::storage; df -k /data")
+
+HealthSample = namedtuple('HealthSample', ['timestamp', 'battery_level', 'temperature', 'cpu_busy',
+                                           'memory_total', 'memory_available', 'storage_total', 'storage_free'])
+
+def parse_health(sections, previous_cpu):
+    battery = {}
+    for line in sections.get('battery', []):
+        key, _, value = line.partition(':')
+        battery[key.strip()] = value.strip()
+    cpu_fields = [int(field) for field in ''.join(sections.get('cpu', [])).split()[1:] if field.isdigit()]
+    # /proc/stat counts since boot; usage is the busy share of the ticks since the previous sample.
+    cpu_busy = None
+    if previous_cpu and cpu_fields:
+        total = sum(cpu_fields) - sum(previous_cpu)
+        idle = sum(cpu_fields[3:5]) - sum(previous_cpu[3:5])
+        cpu_busy = (total - idle) / total if total > 0 else None
+    memory = {}
+    for line in sections.get('memory', []):
+        key, _, value = line.partition(':')
+        if value.split():
+            memory[key] = int(value.split()[0]) * 1024
+    storage_total = storage_free = None
+    storage = [line.split() for line in sections.get('storage', [])[1:] if len(line.split()) >= 4]
+    if storage and storage[-1][1].isdigit():
+        storage_total, storage_free = int(storage[-1][1]) * 1024, int(storage[-1][3]) * 1024
+    level = battery.get('level', '')
+    temperature = battery.get('temperature', '')
+    sample = HealthSample(
+        time.time(),
+        int(level) if level.isdigit() else None,
+        int(temperature) / 10 if temperature.lstrip('-').isdigit() else None,
+        cpu_busy,
+        memory.get('MemTotal'),
+        memory.get('MemAvailable'),
+        storage_total,
+        storage_free,
+    )
+    return sample, cpu_fields
+
+
+class HealthMonitor:
+    # Polls every attached device on an asyncio loop. Each poll is one
+    # command on a pooled shell session, and the blocking calls run on a
+    # bounded thread pool, so the host cost per cycle stays flat as the fleet
+    # grows. Samples are kept in fixed-size ring buffers per device.
+    METRICS = [
+        ('battery_level', 'easyadb_battery_level_percent', 'Battery charge level.'),
+        ('temperature', 'easyadb_battery_temperature_celsius', 'Battery temperature.'),
+        ('cpu_busy', 'easyadb_cpu_busy_ratio', 'Share of CPU time not idle since the previous sample.'),
+        ('memory_total', 'easyadb_memory_total_bytes', 'Total RAM.'),
+        ('memory_available', 'easyadb_memory_available_bytes', 'RAM available to new processes.'),
+        ('storage_total', 'easyadb_storage_total_bytes', 'Size of the /data partition.'),
+        ('storage_free', 'easyadb_storage_free_bytes', 'Free space on the /data partition.'),
+    ]
+
+    def __init__(self, tracker, pool, interval=MONITOR_INTERVAL, history=MONITOR_HISTORY,
+                 workers=DEVICE_PROBE_WORKERS):
+        self.tracker = tracker
+        self.pool = pool
+        self.interval = interval
+        self.history = history
+        self.samples = {}
+        self.errors = {}
+        self.poll_seconds = 0.0
+        self._cpu = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._server = None
+        tracker.add_listener(self._on_device)
+
+    def _on_device(self, event, device, previous):
+        if event == 'disconnected' or device['state'] != 'device':
+            with self._lock:
+                if device['serial'] in self.samples:
+                    self.errors[device['serial']] = 'disconnected' if event == 'disconnected' else device['state']
+
+    def _poll(self, serial):
+        result = self.pool.run(HEALTH_QUERY, serial)
+        sample, self._cpu[serial] = parse_health(split_sections(result.stdout), self._cpu.get(serial))
+        return sample
+
+    async def _poll_device(self, serial):
+        loop = asyncio.get_running_loop()
+        try:
+            sample = await asyncio.wait_for(loop.run_in_executor(self._executor, self._poll, serial),
+                                            self.interval)
+        except (AdbError, OSError, asyncio.TimeoutError) as e:
+            with self._lock:
+                self.errors[serial] = str(e) or type(e).__name__
+            return
+        with self._lock:
+            self.errors.pop(serial, None)
+            self.samples.setdefault(serial, deque(maxlen=self.history)).append(sample)
+
+    async def poll_once(self):
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        serials = await loop.run_in_executor(self._executor, self.tracker.ready)
+        await asyncio.gather(*(self._poll_device(serial) for serial in serials))
+        with self._lock:
+            for serial in set(self.samples) - set(serials):
+                self.errors.setdefault(serial, 'disconnected')
+            self.poll_seconds = time.perf_counter() - start
+
+    async def run(self, stop_event, on_cycle=None):
+        while not stop_event.is_set():
+            started = time.monotonic()
+            await self.poll_once()
+            if on_cycle:
+                on_cycle(self)
+            await asyncio.sleep(max(0, self.interval - (time.monotonic() - started)))
+
+    def latest(self):
+        with self._lock:
+            return {serial: samples[-1] for serial, samples in self.samples.items() if samples}
+
+    def render_metrics(self):
+        with self._lock:
+            latest = {serial: samples[-1] for serial, samples in self.samples.items() if samples}
+            errors = dict(self.errors)
+            poll_seconds = self.poll_seconds
+        lines = ['# HELP easyadb_device_up Whether the last poll of the device succeeded.',
+                 '# TYPE easyadb_device_up gauge']
+        for serial in sorted(set(latest) | set(errors)):
+            lines.append(f'easyadb_device_up{{serial="{serial}"}} {0 if serial in errors else 1}')
+        for field, name, help_text in self.METRICS:
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} gauge']
+            for serial, sample in sorted(latest.items()):
+                value = getattr(sample, field)
+                if value is not None and serial not in errors:
+                    lines.append(f'{name}{{serial="{serial}"}} {value} {int(sample.timestamp * 1000)}')
+        lines += ['# HELP easyadb_poll_duration_seconds Wall time of the last polling cycle.',
+                  '# TYPE easyadb_poll_duration_seconds gauge',
+                  f'easyadb_poll_duration_seconds {poll_seconds:.6f}']
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, port=MONITOR_PORT, host='127.0.0.1'):
+        monitor = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = monitor.render_metrics().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server.server_address[1]
+
+    def close(self):
+        self.tracker.remove_listener(self._on_device)
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+        self._executor.shutdown(wait=False)
+
+
+def format_health_table(monitor):
+    def show(value, scale=1, suffix=''):
+        return '-' if value is None else f"{value / scale:.0f}{suffix}"
+    rows = [f"{'Serial':<24}{'Battery':>9}{'Temp':>8}{'CPU':>7}{'Mem free':>11}{'Storage free':>14}"]
+    latest = monitor.latest()
+    for serial in sorted(set(latest) | set(monitor.errors)):
+        if serial in monitor.errors:
+            rows.append(f"{serial:<24}  {monitor.errors[serial]}")
+            continue
+        sample = latest[serial]
+        cpu = None if sample.cpu_busy is None else sample.cpu_busy * 100
+        rows.append(f"{serial:<24}{show(sample.battery_level, suffix='%'):>9}"
+                    f"{show(sample.temperature, suffix='C'):>8}{show(cpu, suffix='%'):>7}"
+                    f"{show(sample.memory_available, 2 ** 20, ' MB'):>11}"
+                    f"{show(sample.storage_free, 2 ** 30, ' GB'):>14}")
+    rows.append(f"Last cycle: {monitor.poll_seconds:.2f}s")
+    return '\n'.join(rows)
+
+def run_health_monitor(interval=MONITOR_INTERVAL, port=MONITOR_PORT, history=MONITOR_HISTORY, on_cycle=None):
+    monitor = HealthMonitor(device_tracker, shell_pool, interval, history)
+    stop_event = asyncio.Event()
+    try:
+        bound_port = monitor.serve(port) if port else None
+        if bound_port:
+            print(f"Serving metrics on http://127.0.0.1:{bound_port}/metrics")
+        asyncio.run(monitor.run(stop_event, on_cycle))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        monitor.close()
+
+def monitor_device_health():
+    clear_screen()
+    print("Monitoring Device Health")
+    interval = input(f"Enter the polling interval in seconds (default: {MONITOR_INTERVAL}): ").strip()
+    port = input(f"Enter the metrics port, or 0 to disable (default: {MONITOR_PORT}): ").strip()
+
+    def redraw(monitor):
+        clear_screen()
+        print("Monitoring Device Health. Press Ctrl+C to stop.\n")
+        print(format_health_table(monitor))
+    try:
+        run_health_monitor(float(interval or MONITOR_INTERVAL), int(port or MONITOR_PORT), on_cycle=redraw)
+    except (ValueError, OSError) as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the System Management menu...")
+
+def shell_and_command_execution():
+    while True:
+        clear_screen()
+        display_banner()
+        print("Shell and Command Execution")
+        menu = """
+[1] Start an interactive shell on the device.
+[2] Run a specific command on the device's shell.
+[3] List all installed packages on the device.
+[4] Uninstall a package via shell.
+[0] Return to the main menu.
+        """
+        print(menu)
+        choice = input("Select an option: ").strip()
+
+        if choice == "1":
+            start_interactive_shell()
+        elif choice == "2":
+            run_specific_command()
+        elif choice == "3":
+            list_installed_packages()
+        elif choice == "4":
+            uninstall_package()
+        elif choice == "0":
+            break
+        else:
+            print("Invalid option, please select again.")
+
+def start_interactive_shell():
+    clear_screen()
+    print("Starting Interactive Shell")
+    # Interactive sessions need a real terminal, so they still go through the adb binary.
+    try:
+        with instrumentation.span('adb shell (interactive)'):
+            subprocess.run([get_adb_path(), 'shell'], check=True)
+    except subprocess.CalledProcessError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Shell and Command Execution menu...")
+
+def run_specific_command():
+    clear_screen()
+    print("Run a Specific Command")
+    command = input("Enter the command to run: ").strip()
+    try:
+        result = adb_client.shell(command, check=True)
+        print(result.stdout)
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Shell and Command Execution menu...")
+
+def list_installed_packages():
+    clear_screen()
+    print("Listing Installed Packages")
+    try:
+        text = input("Enter part of a package name to filter by, or press Enter to list all: ").strip()
+        kind = input("Show 'all', 'user' or 'system' packages (default: all): ").strip().lower()
+        system = {'user': False, 'system': True}.get(kind)
+        packages = package_index.search(text, system=system)
+        for package in packages:
+            flags = ('system' if package.system else 'user') + ('' if package.enabled else ', disabled')
+            print(f"{package.name}  versionCode:{package.version_code}  uid:{package.uid}  ({flags})")
+        print(f"\n{len(packages)} package(s).")
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Shell and Command Execution menu...")
+
+def uninstall_package():
+    clear_screen()
+    print("Uninstall a Package")
+    package_name = prompt_package_name("Enter the package name to uninstall: ")
+    try:
+        adb_client.shell(['pm', 'uninstall', package_name], check=True)
+        package_index.invalidate()
+        print(f"Package {package_name} has been uninstalled.")
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Shell and Command Execution menu...")
+
+def screen_management():
+    while True:
+        clear_screen()
+        display_banner()
+        print("Screen Management")
+        menu = """
+[1] Take a screenshot of the device screen.
+[2] Record the screen to a video file.
+[3] Get or set the screen resolution.
+[4] Get or set the screen density.
+[5] Capture a burst of screenshots.
+[0] Return to the main menu.
+        """
+        print(menu)
+        choice = input("Select an option: ").strip()
+
+        if choice == "1":
+            take_screenshot()
+        elif choice == "2":
+            record_screen()
+        elif choice == "3":
+            manage_screen_resolution()
+        elif choice == "4":
+            manage_screen_density()
+        elif choice == "5":
+            capture_screenshot_burst()
+        elif choice == "0":
+            break
+        else:
+            print("Invalid option, please select again.")
+
+def parse_framebuffer(data):
+    # Raw `screencap` output: width, height, format, and on Android 8+ a
+    # dataspace word, followed by the pixel rows.
+    width, height, pixel_format = struct.unpack_from('<III', data)
+    bytes_per_pixel = FRAMEBUFFER_BYTES_PER_PIXEL.get(pixel_format)
+    if bytes_per_pixel is None:
+        raise AdbError(f"Unsupported framebuffer format {pixel_format}.")
+    header_size = len(data) - width * height * bytes_per_pixel
+    if header_size not in (12, 16):
+        raise AdbError("Truncated framebuffer data.")
+    return Framebuffer(width, height, pixel_format, memoryview(data)[header_size:])
+
+def encode_png(framebuffer, level=1):
+    bytes_per_pixel = FRAMEBUFFER_BYTES_PER_PIXEL[framebuffer.format]
+    pixels = framebuffer.pixels
+    if framebuffer.format == 2:
+        # RGBX_8888: the fourth byte is padding, not alpha, so it is dropped.
+        pixels = bytearray(pixels)
+        del pixels[3::4]
+        bytes_per_pixel = 3
+    stride = framebuffer.width * bytes_per_pixel
+    rows = b''.join(b'\0' + pixels[offset:offset + stride] for offset in range(0, len(pixels), stride))
+
+    def chunk(kind, body):
+        return struct.pack('>I', len(body)) + kind + body + struct.pack('>I', zlib.crc32(kind + body))
+
+    color_type = 6 if bytes_per_pixel == 4 else 2
+    header = struct.pack('>IIBBBBB', framebuffer.width, framebuffer.height, 8, color_type, 0, 0, 0)
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header) +
+            chunk(b'IDAT', zlib.compress(rows, level)) + chunk(b'IEND', b''))
+
+def capture_screenshot(serial=None, raw=False):
+    # Streams straight to the host over exec:, nothing is written to /sdcard.
+    if raw:
+        return parse_framebuffer(adb_client.exec_out(['screencap'], serial))
+    return adb_client.exec_out(['screencap', '-p'], serial)
+
+def burst_capture(count, serial=None, raw=True):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=BURST_WORKERS) as executor:
+        frames = list(executor.map(lambda _: capture_screenshot(serial, raw), range(count)))
+    return frames, time.perf_counter() - start
+
+def take_screenshot():
+    clear_screen()
+    print("Taking a Screenshot")
+    filename = input("Enter the filename to save the screenshot: ").strip()
+    raw = input("Capture the raw framebuffer and encode the PNG on the host? (y/n): ").strip().lower() == 'y'
+    try:
+        screenshot = capture_screenshot(raw=raw)
+        with open(filename, 'wb') as image_file:
+            image_file.write(encode_png(screenshot) if raw else screenshot)
+        print(f"Screenshot saved as {filename}.")
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Screen Management menu...")
+
+def capture_screenshot_burst():
+    clear_screen()
+    print("Capturing a Burst of Screenshots")
+    try:
+        count = int(input("Enter the number of frames to capture: ").strip())
+    except ValueError:
+        print("Invalid number of frames.")
+        input("\nPress Enter to return to the Screen Management menu...")
+        return
+    directory = input("Enter a directory to save PNG frames, or press Enter to keep them in memory: ").strip()
+    try:
+        frames, elapsed = burst_capture(count)
+        print(f"Captured {count} frames in {elapsed:.2f} seconds ({count / elapsed:.1f} frames/second).")
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            for index, frame in enumerate(frames, 1):
+                with open(os.path.join(directory, f"frame_{index:04d}.png"), 'wb') as image_file:
+                    image_file.write(encode_png(frame))
+            print(f"Frames saved to {directory}.")
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Screen Management menu...")
+
+class ScreenRecorder:
+    # Streams raw H.264 from `screenrecord -` into numbered segment files on a
+    # background thread, restarting screenrecord each time it hits its limit.
+    def __init__(self, serial, prefix, segment_seconds=SCREENRECORD_TIME_LIMIT):
+        self.serial = serial
+        self.prefix = prefix
+        self.segment_seconds = min(segment_seconds, SCREENRECORD_TIME_LIMIT)
+        self.segments = []
+        self.bytes_written = 0
+        self.error = None
+        self.started_at = time.monotonic()
+        self._stop = threading.Event()
+        self._conn = None
+        # Guards _conn against stop(), which may land between segments.
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def is_running(self):
+        return self._thread.is_alive()
+
+    def _run(self):
+        command = ['screenrecord', '--output-format=h264', '--time-limit', str(self.segment_seconds), '-']
+        while not self._stop.is_set():
+            filename = f"{self.prefix}_{len(self.segments) + 1:04d}.h264"
+            try:
+                conn = adb_client.open_service(f"exec:{format_shell_command(command)}", self.serial)
+                with self._lock:
+                    if self._stop.is_set():
+                        # stop() came while this segment was opening; it must not record on.
+                        conn.close()
+                        return
+                    self._conn = conn
+                with conn, open(filename, 'wb') as segment:
+                    self.segments.append(filename)
+                    segment_bytes = 0
+                    for chunk in conn.iter_chunks():
+                        segment.write(chunk)
+                        segment_bytes += len(chunk)
+                        self.bytes_written += len(chunk)
+            except (AdbError, OSError) as e:
+                if not self._stop.is_set():
+                    self.error = str(e)
+                return
+            if not segment_bytes and not self._stop.is_set():
+                self.error = "screenrecord produced no output."
+                return
+
+    def stop(self):
+        with self._lock:
+            self._stop.set()
+            if self._conn is not None:
+                self._conn.close()
+        self._thread.join()
+
+
+active_recordings = {}
+
+def record_screen():
+    clear_screen()
+    print("Recording the Screen")
+    try:
+        serial = adb_client.get_serial()
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+        input("\nPress Enter to return to the Screen Management menu...")
+        return
+    recorder = active_recordings.get(serial)
+    if recorder and recorder.is_running():
+        print(f"Recording {serial} for {time.monotonic() - recorder.started_at:.0f} seconds: "
+              f"{len(recorder.segments)} segment(s), {recorder.bytes_written} bytes.")
+        if input("Stop the recording? (y/n): ").strip().lower() == 'y':
+            recorder.stop()
+            del active_recordings[serial]
+            print(f"Screen recording saved as {', '.join(recorder.segments)}.")
+    else:
+        if recorder and recorder.error:
+            print(f"The previous recording stopped early: {recorder.error}")
+        prefix = input("Enter the filename prefix for the video segments: ").strip()
+        recorder = ScreenRecorder(serial, prefix)
+        recorder.start()
+        active_recordings[serial] = recorder
+        print("Recording in the background. Select this option again to check on it or stop it.")
+    input("\nPress Enter to return to the Screen Management menu...")
+
+def manage_screen_resolution():
+    clear_screen()
+    print("Get or Set Screen Resolution")
+    action = input("Enter 'get' to get the resolution or 'set' to set a new resolution: ").strip().lower()
+    if action == 'get':
+        try:
+            profile = device_profiles.get()
+            print(f"Screen resolution: {profile['resolution']}")
+        except AdbError as e:
+            print(f"Error occurred: {e}")
+    elif action == 'set':
+        new_resolution = input("Enter the new resolution (e.g., 1080x1920): ").strip()
+        try:
+            shell_pool.run(['wm', 'size', new_resolution], check=True)
+            device_profiles.invalidate()
+            print(f"Screen resolution set to {new_resolution}.")
+        except AdbError as e:
+            print(f"Error occurred: {e}")
+    else:
+        print("Invalid option.")
+    input("\nPress Enter to return to the Screen Management menu...")
+
+def manage_screen_density():
+    clear_screen()
+    print("Get or Set Screen Density")
+    action = input("Enter 'get' to get the density or 'set' to set a new density: ").strip().lower()
+    if action == 'get':
+        try:
+            profile = device_profiles.get()
+            print(f"Screen density: {profile['density']}")
+        except AdbError as e:
+            print(f"Error occurred: {e}")
+    elif action == 'set':
+        new_density = input("Enter the new density (e.g., 320): ").strip()
+        try:
+            shell_pool.run(['wm', 'density', new_density], check=True)
+            device_profiles.invalidate()
+            print(f"Screen density set to {new_density}.")
+        except AdbError as e:
+            print(f"Error occurred: {e}")
+    else:
+        print("Invalid option.")
+    input("\nPress Enter to return to the Screen Management menu...")
+
+class ForwardRelay:
+    # An in-process `adb forward`: listens on a local port and carries each
+    # accepted connection over its own transport stream to the device
+    # service (tcp:PORT, localabstract:NAME, ...). A few device streams are
+    # kept open ahead of time so a new client skips the transport handshake,
+    # and every connection is counted, so throughput and latency are visible.
+    def __init__(self, client, serial, local_port, remote, warm=FORWARD_WARM_STREAMS, host='127.0.0.1'):
+        self.client = client
+        self.serial = serial
+        self.local_port = local_port
+        self.remote = remote
+        self.warm = warm
+        self.host = host
+        self.active = 0
+        self.connections = 0
+        self.failed = 0
+        self.bytes_up = 0
+        self.bytes_down = 0
+        self.connect_latency = deque(maxlen=FORWARD_LATENCY_SAMPLES)
+        self.first_byte_latency = deque(maxlen=FORWARD_LATENCY_SAMPLES)
+        self.paused = False
+        self._idle = deque()
+        self._lock = threading.Lock()
+        self._refill = threading.Event()
+        self._closed = False
+        self._listener = None
+
+    def start(self):
+        self._listener = socket.create_server((self.host, self.local_port))
+        self.local_port = self._listener.getsockname()[1]
+        threading.Thread(target=self._accept, daemon=True).start()
+        threading.Thread(target=self._keep_warm, daemon=True).start()
+        self._refill.set()
+        return self.local_port
+
+    def close(self):
+        self._closed = True
+        self._refill.set()
+        if self._listener:
+            self._listener.close()
+        self._drop_idle()
+
+    def pause(self):
+        # The device went away: its warm streams are dead and new clients fail fast.
+        self.paused = True
+        self._drop_idle()
+
+    def resume(self):
+        self.paused = False
+        self._refill.set()
+
+    def _drop_idle(self):
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for conn in idle:
+            conn.close()
+
+    def _open_stream(self):
+        conn = self.client.open_service(self.remote, self.serial)
+        conn.sock.settimeout(None)
+        return conn
+
+    def _keep_warm(self):
+        while not self._closed:
+            self._refill.wait()
+            self._refill.clear()
+            while not self._closed and not self.paused and len(self._idle) < self.warm:
+                try:
+                    conn = self._open_stream()
+                except (AdbError, OSError):
+                    break
+                with self._lock:
+                    self._idle.append(conn)
+
+    def _take_stream(self):
+        if self.paused:
+            raise AdbError(f"{self.serial} is not connected.")
+        while True:
+            with self._lock:
+                conn = self._idle.popleft() if self._idle else None
+            if conn is None:
+                return self._open_stream()
+            self._refill.set()
+            # A warm stream the device side has since closed reads as EOF.
+            readable, _, _ = select.select([conn.sock], [], [], 0)
+            if not readable or conn.sock.recv(1, socket.MSG_PEEK):
+                return conn
+            conn.close()
+
+    def _accept(self):
+        while not self._closed:
+            try:
+                client_sock, _ = self._listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(client_sock,), daemon=True).start()
+
+    def _serve(self, client_sock):
+        started = time.perf_counter()
+        try:
+            conn = self._take_stream()
+        except (AdbError, OSError):
+            with self._lock:
+                self.failed += 1
+            client_sock.close()
+            return
+        with self._lock:
+            self.connect_latency.append(time.perf_counter() - started)
+            self.connections += 1
+            self.active += 1
+        # Time from the client's first byte to the device's first answer.
+        marks = {}
+        upstream = threading.Thread(target=self._pump, args=(client_sock, conn.sock, 'bytes_up', marks), daemon=True)
+        upstream.start()
+        self._pump(conn.sock, client_sock, 'bytes_down', marks)
+        upstream.join()
+        conn.close()
+        client_sock.close()
+        with self._lock:
+            self.active -= 1
+
+    def _pump(self, source, destination, counter, marks):
+        try:
+            while True:
+                data = source.recv(SYNC_DATA_MAX)
+                if not data:
+                    break
+                if counter not in marks:
+                    marks[counter] = time.perf_counter()
+                    if counter == 'bytes_down' and 'bytes_up' in marks:
+                        with self._lock:
+                            self.first_byte_latency.append(marks['bytes_down'] - marks['bytes_up'])
+                destination.sendall(data)
+                with self._lock:
+                    setattr(self, counter, getattr(self, counter) + len(data))
+        except OSError:
+            pass
+        try:
+            destination.shutdown(socket.SHUT_WR)
+        except OSError:
+            pass
+
+    def stats(self):
+        with self._lock:
+            return {
+                'active': self.active,
+                'connections': self.connections,
+                'failed': self.failed,
+                'bytes_up': self.bytes_up,
+                'bytes_down': self.bytes_down,
+                'connect_ms': statistics.median(self.connect_latency) * 1000 if self.connect_latency else None,
+                'first_byte_ms': (statistics.median(self.first_byte_latency) * 1000
+                                  if self.first_byte_latency else None),
+            }
+
+
+class ForwardManager:
+    # The forwards set up through EasyADB: plain adb forwards and reverses,
+    # and in-process relays. The adb server drops a device's forwards when
+    # it disconnects, so they are set up again when it comes back.
+    def __init__(self, client, tracker):
+        self.client = client
+        self.tracker = tracker
+        self._managed = {}
+        self._lock = threading.Lock()
+        tracker.add_listener(self._on_device)
+
+    @staticmethod
+    def _key(entry):
+        # Forwards and relays are named by their host side, reverses by their device side.
+        return entry['serial'], entry['kind'], entry['remote'] if entry['kind'] == 'reverse' else entry['local']
+
+    def add(self, local, remote, serial=None, kind='forward'):
+        serial = self.client.get_serial(serial)
+        self.tracker.start()
+        entry = {'serial': serial, 'kind': kind, 'local': local, 'remote': remote, 'relay': None}
+        with self._lock:
+            replaced = self._managed.pop(self._key(entry), None)
+        if replaced and replaced['relay']:
+            replaced['relay'].close()
+        self._establish(entry)
+        with self._lock:
+            self._managed[self._key(entry)] = entry
+        return entry
+
+    def _establish(self, entry):
+        if entry['kind'] == 'forward':
+            self.client.forward(entry['local'], entry['remote'], entry['serial'])
+        elif entry['kind'] == 'reverse':
+            self.client.reverse(entry['remote'], entry['local'], entry['serial'])
+        elif entry['relay'] is None:
+            relay = ForwardRelay(self.client, entry['serial'], int(entry['local'].partition(':')[2] or 0),
+                                 entry['remote'])
+            entry['local'] = f"tcp:{relay.start()}"
+            entry['relay'] = relay
+        else:
+            entry['relay'].resume()
+
+    def remove(self, serial, kind, name, missing_ok=False):
+        with self._lock:
+            entry = self._managed.pop((serial, kind, name), None)
+        try:
+            if kind == 'relay':
+                if entry:
+                    entry['relay'].close()
+                elif not missing_ok:
+                    raise AdbError(f"No relay on {name} for {serial}.")
+            elif kind == 'reverse':
+                self.client.remove_reverse(name, serial)
+            else:
+                self.client.remove_forward(name, serial)
+        except AdbError:
+            if not missing_ok:
+                raise
+
+    def remove_all(self, serial=None):
+        with self._lock:
+            entries = [entry for entry in self._managed.values() if serial in (None, entry['serial'])]
+            for entry in entries:
+                del self._managed[self._key(entry)]
+        for entry in entries:
+            if entry['relay']:
+                entry['relay'].close()
+        self.client.remove_all_forwards(serial)
+        for device_serial in ([serial] if serial else self.tracker.ready()):
+            self.client.remove_all_reverses(device_serial)
+
+    def list(self):
+        # One row per forward: those the server holds, the reverses of every
+        # ready device, relays, and managed forwards waiting for their device.
+        with self._lock:
+            managed = dict(self._managed)
+        rows, seen = [], set()
+        for forward in self.client.list_forwards():
+            row = dict(forward, kind='forward')
+            seen.add(self._key(row))
+            rows.append(dict(row, managed=self._key(row) in managed, state='active'))
+        for serial in self.tracker.ready():
+            try:
+                reverses = self.client.list_reverses(serial)
+            except AdbError:
+                continue
+            for reverse in reverses:
+                row = dict(reverse, kind='reverse')
+                seen.add(self._key(row))
+                rows.append(dict(row, managed=self._key(row) in managed, state='active'))
+        for key, entry in managed.items():
+            if entry['kind'] == 'relay':
+                rows.append({'serial': entry['serial'], 'kind': 'relay', 'local': entry['local'],
+                             'remote': entry['remote'], 'managed': True,
+                             'state': 'paused' if entry['relay'].paused else 'active'})
+            elif key not in seen:
+                rows.append({'serial': entry['serial'], 'kind': entry['kind'], 'local': entry['local'],
+                             'remote': entry['remote'], 'managed': True, 'state': 'waiting'})
+        return rows
+
+    def relays(self):
+        with self._lock:
+            return [entry for entry in self._managed.values() if entry['kind'] == 'relay']
+
+    def _on_device(self, event, device, previous):
+        with self._lock:
+            entries = [entry for entry in self._managed.values() if entry['serial'] == device['serial']]
+        if not entries:
+            return
+        if event == 'disconnected' or device['state'] != 'device':
+            for entry in entries:
+                if entry['relay']:
+                    entry['relay'].pause()
+            return
+        # Listeners run on the tracker thread, which must not block on adb calls.
+        threading.Thread(target=self._reestablish, args=(entries,), daemon=True).start()
+
+    def _reestablish(self, entries):
+        for entry in entries:
+            try:
+                self._establish(entry)
+            except AdbError:
+                pass
+
+    def close(self):
+        for entry in self.relays():
+            entry['relay'].close()
+
+
+forward_manager = ForwardManager(adb_client, device_tracker)
+
+def format_forward_table(rows):
+    lines = [f"{'Device':<24} {'Kind':<8} {'Local':<22} {'Remote':<22} {'State':<8} Managed"]
+    for row in sorted(rows, key=lambda row: (row['serial'], row['kind'], row['local'])):
+        lines.append(f"{row['serial']:<24} {row['kind']:<8} {row['local']:<22} {row['remote']:<22} "
+                     f"{row['state']:<8} {'yes' if row['managed'] else 'no'}")
+    return '\n'.join(lines)
+
+def format_relay_stats(relays, previous, interval):
+    # previous maps each relay's local port to its byte counters one interval ago.
+    def show(value):
+        return '-' if value is None else f"{value:.1f}"
+    lines = [f"{'Device':<24} {'Local':<12} {'Remote':<22} {'Active':>6} {'Total':>6} {'Failed':>6} "
+             f"{'Up KB/s':>9} {'Down KB/s':>9} {'Connect ms':>10} {'1st byte ms':>11}"]
+    for entry in relays:
+        stats = entry['relay'].stats()
+        up, down = previous.get(entry['local'], (stats['bytes_up'], stats['bytes_down']))
+        previous[entry['local']] = stats['bytes_up'], stats['bytes_down']
+        lines.append(f"{entry['serial']:<24} {entry['local']:<12} {entry['remote']:<22} {stats['active']:>6} "
+                     f"{stats['connections']:>6} {stats['failed']:>6} "
+                     f"{(stats['bytes_up'] - up) / 1024 / interval:>9.1f} "
+                     f"{(stats['bytes_down'] - down) / 1024 / interval:>9.1f} "
+                     f"{show(stats['connect_ms']):>10} {show(stats['first_byte_ms']):>11}")
+    return '\n'.join(lines)
+
+def watch_relays(interval=FORWARD_STATS_INTERVAL):
+    previous = {}
+    try:
+        while True:
+            table = format_relay_stats(forward_manager.relays(), previous, interval)
+            clear_screen()
+            print("Relay statistics. Press Ctrl+C to stop.\n")
+            print(table)
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+
+def network_management():
+    while True:
+        clear_screen()
+        display_banner()
+        print("Network Management")
+        menu = """
+[1] Forward a local port to a remote port on the device.
+[2] Forward a remote port to a local port.
+[3] Display network interface configurations.
+[4] Enable or disable airplane mode.
+[5] Enable or disable Wi-Fi.
+[6] List and remove port forwards.
+[7] Relay a local port to the device with live statistics.
+[0] Return to the main menu.
+        """
+        print(menu)
+        choice = input("Select an option: ").strip()
+
+        if choice == "1":
+            forward_local_to_remote()
+        elif choice == "2":
+            forward_remote_to_local()
+        elif choice == "3":
+            display_network_configurations()
+        elif choice == "4":
+            toggle_airplane_mode()
+        elif choice == "5":
+            toggle_wifi()
+        elif choice == "6":
+            manage_forwards()
+        elif choice == "7":
+            relay_local_to_remote()
+        elif choice == "0":
+            break
+        else:
+            print("Invalid option, please select again.")
+
+def forward_local_to_remote():
+    clear_screen()
+    print("Forwarding Local Port to Remote Port")
+    local_port = input("Enter the local port: ").strip()
+    remote_port = input("Enter the remote port: ").strip()
+    try:
+        forward_manager.add(f'tcp:{local_port}', f'tcp:{remote_port}')
+        print(f"Local port {local_port} forwarded to remote port {remote_port}.")
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Network Management menu...")
+
+def forward_remote_to_local():
+    clear_screen()
+    print("Forwarding Remote Port to Local Port")
+    remote_port = input("Enter the remote port: ").strip()
+    local_port = input("Enter the local port: ").strip()
+    try:
+        forward_manager.add(f'tcp:{local_port}', f'tcp:{remote_port}', kind='reverse')
+        print(f"Remote port {remote_port} forwarded to local port {local_port}.")
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Network Management menu...")
+
+def manage_forwards():
+    clear_screen()
+    print("Port Forwards")
+    try:
+        rows = forward_manager.list()
+        if not rows:
+            print("No port forwards are set up.")
+        else:
+            print(format_forward_table(rows))
+            print("\nForwards marked as managed are set up again when their device reconnects.")
+            choice = input("\nEnter a local port (or device port, for a reverse) to remove, 'all' to remove "
+                           "every forward, or press Enter to keep them: ").strip()
+            if choice == 'all':
+                forward_manager.remove_all()
+                print("All port forwards removed.")
+            elif choice:
+                name = choice if ':' in choice else f'tcp:{choice}'
+                matches = [row for row in rows if name == (row['remote'] if row['kind'] == 'reverse' else row['local'])]
+                if not matches:
+                    print(f"No forward on {name}.")
+                for row in matches:
+                    forward_manager.remove(row['serial'], row['kind'], name)
+                    print(f"Removed the {row['kind']} on {name} for {row['serial']}.")
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Network Management menu...")
+
+def relay_local_to_remote():
+    clear_screen()
+    print("Relaying a Local Port to the Device")
+    local_port = input("Enter the local port (0 picks a free one): ").strip()
+    remote = input("Enter the remote port, or a service such as localabstract:NAME: ").strip()
+    try:
+        entry = forward_manager.add(f'tcp:{local_port or 0}', remote if ':' in remote else f'tcp:{remote}',
+                                    kind='relay')
+        print(f"Relaying {entry['local']} to {entry['remote']} on {entry['serial']}.")
+        time.sleep(FORWARD_STATS_INTERVAL)
+        watch_relays()
+        if input("\nKeep the relay running in the background? (y/n): ").strip().lower() != 'y':
+            forward_manager.remove(entry['serial'], 'relay', entry['local'])
+    except (AdbError, OSError) as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Network Management menu...")
+
+def display_network_configurations():
+    clear_screen()
+    print("Displaying Network Interface Configurations")
+    try:
+        result = adb_client.shell(['netcfg'], check=True)
+        print(result.stdout)
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Network Management menu...")
+
+def toggle_airplane_mode():
+    clear_screen()
+    print("Toggle Airplane Mode")
+    action = input("Enter 'enable' to enable or 'disable' to disable airplane mode: ").strip().lower()
+    if action == 'enable':
+        try:
+            shell_pool.run(['settings', 'put', 'global', 'airplane_mode_on', '1'], check=True)
+            print("Airplane mode enabled.")
+        except AdbError as e:
+            print(f"Error occurred: {e}")
+    elif action == 'disable':
+        try:
+            shell_pool.run(['settings', 'put', 'global', 'airplane_mode_on', '0'], check=True)
+            print("Airplane mode disabled.")
+        except AdbError as e:
+            print(f"Error occurred: {e}")
+    else:
+        print("Invalid option.")
+    input("\nPress Enter to return to the Network Management menu...")
+
+def toggle_wifi():
+    clear_screen()
+    print("Toggle Wi-Fi")
+    action = input("Enter 'enable' to enable or 'disable' to disable Wi-Fi: ").strip().lower()
+    if action == 'enable':
+        try:
+            shell_pool.run(['svc', 'wifi', 'enable'], check=True)
+            print("Wi-Fi enabled.")
+        except AdbError as e:
+            print(f"Error occurred: {e}")
+    elif action == 'disable':
+        try:
+            shell_pool.run(['svc', 'wifi', 'disable'], check=True)
+            print("Wi-Fi disabled.")
+        except AdbError as e:
+            print(f"Error occurred: {e}")
+    else:
+        print("Invalid option.")
+    input("\nPress Enter to return to the Network Management menu...")
+
+def data_management():
+    while True:
+        clear_screen()
+        display_banner()
+        print("Data Management")
+        menu = """
+[1] Create a full backup of the device.
+[2] Restore a backup to the device.
+[3] Clear app data for a specified package.
+[0] Return to the main menu.
+        """
+        print(menu)
+        choice = input("Select an option: ").strip()
+
+        if choice == "1":
+            create_backup()
+        elif choice == "2":
+            restore_backup()
+        elif choice == "3":
+            clear_app_data()
+        elif choice == "0":
+            break
+        else:
+            print("Invalid option, please select again.")
+
+class InflateReader:
+    # File-like view of a zlib stream, for devices that ignore -nocompress.
+    def __init__(self, raw):
+        self.raw = raw
+        self.inflater = zlib.decompressobj()
+        self.buffer = b''
+
+    def read(self, size):
+        while len(self.buffer) < size and not self.inflater.eof:
+            data = self.raw.read(SYNC_DATA_MAX)
+            if not data:
+                break
+            self.buffer += self.inflater.decompress(data)
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+
+def read_backup_header(stream):
+    # ANDROID BACKUP / format version / compressed flag / encryption
+    raw = b''.join(stream.readline() for _ in range(4))
+    lines = raw.decode(errors='replace').split('\n')
+    if lines[0] != 'ANDROID BACKUP' or len(lines) < 4:
+        raise AdbError(f"Not an Android backup stream: {lines[0]!r}")
+    return {'version': lines[1], 'compressed': lines[2] == '1', 'encryption': lines[3], 'raw': raw}
+
+def backup_header(version):
+    return f"ANDROID BACKUP\n{version}\n0\nnone\n".encode()
+
+def iter_tar_entries(stream):
+    # Yields (path, raw bytes) per tar entry, with any pax extended header
+    # attached to the entry it describes.
+    pending = b''
+    while True:
+        header = stream.read(TAR_BLOCK)
+        if len(header) == TAR_BLOCK and not header.strip(b'\0'):
+            return
+        size = int(header[124:136].strip(b'\0 ') or b'0', 8) if len(header) == TAR_BLOCK else 0
+        data = stream.read((size + TAR_BLOCK - 1) // TAR_BLOCK * TAR_BLOCK)
+        if len(header) < TAR_BLOCK or len(data) < size:
+            # A dropped connection, not an end-of-archive marker.
+            raise AdbError("The backup stream ended in the middle of the archive.")
+        if header[156:157] in (b'x', b'g'):
+            pending += header + data
+            continue
+        name = header[0:100].rstrip(b'\0').decode(errors='replace')
+        prefix = header[345:500].rstrip(b'\0').decode(errors='replace')
+        path = f"{prefix}/{name}" if prefix else name
+        for record in pending[TAR_BLOCK:].split(b'\n'):
+            key, _, value = record.partition(b' ')[2].partition(b'=')
+            if key == b'path':
+                path = value.decode(errors='replace')
+        yield path, pending + header + data
+        pending = b''
+
+def backup_member_name(path):
+    # apps/<package>/... for app data, shared/<user>/... for shared storage.
+    parts = path.split('/')
+    if parts[0] == 'apps' and len(parts) > 1:
+        return parts[1]
+    return 'shared' if parts[0] == 'shared' else '_other'
+
+
+class ParallelGzipWriter:
+    # Compresses fixed-size blocks on a thread pool (zlib releases the GIL)
+    # and writes them in order as concatenated gzip members, which any gzip
+    # reader treats as one stream. At most two blocks per worker are in
+    # flight, so memory stays bounded however large the backup is.
+    def __init__(self, output, executor, workers=BACKUP_COMPRESS_WORKERS, level=BACKUP_COMPRESS_LEVEL):
+        self.output = output
+        self.executor = executor
+        self.level = level
+        self.limit = workers * 2
+        self.buffer = bytearray()
+        self.pending = deque()
+        self.raw_bytes = 0
+        self.compressed_bytes = 0
+
+    def write(self, data):
+        self.buffer += data
+        self.raw_bytes += len(data)
+        while len(self.buffer) >= BACKUP_BLOCK_BYTES:
+            self._submit(bytes(self.buffer[:BACKUP_BLOCK_BYTES]))
+            del self.buffer[:BACKUP_BLOCK_BYTES]
+
+    def _submit(self, block):
+        self.pending.append(self.executor.submit(gzip.compress, block, self.level))
+        while len(self.pending) > self.limit:
+            self._write_next()
+
+    def _write_next(self):
+        block = self.pending.popleft().result()
+        self.output.write(block)
+        self.compressed_bytes += len(block)
+
+    def close(self):
+        if self.buffer:
+            self._submit(bytes(self.buffer))
+            self.buffer.clear()
+        while self.pending:
+            self._write_next()
+
+
+def backup_device(serial, directory, packages=(), on_progress=None):
+    # One device-side backup session (and one confirmation on the phone),
+    # requested uncompressed so the phone does not spend CPU on deflate. The
+    # tar stream is split per package on the host, each package is compressed
+    # in parallel blocks, and everything lands in a zip whose index.json lets
+    # a restore read only the packages it needs.
+    targets = ' '.join(shlex.quote(package) for package in packages) if packages else '-shared -all'
+    os.makedirs(directory, exist_ok=True)
+    archive_path = os.path.join(directory, f"{serial.replace(':', '_')}-{time.strftime('%Y%m%d-%H%M%S')}.zip")
+    # Written under a temporary name and renamed once complete, so a failed
+    # backup never leaves a half-written archive that looks usable.
+    partial_path = archive_path + '.partial'
+    try:
+        index = write_backup_archive(serial, partial_path, targets, on_progress)
+        if not index['packages'] and not index.get('encrypted'):
+            raise AdbError("The backup was empty. Was it confirmed on the device?")
+        os.replace(partial_path, archive_path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(partial_path)
+        raise
+    return archive_path, index
+
+def write_backup_archive(serial, archive_path, targets, on_progress=None):
+    index = {'serial': serial, 'created': time.time(), 'packages': {}}
+    with adb_client.open_service(f"backup:-nocompress -apk {targets}", serial) as conn, \
+            conn.sock.makefile('rb') as stream, \
+            zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_STORED) as archive, \
+            ThreadPoolExecutor(max_workers=BACKUP_COMPRESS_WORKERS) as executor:
+        conn.sock.settimeout(None)
+        header = read_backup_header(stream)
+        index['version'] = header['version']
+        if header['encryption'] != 'none':
+            # An encrypted stream cannot be split; keep it whole.
+            index['encrypted'] = True
+            with archive.open('backup.ab.gz', 'w', force_zip64=True) as member:
+                writer = ParallelGzipWriter(member, executor)
+                writer.write(header['raw'])
+                for chunk in iter(lambda: stream.read(SYNC_DATA_MAX), b''):
+                    writer.write(chunk)
+                writer.close()
+        else:
+            body = InflateReader(stream) if header['compressed'] else stream
+            current = member = writer = None
+            try:
+                for path, entry in iter_tar_entries(body):
+                    name = backup_member_name(path)
+                    if name != current:
+                        if writer:
+                            writer.close()
+                            member.close()
+                            index['packages'][current].update(bytes=writer.raw_bytes, compressed=writer.compressed_bytes)
+                        if name in index['packages']:
+                            raise AdbError(f"Backup stream interleaves entries of {name}.")
+                        current = name
+                        member = archive.open(f"{name}.tar.gz", 'w', force_zip64=True)
+                        writer = ParallelGzipWriter(member, executor)
+                        index['packages'][name] = {'member': f"{name}.tar.gz", 'entries': 0}
+                        if on_progress:
+                            on_progress(serial, name)
+                    writer.write(entry)
+                    index['packages'][name]['entries'] += 1
+                if writer:
+                    writer.close()
+                    member.close()
+                    index['packages'][current].update(bytes=writer.raw_bytes, compressed=writer.compressed_bytes)
+            finally:
+                # The zip cannot be closed, even on an error, while a member is open for writing.
+                if member:
+                    member.close()
+        archive.writestr('index.json', json.dumps(index, indent=2))
+    return index
+
+def backup_devices(serials, directory, packages=(), on_progress=None):
+    # Each device runs its own backup session; the device side can only run
+    # one at a time, so parallelism is across devices.
+    def backup_one(serial):
+        start = time.perf_counter()
+        try:
+            path, index = backup_device(serial, directory, packages, on_progress)
+            result = {'path': path, 'packages': len(index['packages']), 'reason': None}
+        except (AdbError, OSError) as e:
+            result = {'path': None, 'packages': 0, 'reason': str(e) or e.__class__.__name__}
+        result.update(serial=serial, ok=result['reason'] is None, duration=time.perf_counter() - start)
+        return result
+
+    if not serials:
+        return []
+    with ThreadPoolExecutor(max_workers=len(serials)) as executor:
+        return list(executor.map(backup_one, serials))
+
+def read_backup_index(archive_path):
+    with zipfile.ZipFile(archive_path) as archive:
+        return json.loads(archive.read('index.json'))
+
+def restore_archive(archive_path, packages=None, serial=None):
+    # Rebuilds one restore stream from just the selected members: a fresh
+    # header, their tar entries, and the end-of-archive marker.
+    with zipfile.ZipFile(archive_path) as archive:
+        index = json.loads(archive.read('index.json'))
+        if index.get('encrypted'):
+            members, prefix, suffix = ['backup.ab.gz'], b'', b''
+            if packages:
+                raise AdbError("This backup is encrypted and can only be restored as a whole.")
+        else:
+            selected = packages or list(index['packages'])
+            missing = [package for package in selected if package not in index['packages']]
+            if missing:
+                raise AdbError(f"Not in this backup: {', '.join(missing)}")
+            members = [index['packages'][package]['member'] for package in selected]
+            prefix, suffix = backup_header(index['version']), b'\0' * (TAR_BLOCK * 2)
+        with adb_client.open_service('restore:', serial) as conn:
+            conn.send(prefix)
+            for member in members:
+                with gzip.open(archive.open(member)) as data:
+                    for chunk in iter(lambda: data.read(SYNC_DATA_MAX), b''):
+                        conn.send(chunk)
+            conn.send(suffix)
+            conn.shutdown_write()
+            conn.read_all()
+    return members
+
+def create_backup():
+    clear_screen()
+    print("Creating a Backup")
+    try:
+        devices = choose_devices()
+        packages = input("Enter package names separated by spaces, or press Enter for everything: ").split()
+        directory = input("Enter the output directory (default: backups): ").strip() or 'backups'
+        print("Confirm the backup on each device's screen (leave the password empty).")
+        results = backup_devices(devices, directory, packages,
+                                 lambda serial, package: print(f"{serial}: {package}"))
+        for result in results:
+            if result['ok']:
+                print(f"{result['serial']}: {result['packages']} package(s) saved to {result['path']} "
+                      f"in {result['duration']:.1f} seconds.")
+            else:
+                print(f"{result['serial']}: FAILED ({result['reason']})")
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Data Management menu...")
+
+def restore_backup():
+    clear_screen()
+    print("Restoring a Backup")
+    filename = input("Enter the filename of the backup to restore: ").strip()
+    try:
+        if zipfile.is_zipfile(filename):
+            index = read_backup_index(filename)
+            for name, details in sorted(index['packages'].items()):
+                print(f"  {name:<48} {details['bytes']:>12} bytes")
+            packages = input("Enter packages to restore separated by spaces, or press Enter for all: ").split()
+            restore_archive(filename, packages)
+        else:
+            with adb_client.open_service('restore:') as conn, open(filename, 'rb') as backup_file:
+                for chunk in iter(lambda: backup_file.read(SYNC_DATA_MAX), b''):
+                    conn.send(chunk)
+                conn.shutdown_write()
+                conn.read_all()
+        print(f"Backup {filename} restored.")
+    except (AdbError, OSError, ValueError, KeyError) as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Data Management menu...")
+
+def clear_app_data():
+    clear_screen()
+    print("Clearing App Data")
+    package_name = prompt_package_name("Enter the package name of the app to clear data for: ")
+    try:
+        shell_pool.run(['am', 'clear', package_name], check=True)
+        print(f"App data for {package_name} cleared.")
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Data Management menu...")
+
+def development_testing():
+    while True:
+        clear_screen()
+        display_banner()
+        print("Development and Testing")
+        menu = """
+[1] Run a stress test using monkey.
+[2] Start an activity.
+[3] Simulate user input.
+[4] Manage device settings.
+[5] Run a job file across devices.
+[0] Return to the main menu.
+        """
+        print(menu)
+        choice = input("Select an option: ").strip()
+
+        if choice == "1":
+            run_monkey_test()
+        elif choice == "2":
+            start_activity()
+        elif choice == "3":
+            simulate_user_input()
+        elif choice == "4":
+            manage_device_settings()
+        elif choice == "5":
+            run_job_menu()
+        elif choice == "0":
+            break
+        else:
+            print("Invalid option, please select again.")
+
+def run_monkey_test():
+    clear_screen()
+    print("Running Monkey Stress Test")
+    try:
+        print(adb_client.shell(['monkey', '-v', '500'], check=True).stdout)
+        print("Monkey test completed.")
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Development and Testing menu...")
+
+def start_activity():
+    clear_screen()
+    print("Starting Activity")
+    component = input("Enter the component name (e.g., com.example/.MainActivity): ").strip()
+    try:
+        shell_pool.run(['am', 'start', '-n', component], check=True)
+        print(f"Activity {component} started.")
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Development and Testing menu...")
+
+def simulate_user_input():
+    clear_screen()
+    print("Simulating User Input")
+    command = input("Enter the input command (e.g., tap, swipe, text): ").strip()
+    try:
+        shell_pool.run('input ' + command, check=True)
+        print(f"Simulated input command: {command}.")
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Development and Testing menu...")
+
+def manage_device_settings():
+    clear_screen()
+    print("Managing Device Settings")
+    command = input("Enter the settings command (e.g., settings put global <key> <value>): ").strip()
+    try:
+        shell_pool.run('settings ' + command, check=True)
+        print(f"Executed settings command: {command}.")
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Development and Testing menu...")
+
+def root_access_permissions():
+    while True:
+        clear_screen()
+        display_banner()
+        print("Root Access and File Permissions")
+        menu = """
+[1] Restart adbd daemon with root privileges.
+[2] Restart adbd daemon without root privileges.
+[3] Remount the system partitions as writable.
+[4] Change file permissions.
+[0] Return to the main menu.
+        """
+        print(menu)
+        choice = input("Select an option: ").strip()
+
+        if choice == "1":
+            restart_adbd_root()
+        elif choice == "2":
+            restart_adbd_unroot()
+        elif choice == "3":
+            remount_system_partitions()
+        elif choice == "4":
+            change_file_permissions()
+        elif choice == "0":
+            break
+        else:
+            print("Invalid option, please select again.")
+
+def restart_adbd_root():
+    clear_screen()
+    print("Restarting adbd with root privileges")
+    try:
+        device_profiles.invalidate()
+        print(adb_client.service_output('root:').strip())
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Root Access and File Permissions menu...")
+
+def restart_adbd_unroot():
+    clear_screen()
+    print("Restarting adbd without root privileges")
+    try:
+        device_profiles.invalidate()
+        print(adb_client.service_output('unroot:').strip())
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Root Access and File Permissions menu...")
+
+def remount_system_partitions():
+    clear_screen()
+    print("Remounting system partitions as writable")
+    try:
+        print(adb_client.service_output('remount:').strip())
+        print("System partitions remounted as writable.")
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Root Access and File Permissions menu...")
+
+def change_file_permissions():
+    clear_screen()
+    print("Changing File Permissions")
+    file_path = input("Enter the file path on the device: ").strip()
+    permissions = input("Enter the new permissions (e.g., 755): ").strip()
+    try:
+        shell_pool.run(['chmod', permissions, file_path], check=True)
+        print(f"Permissions for {file_path} changed to {permissions}.")
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Root Access and File Permissions menu...")
+
+def remote_control():
+    while True:
+        clear_screen()
+        display_banner()
+        print("Remote Control")
+        menu = """
+[1] Send a key event.
+[2] Simulate a tap at specified coordinates.
+[3] Simulate a swipe.
+[4] Run a batched input sequence.
+[0] Return to the main menu.
+        """
+        print(menu)
+        choice = input("Select an option: ").strip()
+
+        if choice == "1":
+            send_key_event()
+        elif choice == "2":
+            simulate_tap()
+        elif choice == "3":
+            simulate_swipe()
+        elif choice == "4":
+            run_input_sequence()
+        elif choice == "0":
+            break
+        else:
+            print("Invalid option, please select again.")
+
+def send_key_event():
+    clear_screen()
+    print("Sending Key Event")
+    keycode = input("Enter the keycode (e.g., 3 for Home, 4 for Back): ").strip()
+    try:
+        shell_pool.run(['input', 'keyevent', keycode], check=True)
+        print(f"Key event {keycode} sent.")
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Remote Control menu...")
+
+def simulate_tap():
+    clear_screen()
+    print("Simulating Tap")
+    x = input("Enter the x-coordinate: ").strip()
+    y = input("Enter the y-coordinate: ").strip()
+    try:
+        shell_pool.run(['input', 'tap', x, y], check=True)
+        print(f"Tap simulated at coordinates ({x}, {y}).")
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Remote Control menu...")
+
+def simulate_swipe():
+    clear_screen()
+    print("Simulating Swipe")
+    x1 = input("Enter the start x-coordinate: ").strip()
+    y1 = input("Enter the start y-coordinate: ").strip()
+    x2 = input("Enter the end x-coordinate: ").strip()
+    y2 = input("Enter the end y-coordinate: ").strip()
+    duration = input("Enter the swipe duration in milliseconds: ").strip()
+    try:
+        shell_pool.run(['input', 'swipe', x1, y1, x2, y2, duration], check=True)
+        print(f"Swipe simulated from ({x1}, {y1}) to ({x2}, {y2}) over {duration} ms.")
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Remote Control menu...")
+
+def parse_input_events(lines):
+    # One event per line (or ';'-separated inline):
+    #   tap X Y | swipe X1 Y1 X2 Y2 [MS] | key CODE... | text STRING | delay MS
+    events = []
+    for number, line in enumerate(lines, 1):
+        line = line.split('#', 1)[0].strip()
+        if not line:
+            continue
+        action, _, rest = line.partition(' ')
+        action = action.lower()
+        args = rest.split()
+        try:
+            if action == 'tap' and len(args) == 2:
+                events.append(('tap', [int(arg) for arg in args]))
+            elif action == 'swipe' and len(args) in (4, 5):
+                events.append(('swipe', [int(arg) for arg in args]))
+            elif action in ('key', 'keyevent') and args:
+                events.append(('key', args))
+            elif action == 'text' and rest:
+                events.append(('text', [rest]))
+            elif action in ('delay', 'sleep') and len(args) == 1:
+                events.append(('delay', [float(args[0]) / 1000]))
+            else:
+                raise ValueError
+        except ValueError:
+            raise ValueError(f"line {number}: cannot parse '{line}'")
+    return events
+
+def build_input_script(events):
+    commands = []
+    pending_keys = []
+    for action, args in events:
+        if action == 'key':
+            # Back-to-back key events share a single `input keyevent` call.
+            pending_keys.extend(args)
+            continue
+        if pending_keys:
+            commands.append(format_shell_command(['input', 'keyevent'] + pending_keys))
+            pending_keys = []
+        if action == 'delay':
+            commands.append(f"sleep {args[0]:g}")
+        elif action == 'text':
+            commands.append(format_shell_command(['input', 'text', args[0].replace(' ', '%s')]))
+        else:
+            commands.append(format_shell_command(['input', action] + args))
+    if pending_keys:
+        commands.append(format_shell_command(['input', 'keyevent'] + pending_keys))
+    return ' && '.join(commands)
+
+def inject_input_events(events, serial=None):
+    event_count = sum(len(args) if action == 'key' else 1 for action, args in events if action != 'delay')
+    start = time.perf_counter()
+    shell_pool.run(build_input_script(events), serial, check=True)
+    return event_count, time.perf_counter() - start
+
+def run_input_sequence():
+    clear_screen()
+    print("Running Batched Input Sequence")
+    source = input("Enter a file of events, or events separated by ';' (e.g., tap 100 200; delay 300; key 4): ").strip()
+    try:
+        if os.path.isfile(source):
+            with open(source) as events_file:
+                events = parse_input_events(events_file)
+        else:
+            events = parse_input_events(source.split(';'))
+        event_count, elapsed = inject_input_events(events)
+        rate = event_count / elapsed if elapsed else 0
+        print(f"Injected {event_count} events in {elapsed:.2f} seconds ({rate:.1f} events/second).")
+    except ValueError as e:
+        print(f"Invalid input sequence: {e}")
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Remote Control menu...")
+
+def power_management():
+    while True:
+        clear_screen()
+        display_banner()
+        print("Power Management")
+        menu = """
+[1] Reboot the device.
+[2] Reboot the device into bootloader.
+[3] Reboot the device into recovery mode.
+[4] Power off the device.
+[0] Return to the main menu.
+        """
+        print(menu)
+        choice = input("Select an option: ").strip()
+
+        if choice == "1":
+            reboot_device()
+        elif choice == "2":
+            reboot_bootloader()
+        elif choice == "3":
+            reboot_recovery()
+        elif choice == "4":
+            power_off_device()
+        elif choice == "0":
+            break
+        else:
+            print("Invalid option, please select again.")
+
+def reboot_device():
+    clear_screen()
+    print("Rebooting Device")
+    try:
+        adb_client.service_output('reboot:')
+        print("Device is rebooting.")
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Power Management menu...")
+
+def reboot_bootloader():
+    clear_screen()
+    print("Rebooting Device into Bootloader")
+    try:
+        adb_client.service_output('reboot:bootloader')
+        print("Device is rebooting into bootloader.")
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Power Management menu...")
+
+def reboot_recovery():
+    clear_screen()
+    print("Rebooting Device into Recovery Mode")
+    try:
+        adb_client.service_output('reboot:recovery')
+        print("Device is rebooting into recovery mode.")
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Power Management menu...")
+
+def power_off_device():
+    clear_screen()
+    print("Powering Off Device")
+    try:
+        adb_client.shell(['reboot', '-p'])
+        print("Device is powering off.")
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Power Management menu...")
+
+def permissions_security():
+    while True:
+        clear_screen()
+        display_banner()
+        print("Permissions and Security")
+        menu = """
+[1] Grant a specific permission to an app.
+[2] Revoke a specific permission from an app.
+[3] Manage device policies.
+[0] Return to the main menu.
+        """
+        print(menu)
+        choice = input("Select an option: ").strip()
+
+        if choice == "1":
+            grant_permission()
+        elif choice == "2":
+            revoke_permission()
+        elif choice == "3":
+            manage_device_policies()
+        elif choice == "0":
+            break
+        else:
+            print("Invalid option, please select again.")
+
+def grant_permission():
+    clear_screen()
+    print("Granting Permission")
+    package = prompt_package_name("Enter the package name: ")
+    permission = input("Enter the permission (e.g., android.permission.CAMERA): ").strip()
+    try:
+        shell_pool.run(['pm', 'grant', package, permission], check=True)
+        print(f"Permission {permission} granted to {package}.")
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Permissions and Security menu...")
+
+def revoke_permission():
+    clear_screen()
+    print("Revoking Permission")
+    package = prompt_package_name("Enter the package name: ")
+    permission = input("Enter the permission (e.g., android.permission.CAMERA): ").strip()
+    try:
+        shell_pool.run(['pm', 'revoke', package, permission], check=True)
+        print(f"Permission {permission} revoked from {package}.")
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Permissions and Security menu...")
+
+def manage_device_policies():
+    clear_screen()
+    print("Managing Device Policies")
+    try:
+        # Attempt to run the device policy manager command
+        result = adb_client.shell(['device_policy_manager'])
+        if result.exit_code:
+            raise AdbError(result.stderr or result.stdout)
+        print(result.stdout)
+    except AdbError as e:
+        # Specific handling for command not found or inaccessible
+        if 'not found' in str(e) or 'inaccessible' in str(e):
+            print("The 'device_policy_manager' command is not available on this device.")
+            print("Possible reasons:")
+            print("- The device may not support this command.")
+            print("- The device may need to be rooted to access this feature.")
+            print("- The command may require a different syntax or different device policies.")
+        else:
+            print(f"Error occurred: {e}")
+    except Exception as e:
+        print(f"An unexpected error occurred: {e}")
+    input("\nPress Enter to return to the Permissions and Security menu...")
+
+
+
+
+def battery_management():
+    while True:
+        clear_screen()
+        display_banner()
+        print("Battery Management")
+        menu = """
+[1] Dump the current battery status.
+[2] Set the battery level (useful for testing).
+[3] Reset the battery status.
+[0] Return to the main menu.
+        """
+        print(menu)
+        choice = input("Select an option: ").strip()
+
+        if choice == "1":
+            dump_battery_status()
+        elif choice == "2":
+            set_battery_level()
+        elif choice == "3":
+            reset_battery_status()
+        elif choice == "0":
+            break
+        else:
+            print("Invalid option, please select again.")
+
+def dump_battery_status():
+    clear_screen()
+    print("Dumping Battery Status")
+    try:
+        print(dumpsys_cache.text('battery'))
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Battery Management menu...")
+
+def set_battery_level():
+    clear_screen()
+    print("Setting Battery Level")
+    level = input("Enter the battery level (e.g., 50): ").strip()
+    try:
+        shell_pool.run(['dumpsys', 'battery', 'set', 'level', level], check=True)
+        dumpsys_cache.invalidate(service='battery')
+        print(f"Battery level set to {level}.")
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Battery Management menu...")
+
+def reset_battery_status():
+    clear_screen()
+    print("Resetting Battery Status")
+    try:
+        shell_pool.run(['dumpsys', 'battery', 'reset'], check=True)
+        dumpsys_cache.invalidate(service='battery')
+        print("Battery status reset.")
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Battery Management menu...")
+
+def advanced_usage():
+    while True:
+        clear_screen()
+        display_banner()
+        print("Advanced Usage")
+        menu = """
+[1] Wait for device connection.
+[2] Enter superuser mode.
+[3] Get device properties.
+[4] Set device properties.
+[0] Return to the main menu.
+        """
+        print(menu)
+        choice = input("Select an option: ").strip()
+
+        if choice == "1":
+            wait_for_device()
+        elif choice == "2":
+            enter_superuser_mode()
+        elif choice == "3":
+            get_device_properties()
+        elif choice == "4":
+            set_device_properties()
+        elif choice == "0":
+            break
+        else:
+            print("Invalid option, please select again.")
+
+def wait_for_device():
+    clear_screen()
+    print("Waiting for Device Connection")
+    try:
+        print("Waiting for a device to be attached (press Ctrl+C to cancel)...")
+        serial = device_tracker.wait_for()
+        print(f"Device {serial} is now connected.")
+    except KeyboardInterrupt:
+        print("\nStopped waiting for a device.")
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Advanced Usage menu...")
+
+def enter_superuser_mode():
+    clear_screen()
+    print("Entering Superuser Mode")
+    try:
+        with instrumentation.span('adb shell su (interactive)'):
+            subprocess.run([get_adb_path(), 'shell', 'su'], check=True)
+        print("Entered superuser mode.")
+    except subprocess.CalledProcessError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Advanced Usage menu...")
+
+def get_device_properties():
+    clear_screen()
+    print("Getting Device Properties")
+    try:
+        props = device_profiles.get()['props']
+        for name, value in sorted(props.items()):
+            print(f"[{name}]: [{value}]")
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Advanced Usage menu...")
+
+def set_device_properties():
+    clear_screen()
+    print("Setting Device Properties")
+    prop_name = input("Enter the property name (e.g., sys.debuggable): ").strip()
+    prop_value = input("Enter the property value: ").strip()
+    try:
+        shell_pool.run(['setprop', prop_name, prop_value], check=True)
+        device_profiles.invalidate()
+        print(f"Property {prop_name} set to {prop_value}.")
+    except AdbError as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Advanced Usage menu...")
+
+
+# Job manifests
+def job_install(step, serial):
+    apks = step['apks'] if 'apks' in step else [step['apk']]
+    options = ['-r'] if step.get('reinstall', True) else []
+    if len(apks) > 1:
+        adb_client.install_multiple(apks, serial, options)
+        result = 'installed'
+    else:
+        result = install_if_changed(apks[0], serial, options, step.get('delta', False))
+    package_index.invalidate(serial)
+    return result
+
+def job_grant(step, serial):
+    commands = [['pm', 'grant', step['package'], permission] for permission in step['permissions']]
+    for command, result in zip(commands, shell_pool.run_many(commands, serial)):
+        if result.exit_code:
+            raise AdbError(f"{' '.join(command)}: {result.stdout.strip()}")
+    return f"{len(commands)} permission(s) granted"
+
+def job_push(step, serial):
+    return f"{adb_client.push(step['local'], step['remote'], serial)} bytes pushed"
+
+def job_pull(step, serial):
+    os.makedirs(os.path.dirname(os.path.abspath(step['local'])), exist_ok=True)
+    return f"{adb_client.pull(step['remote'], step['local'], serial)} bytes pulled"
+
+def job_sync(step, serial):
+    summary = sync_directory(step['local'], step['remote'], step.get('direction', 'push'), step.get('delete', False), serial)
+    return f"{summary['transferred']} transferred, {summary['unchanged']} unchanged"
+
+def job_start_activity(step, serial):
+    result = shell_pool.run(['am', 'start', '-W', '-n', step['component']], serial, check=True)
+    if 'Error' in result.stdout:
+        raise AdbError(result.stdout.strip())
+    return step['component']
+
+def job_shell(step, serial):
+    return shell_pool.run(step['command'], serial, check=True).stdout.strip()
+
+def job_capture_logs(step, serial):
+    deadline = time.monotonic() + step.get('seconds', 60)
+    matches = parse_log_filter(step.get('filter', ''))
+    os.makedirs(os.path.dirname(os.path.abspath(step['output'])), exist_ok=True)
+    written = 0
+    with open_logcat_stream(serial) as conn, open(step['output'], 'w', encoding='utf-8') as log_file:
+        conn.sock.settimeout(0.5)
+
+        def chunks():
+            while time.monotonic() < deadline:
+                try:
+                    chunk = conn.sock.recv(SYNC_DATA_MAX)
+                except socket.timeout:
+                    continue
+                if not chunk:
+                    return
+                yield chunk
+        for entry in iter_logcat_entries(chunks()):
+            if matches(entry):
+                log_file.write(format_log_entry(entry) + '\n')
+                written += 1
+    return f"{written} log line(s)"
+
+def job_screenshot(step, serial):
+    os.makedirs(os.path.dirname(os.path.abspath(step['output'])), exist_ok=True)
+    with open(step['output'], 'wb') as image_file:
+        image_file.write(capture_screenshot(serial))
+    return step['output']
+
+JOB_ACTIONS = {
+    'install': job_install,
+    'grant': job_grant,
+    'push': job_push,
+    'pull': job_pull,
+    'sync': job_sync,
+    'start_activity': job_start_activity,
+    'shell': job_shell,
+    'capture_logs': job_capture_logs,
+    'screenshot': job_screenshot,
+}
+
+def load_job(path):
+    if path.endswith('.toml'):
+        if tomllib is None:
+            raise ValueError("TOML job files need Python 3.11 or newer; use JSON instead.")
+        with open(path, 'rb') as job_file:
+            job = tomllib.load(job_file)
+    else:
+        with open(path) as job_file:
+            job = json.load(job_file)
+    steps = {}
+    for step in job.get('steps', []):
+        if step.get('id') in steps:
+            raise ValueError(f"duplicate step id '{step.get('id')}'")
+        if step.get('action') not in JOB_ACTIONS:
+            raise ValueError(f"step '{step.get('id')}': unknown action '{step.get('action')}'")
+        steps[step['id']] = step
+    for step in steps.values():
+        for need in step.get('needs', []):
+            if need not in steps:
+                raise ValueError(f"step '{step['id']}' needs unknown step '{need}'")
+    visiting, visited = set(), set()
+
+    def visit(step_id):
+        if step_id in visited:
+            return
+        if step_id in visiting:
+            raise ValueError(f"dependency cycle through step '{step_id}'")
+        visiting.add(step_id)
+        for need in steps[step_id].get('needs', []):
+            visit(need)
+        visiting.discard(step_id)
+        visited.add(step_id)
+    for step_id in steps:
+        visit(step_id)
+    job['steps'] = steps
+    return job
+
+def expand_step(step, serial):
+    return {key: value.replace('{serial}', serial) if isinstance(value, str) else value
+            for key, value in step.items()}
+
+def load_checkpoint(path):
+    try:
+        with open(path) as checkpoint_file:
+            return {serial: set(steps) for serial, steps in json.load(checkpoint_file).items()}
+    except (OSError, ValueError):
+        return {}
+
+def save_checkpoint(path, done):
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w') as checkpoint_file:
+        json.dump({serial: sorted(steps) for serial, steps in done.items()}, checkpoint_file, indent=2)
+    os.replace(temp_path, path)
+
+def run_job(path, serials=None, restart=False, on_event=print):
+    # Runs every step on every device as a DAG. Independent steps run in
+    # parallel within the global and per-device caps; finished steps are
+    # checkpointed so a rerun picks up where the last one stopped.
+    job = load_job(path)
+    steps = job['steps']
+    if serials is None:
+        devices = job.get('devices', 'all')
+        serials = device_tracker.ready() if devices == 'all' else devices
+    checkpoint_path = job.get('checkpoint', path + '.state.json')
+    done = {} if restart else load_checkpoint(checkpoint_path)
+    for serial in serials:
+        done.setdefault(serial, set())
+    max_parallel = job.get('max_parallel', JOB_MAX_PARALLEL)
+    max_per_device = job.get('max_per_device', JOB_MAX_PER_DEVICE)
+    pending = {(serial, step_id) for serial in serials for step_id in steps if step_id not in done[serial]}
+    failed = {}
+    skipped = set()
+    running = {}
+    per_device = {serial: 0 for serial in serials}
+
+    def skip_blocked():
+        changed = True
+        while changed:
+            changed = False
+            for task in sorted(pending):
+                serial, step_id = task
+                if any(need in failed.get(serial, {}) or (serial, need) in skipped
+                       for need in steps[step_id].get('needs', [])):
+                    pending.discard(task)
+                    skipped.add(task)
+                    changed = True
+                    on_event(f"{serial}: {step_id} skipped (a dependency failed)")
+
+    with ThreadPoolExecutor(max_workers=max_parallel) as executor:
+        while pending or running:
+            skip_blocked()
+            for task in sorted(pending):
+                serial, step_id = task
+                if len(running) >= max_parallel or per_device[serial] >= max_per_device:
+                    continue
+                if all(need in done[serial] for need in steps[step_id].get('needs', [])):
+                    pending.discard(task)
+                    per_device[serial] += 1
+                    step = expand_step(steps[step_id], serial)
+                    on_event(f"{serial}: {step_id} started")
+                    running[executor.submit(JOB_ACTIONS[step['action']], step, serial)] = (task, time.perf_counter())
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                (serial, step_id), started = running.pop(future)
+                per_device[serial] -= 1
+                elapsed = time.perf_counter() - started
+                try:
+                    detail = future.result()
+                except Exception as e:
+                    failed.setdefault(serial, {})[step_id] = str(e)
+                    on_event(f"{serial}: {step_id} FAILED after {elapsed:.1f}s: {e}")
+                    continue
+                done[serial].add(step_id)
+                save_checkpoint(checkpoint_path, done)
+                on_event(f"{serial}: {step_id} done in {elapsed:.1f}s ({detail})")
+    return failed, len(skipped)
+
+def run_job_menu():
+    clear_screen()
+    print("Run a Job File")
+    path = input("Enter the path to the JSON or TOML job file: ").strip()
+    restart = input("Ignore the saved checkpoint and start over? (y/n): ").strip().lower() == 'y'
+    try:
+        start = time.perf_counter()
+        failures, skipped = run_job(path, restart=restart)
+        failed_count = sum(len(steps) for steps in failures.values())
+        print(f"\nJob finished in {time.perf_counter() - start:.1f} seconds: "
+              f"{failed_count} step(s) failed, {skipped} skipped.")
+    except (AdbError, OSError, ValueError) as e:
+        print(f"Error occurred: {e}")
+    input("\nPress Enter to return to the Development and Testing menu...")
+
+# Non-interactive command line and batch mode
+def cli_devices(args):
+    for device in device_tracker.devices_long():
+        details = ' '.join(f"{key}:{value}" for key, value in device.items() if key not in ('serial', 'state'))
+        print(f"{device['serial']}\t{device['state']}\t{details}" if args.long else f"{device['serial']}\t{device['state']}")
+    return 0
+
+def connect_and_watch(addresses, watch):
+    device_tracker.start()
+    results = wireless_connector.connect_all(
+        addresses, watch, lambda address, status: print(f"{address}: {status}", file=sys.stderr))
+    print_connect_summary(results)
+    if watch and any(result['ok'] for result in results):
+        print("Reconnecting dropped devices until Ctrl+C.", file=sys.stderr)
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+        wireless_connector.stop()
+    return 0 if all(result['ok'] for result in results) else 1
+
+def cli_connect(args):
+    addresses = [address if ':' in address else f"{address}:{WIFI_DEFAULT_PORT}" for address in args.addresses]
+    return connect_and_watch(addresses, args.watch)
+
+def cli_discover(args):
+    targets = parse_targets(' '.join(args.targets), args.scan_port)
+    devices = discover_wireless_devices(targets, not args.no_mdns)
+    for device in devices:
+        print(f"{device['address']}\t{device['source']}\t{device['detail']}")
+    if args.connect:
+        return connect_and_watch([device['address'] for device in devices], args.watch)
+    return 0
+
+def cli_install(args):
+    options = ['-r'] if args.reinstall else []
+    if len(args.apks) > 1:
+        adb_client.install_multiple(args.apks, args.serial, options)
+        mode = 'installed'
+    else:
+        mode = install_if_changed(args.apks[0], args.serial, options, args.delta)
+    package_index.invalidate(args.serial)
+    print(f"{', '.join(args.apks)}: {mode}")
+    return 0
+
+def cli_uninstall(args):
+    result = adb_client.shell(['pm', 'uninstall', args.package], args.serial)
+    package_index.invalidate(args.serial)
+    print(result.stdout.strip())
+    return 0 if 'Success' in result.stdout else 1
+
+def cli_push(args):
+    print(f"{adb_client.push(args.local, args.remote, args.serial)} bytes pushed.")
+    file_index.invalidate(args.serial, args.remote)
+    return 0
+
+def cli_pull(args):
+    print(f"{adb_client.pull(args.remote, args.local, args.serial)} bytes pulled.")
+    return 0
+
+def cli_sync(args):
+    summary = sync_directory(args.local, args.remote, 'pull' if args.pull else 'push', args.delete, args.serial)
+    print(f"{summary['transferred']} transferred ({summary['bytes']} bytes), "
+          f"{summary['unchanged']} unchanged, {summary['deleted']} deleted.")
+    return 0
+
+def cli_files(args):
+    # Lists matches by default; --delete, --chmod and --pull act on all of them at once.
+    if args.refresh:
+        file_index.refresh(compile_remote_glob(args.pattern)[1], args.serial)
+    if args.delete:
+        paths, errors = file_index.delete(args.pattern, args.serial)
+    elif args.chmod:
+        paths, errors = file_index.chmod(args.pattern, args.chmod, args.serial, args.recursive)
+    elif args.pull:
+        matches, received = file_index.pull(args.pattern, args.pull, args.serial)
+        print(f"{len(matches)} file(s) pulled ({received} bytes).")
+        return 0
+    else:
+        for entry in file_index.glob(args.pattern, args.serial):
+            print(format_remote_file(entry))
+        return 0
+    for line in errors:
+        print(line, file=sys.stderr)
+    print(f"{len(paths)} item(s) {'deleted' if args.delete else 'changed'}.")
+    return 1 if errors else 0
+
+def cli_shell(args):
+    result = shell_pool.run(' '.join(args.command), args.serial)
+    sys.stdout.write(result.stdout)
+    return result.exit_code
+
+def cli_screenshot(args):
+    screenshot = capture_screenshot(args.serial, args.raw)
+    with open(args.filename, 'wb') as image_file:
+        image_file.write(encode_png(screenshot) if args.raw else screenshot)
+    print(f"Screenshot saved as {args.filename}.")
+    return 0
+
+def cli_logcat(args):
+    matches = parse_log_filter(args.filter)
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    command = ['logcat', '-B'] + (['-d'] if args.dump else [])
+    try:
+        with adb_client.open_service(f"exec:{format_shell_command(command)}", args.serial) as conn:
+            for entry in iter_logcat_entries(conn.iter_chunks()):
+                if matches(entry):
+                    output.write(format_log_entry(entry) + '\n')
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if args.output:
+            output.close()
+    return 0
+
+def cli_monitor(args):
+    on_cycle = (lambda monitor: print(format_health_table(monitor) + '\n')) if args.table else None
+    run_health_monitor(args.interval, args.port, args.history, on_cycle)
+    return 0
+
+def cli_dumpsys(args):
+    if not args.service:
+        print('\n'.join(dumpsys_cache.services(args.serial)))
+    elif args.json:
+        if args.service not in DUMPSYS_PARSERS:
+            raise ValueError(f"no parser for '{args.service}'; parsers exist for {', '.join(DUMPSYS_PARSERS)}")
+        print(json.dumps(dumpsys_cache.parsed(args.service, args.serial, args.args or None), indent=2))
+    else:
+        print(dumpsys_cache.text(args.service, args.serial, args.args))
+    return 0
+
+def cli_bugreport(args):
+    if args.zip:
+        with BugreportIndex(args.zip) as report:
+            if args.entries:
+                for name, size, _ in report.entries():
+                    print(f"{size}\t{name}")
+            elif args.section:
+                matches = report.find(args.section)
+                if not matches:
+                    raise ValueError(f"no section matches '{args.section}'")
+                for line in report.iter_section(matches[0]):
+                    sys.stdout.write(line)
+            else:
+                for section in report.sections:
+                    print(f"{section['length']}\t{section['name']}")
+        return 0
+    progress = None if args.quiet else print_bugreport_progress
+    local_path = create_bugreport(args.serial, args.output, progress)
+    print(("" if args.quiet else "\n") + local_path)
+    return 0
+
+def cli_backup(args):
+    serials = device_tracker.ready() if args.all_devices else [adb_client.get_serial(args.serial)]
+    results = backup_devices(serials, args.output, args.packages,
+                             lambda serial, package: print(f"{serial}: {package}", file=sys.stderr))
+    for result in results:
+        print(f"{result['serial']}\t{result['path'] or 'FAILED: ' + result['reason']}")
+    return 0 if all(result['ok'] for result in results) else 1
+
+def cli_restore(args):
+    if args.list:
+        for name, details in sorted(read_backup_index(args.archive)['packages'].items()):
+            print(f"{name}\t{details['bytes']}")
+        return 0
+    restore_archive(args.archive, args.packages, args.serial)
+    return 0
+
+def cli_getprop(args):
+    props = device_profiles.get(args.serial, refresh=args.refresh)['props']
+    if args.name:
+        print(props.get(args.name, ''))
+    else:
+        for name, value in sorted(props.items()):
+            print(f"[{name}]: [{value}]")
+    return 0
+
+def cli_setprop(args):
+    shell_pool.run(['setprop', args.name, args.value], args.serial, check=True)
+    device_profiles.invalidate(args.serial)
+    return 0
+
+def cli_input(args):
+    if os.path.isfile(args.events):
+        with open(args.events) as events_file:
+            events = parse_input_events(events_file)
+    else:
+        events = parse_input_events(args.events.split(';'))
+    event_count, elapsed = inject_input_events(events, args.serial)
+    print(f"Injected {event_count} events in {elapsed:.2f} seconds.")
+    return 0
+
+def cli_reboot(args):
+    adb_client.service_output(f"reboot:{args.target or ''}", args.serial)
+    return 0
+
+def cli_forward(args):
+    if args.list:
+        print(format_forward_table(forward_manager.list()))
+    elif args.remove_all:
+        forward_manager.remove_all(args.serial)
+    elif args.remove:
+        forward_manager.remove(adb_client.get_serial(args.serial), 'forward', args.remove)
+    elif not (args.local and args.remote):
+        raise ValueError("forward needs LOCAL and REMOTE, or one of --list, --remove, --remove-all")
+    elif args.relay:
+        # Runs until Ctrl+C; the relay follows the device across reconnects.
+        entry = forward_manager.add(args.local, args.remote, args.serial, kind='relay')
+        print(f"Relaying {entry['local']} to {entry['remote']} on {entry['serial']}.", file=sys.stderr)
+        watch_relays()
+        forward_manager.close()
+    else:
+        adb_client.forward(args.local, args.remote, args.serial)
+    return 0
+
+def cli_reverse(args):
+    if args.remove_all:
+        adb_client.remove_all_reverses(args.serial)
+    elif args.remove:
+        adb_client.remove_reverse(args.remove, args.serial)
+    elif not (args.remote and args.local):
+        raise ValueError("reverse needs REMOTE and LOCAL, or one of --remove, --remove-all")
+    else:
+        adb_client.reverse(args.remote, args.local, args.serial)
+    return 0
+
+def cli_batch(args):
+    # Every line is one CLI invocation; all of them share this process, its
+    # adb server connection and its pooled shell sessions.
+    parser = build_arg_parser()
+    timings = []
+    failures = 0
+    start = time.perf_counter()
+    with open(args.file) as batch_file:
+        lines = [line.strip() for line in batch_file]
+    for number, line in enumerate(lines, 1):
+        if not line or line.startswith('#'):
+            continue
+        operation_start = time.perf_counter()
+        try:
+            operation = parser.parse_args(shlex.split(line))
+            if operation.serial is None:
+                operation.serial = args.serial
+            if operation.handler is cli_batch:
+                raise AdbError("nested batch files are not supported")
+            exit_code = operation.handler(operation)
+        except SystemExit as e:
+            exit_code = e.code or 0
+        except (AdbError, OSError, ValueError) as e:
+            print(f"line {number}: Error occurred: {e}", file=sys.stderr)
+            exit_code = 1
+        timings.append((line, time.perf_counter() - operation_start, exit_code))
+        if exit_code:
+            failures += 1
+            if not args.keep_going:
+                break
+    total = time.perf_counter() - start
+    print(f"\n{'Seconds':>8}  {'Exit':>4}  Operation")
+    for line, elapsed, exit_code in timings:
+        print(f"{elapsed:>8.3f}  {exit_code:>4}  {line}")
+    print(f"\n{len(timings)} operation(s), {failures} failed, {total:.3f} seconds total.")
+    return 1 if failures else 0
+
+def cli_job(args):
+    serials = [args.serial] if args.serial else None
+    failures, skipped = run_job(args.file, serials, args.restart)
+    return 1 if failures or skipped else 0
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(prog='easyadb', description="Run EasyADB operations without the menu.")
+    parser.add_argument('-s', '--serial', help="target device serial (default: the only connected device)")
+    parser.add_argument('-H', '--host', default=ADB_SERVER_HOST, help="adb server host")
+    parser.add_argument('-P', '--port', type=int, default=ADB_SERVER_PORT, help="adb server port")
+    parser.add_argument('--profile', nargs='?', const='easyadb-trace.json', metavar='TRACE_FILE',
+                        help="print a per-operation latency summary on exit and write a Chrome trace "
+                             "(without a command, profiles the interactive menu)")
+    commands = parser.add_subparsers(dest='command')
+
+    command = commands.add_parser('devices', help="list connected devices")
+    command.add_argument('-l', '--long', action='store_true', help="show device details")
+    command.set_defaults(handler=cli_devices)
+
+    command = commands.add_parser('connect', help="connect to network devices, several at a time, with retries")
+    command.add_argument('addresses', nargs='+', metavar='ADDRESS', help=f"host or host:port (default port {WIFI_DEFAULT_PORT})")
+    command.add_argument('--watch', action='store_true', help="stay running and reconnect devices that drop off")
+    command.set_defaults(handler=cli_connect)
+
+    command = commands.add_parser('discover', help="find wireless-debugging devices by mDNS and by scanning addresses")
+    command.add_argument('targets', nargs='*', help="e.g. 192.168.1.0/24, 192.168.1.20-80 or 10.0.0.7:5556")
+    command.add_argument('--scan-port', type=int, default=WIFI_DEFAULT_PORT,
+                         help="port to probe on addresses given without one")
+    command.add_argument('--no-mdns', action='store_true', help="skip the adb server's mDNS service list")
+    command.add_argument('--connect', action='store_true', help="connect to every device found")
+    command.add_argument('--watch', action='store_true', help="with --connect, keep reconnecting dropped devices")
+    command.set_defaults(handler=cli_discover)
+
+    command = commands.add_parser('install', help="install an APK, or a split set")
+    command.add_argument('apks', nargs='+')
+    command.add_argument('-r', '--reinstall', action='store_true', help="keep app data")
+    command.add_argument('--delta', action='store_true', help="send only changed zip entries when possible")
+    command.set_defaults(handler=cli_install)
+
+    command = commands.add_parser('uninstall', help="uninstall a package")
+    command.add_argument('package')
+    command.set_defaults(handler=cli_uninstall)
+
+    command = commands.add_parser('push', help="copy a file or directory to the device")
+    command.add_argument('local')
+    command.add_argument('remote')
+    command.set_defaults(handler=cli_push)
+
+    command = commands.add_parser('pull', help="copy a file or directory from the device")
+    command.add_argument('remote')
+    command.add_argument('local')
+    command.set_defaults(handler=cli_pull)
+
+    command = commands.add_parser('sync', help="incrementally sync a directory tree")
+    command.add_argument('local')
+    command.add_argument('remote')
+    command.add_argument('--pull', action='store_true', help="sync device to host instead of host to device")
+    command.add_argument('--delete', action='store_true', help="delete files that only exist on the destination")
+    command.set_defaults(handler=cli_sync)
+
+    command = commands.add_parser('files', help="list, delete, chmod or pull device files matching a pattern")
+    command.add_argument('pattern', help="absolute path pattern; * and ? stay within a directory, ** spans any depth")
+    command.add_argument('--refresh', action='store_true', help="re-list the pattern's directory instead of using the cache")
+    action = command.add_mutually_exclusive_group()
+    action.add_argument('--delete', action='store_true', help="delete every match")
+    action.add_argument('--chmod', metavar='MODE', help="change the mode of every match")
+    action.add_argument('--pull', metavar='DIR', help="pull every matching file into DIR")
+    command.add_argument('-R', '--recursive', action='store_true', help="with --chmod, include directory contents")
+    command.set_defaults(handler=cli_files)
+
+    command = commands.add_parser('shell', help="run a shell command")
+    command.add_argument('command', nargs=argparse.REMAINDER)
+    command.set_defaults(handler=cli_shell)
+
+    command = commands.add_parser('screenshot', help="save a screenshot")
+    command.add_argument('filename')
+    command.add_argument('--raw', action='store_true', help="fetch the raw framebuffer and encode on the host")
+    command.set_defaults(handler=cli_screenshot)
+
+    command = commands.add_parser('logcat', help="print or save device logs")
+    command.add_argument('-d', '--dump', action='store_true', help="dump the buffer and exit")
+    command.add_argument('-f', '--filter', default='', help="e.g. 'tag=ActivityManager priority=W pid=123'")
+    command.add_argument('-o', '--output', help="write to a file instead of the terminal")
+    command.set_defaults(handler=cli_logcat)
+
+    command = commands.add_parser('monitor', help="poll device health and serve Prometheus metrics")
+    command.add_argument('--interval', type=float, default=MONITOR_INTERVAL, help="seconds between polls")
+    command.add_argument('--port', type=int, default=MONITOR_PORT, help="metrics port, 0 to disable")
+    command.add_argument('--history', type=int, default=MONITOR_HISTORY, help="samples kept per device")
+    command.add_argument('--table', action='store_true', help="print a table after every poll")
+    command.set_defaults(handler=cli_monitor)
+
+    command = commands.add_parser('dumpsys', help="list services, or dump one service as text or parsed JSON")
+    command.add_argument('service', nargs='?')
+    command.add_argument('args', nargs=argparse.REMAINDER)
+    command.add_argument('--json', action='store_true', help="print the structured form")
+    command.set_defaults(handler=cli_dumpsys)
+
+    command = commands.add_parser('bugreport', help="create a bug report, or read sections of an existing one")
+    command.add_argument('zip', nargs='?', help="existing bug report zip to index instead of creating one")
+    command.add_argument('section', nargs='?', help="print the first section whose name contains this text")
+    command.add_argument('--entries', action='store_true', help="list the files inside the zip")
+    command.add_argument('-o', '--output', default='.', help="directory for a new report")
+    command.add_argument('-q', '--quiet', action='store_true', help="no progress output")
+    command.set_defaults(handler=cli_bugreport)
+
+    command = commands.add_parser('backup', help="back up apps into a per-package, compressed archive")
+    command.add_argument('packages', nargs='*', help="packages to back up (default: everything)")
+    command.add_argument('-o', '--output', default='backups', help="output directory")
+    command.add_argument('--all-devices', action='store_true', help="back up every connected device in parallel")
+    command.set_defaults(handler=cli_backup)
+
+    command = commands.add_parser('restore', help="restore all or selected packages from a backup archive")
+    command.add_argument('archive')
+    command.add_argument('packages', nargs='*')
+    command.add_argument('--list', action='store_true', help="list the packages in the archive")
+    command.set_defaults(handler=cli_restore)
+
+    command = commands.add_parser('getprop', help="print device properties")
+    command.add_argument('name', nargs='?')
+    command.add_argument('--refresh', action='store_true', help="ignore the cached device profile")
+    command.set_defaults(handler=cli_getprop)
+
+    command = commands.add_parser('setprop', help="set a device property")
+    command.add_argument('name')
+    command.add_argument('value')
+    command.set_defaults(handler=cli_setprop)
+
+    command = commands.add_parser('input', help="inject a batched input sequence")
+    command.add_argument('events', help="a file of events, or events separated by ';'")
+    command.set_defaults(handler=cli_input)
+
+    command = commands.add_parser('reboot', help="reboot the device")
+    command.add_argument('target', nargs='?', choices=['bootloader', 'recovery'])
+    command.set_defaults(handler=cli_reboot)
+
+    command = commands.add_parser('forward', help="forward a local port to the device, or list and remove forwards")
+    command.add_argument('local', nargs='?', help="e.g. tcp:8080")
+    command.add_argument('remote', nargs='?', help="e.g. tcp:8080")
+    command.add_argument('--list', action='store_true', help="list forwards and reverses on every device")
+    command.add_argument('--remove', metavar='LOCAL', help="remove the forward on this local port")
+    command.add_argument('--remove-all', action='store_true', help="remove every forward (of -s SERIAL, if given)")
+    command.add_argument('--relay', action='store_true',
+                         help="relay in this process and show live connection and throughput stats")
+    command.set_defaults(handler=cli_forward)
+
+    command = commands.add_parser('reverse', help="forward a device port to the host")
+    command.add_argument('remote', nargs='?', help="e.g. tcp:8080")
+    command.add_argument('local', nargs='?', help="e.g. tcp:8080")
+    command.add_argument('--remove', metavar='REMOTE', help="remove the reverse on this device port")
+    command.add_argument('--remove-all', action='store_true', help="remove every reverse on the device")
+    command.set_defaults(handler=cli_reverse)
+
+    command = commands.add_parser('job', help="run a JSON or TOML job file as a dependency graph across devices")
+    command.add_argument('file')
+    command.add_argument('--restart', action='store_true', help="ignore the saved checkpoint")
+    command.set_defaults(handler=cli_job)
+
+    command = commands.add_parser('batch', help="run a file of operations, one per line")
+    command.add_argument('file')
+    command.add_argument('-k', '--keep-going', action='store_true', help="continue after a failed operation")
+    command.set_defaults(handler=cli_batch)
+    return parser
+
+def print_profile(trace_path):
+    print("\nadb call profile:", file=sys.stderr)
+    print(instrumentation.summary(), file=sys.stderr)
+    try:
+        events = instrumentation.export_trace(trace_path)
+        print(f"\nWrote {events} trace events to {trace_path} (open in chrome://tracing or ui.perfetto.dev).",
+              file=sys.stderr)
+    except OSError as e:
+        print(f"Could not write the trace: {e}", file=sys.stderr)
+
+def run_cli(argv):
+    parser = build_arg_parser()
+    args = parser.parse_args(argv)
+    if args.command is None and not args.profile:
+        parser.error("a command is required")
+    instrumentation.tracing = bool(args.profile)
+    if (args.host, args.port) != (adb_client.host, adb_client.port):
+        use_adb_server(args.host, args.port)
+    try:
+        if args.command is None:
+            return run_menu()
+        return args.handler(args)
+    except (AdbError, OSError, ValueError, zipfile.BadZipFile) as e:
+        print(f"Error occurred: {e}", file=sys.stderr)
+        return 1
+    finally:
+        shell_pool.close_all()
+        if args.profile:
+            print_profile(args.profile)
+
+def exit_program():
+    clear_screen()
+    print("Exiting EasyADB.")
+    for recorder in active_recordings.values():
+        recorder.stop()
+    wireless_connector.stop()
+    forward_manager.close()
+    shell_pool.close_all()
+    sys.exit()
+
+# Main function
+def main():
+    if len(sys.argv) > 1:
+        sys.exit(run_cli(sys.argv[1:]))
+    run_menu()
+
+def run_menu():
+    display_banner()
+    list_adb_devices()
+
+    while True:
+        display_menu()
+        choice = input("Select an option: ").strip()
+        if choice == "1":
+            device_management()
+        elif choice == "2":
+            app_management()
+        elif choice == "3":
+            file_management()
+        elif choice == "4":
+            system_management()
+        elif choice == "5":
+            shell_and_command_execution()
+        elif choice == "6":
+            screen_management()
+        elif choice == "7":
+            network_management()
+        elif choice == "8":
+            data_management()
+        elif choice == "9":
+            development_testing()
+        elif choice == "10":
+            root_access_permissions()
+        elif choice == "11":
+            remote_control()
+        elif choice == "12":
+            power_management()
+        elif choice == "13":
+            permissions_security()
+        elif choice == "14":
+            battery_management()
+        elif choice == "15":
+            advanced_usage()
+        elif choice == "0":
+            exit_program()
+        else:
+            print("Invalid option, please select again.")
+
+if __name__ == "__main__":
     main()
\ No newline at end of file
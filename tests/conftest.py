@@ -0,0 +1,24 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fakeadb
+import main
+
+
+@pytest.fixture
+def fake_adb(tmp_path, monkeypatch):
+    # A stand-in adb server with two devices. Every shared client in main
+    # points at it, and the on-disk caches go to a temporary directory.
+    server = fakeadb.FakeAdbServer([fakeadb.FakeDevice('fake-0001'), fakeadb.FakeDevice('fake-0002')]).start()
+    monkeypatch.setattr(main.file_index, 'directory', str(tmp_path / 'files'))
+    monkeypatch.setattr(main.file_index, '_indexes', {})
+    monkeypatch.setattr(main.package_index, 'directory', str(tmp_path / 'packages'))
+    monkeypatch.setattr(main.package_index, '_indexes', {})
+    main.use_adb_server('127.0.0.1', server.port)
+    yield server
+    main.use_adb_server(main.ADB_SERVER_HOST, main.ADB_SERVER_PORT)
+    server.stop()
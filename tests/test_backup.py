@@ -0,0 +1,71 @@
+import io
+import os
+import tarfile
+
+import pytest
+
+import main
+
+LONG_NAME = 'apps/com.example.notes/f/' + 'n' * 120
+
+
+def tar_stream(*names):
+    data = io.BytesIO()
+    with tarfile.open(fileobj=data, mode='w', format=tarfile.PAX_FORMAT) as archive:
+        for name in names:
+            info = tarfile.TarInfo(name)
+            info.size = len(name)
+            archive.addfile(info, io.BytesIO(name.encode()))
+    return data.getvalue()
+
+
+def test_iter_tar_entries_applies_pax_paths():
+    stream = tar_stream('apps/com.example.a/_manifest', LONG_NAME)
+    entries = list(main.iter_tar_entries(io.BytesIO(stream)))
+    assert [path for path, _ in entries] == ['apps/com.example.a/_manifest', LONG_NAME]
+    # The pax header travels with its entry, so the entry can be replayed as is.
+    with tarfile.open(fileobj=io.BytesIO(entries[1][1] + b'\0' * 1024)) as archive:
+        assert archive.getnames() == [LONG_NAME]
+
+
+def test_iter_tar_entries_rejects_a_truncated_stream():
+    stream = tar_stream('apps/com.example.a/_manifest', LONG_NAME)
+    with pytest.raises(main.AdbError):
+        list(main.iter_tar_entries(io.BytesIO(stream[:1536 + 100])))
+
+
+def test_backup_and_restore_through_the_fake(fake_adb, tmp_path):
+    device = fake_adb.devices['fake-0001']
+    device.backup_entries = [('apps/com.example.a/_manifest', b'manifest a'),
+                             ('apps/com.example.a/f/data', b'a' * 5000),
+                             (LONG_NAME, b'notes'),
+                             ('shared/0/DCIM/photo.jpg', b'jpeg')]
+    path, index = main.backup_device('fake-0001', str(tmp_path))
+    assert sorted(index['packages']) == ['com.example.a', 'com.example.notes', 'shared']
+    assert index['packages']['com.example.a']['entries'] == 2
+    assert os.listdir(tmp_path) == [os.path.basename(path)]
+    main.restore_archive(path, ['com.example.notes', 'com.example.a'], 'fake-0001')
+    assert device.restored == [(LONG_NAME, b'notes'), ('apps/com.example.a/_manifest', b'manifest a'),
+                               ('apps/com.example.a/f/data', b'a' * 5000)]
+
+
+def test_failed_backup_leaves_no_archive(fake_adb, tmp_path):
+    fake_adb.devices['fake-0001'].backup_entries = [('apps/com.example.a/_manifest', b'a'),
+                                                    ('apps/com.example.b/_manifest', b'b'),
+                                                    ('apps/com.example.a/f/late', b'a')]
+    [result] = main.backup_devices(['fake-0001'], str(tmp_path))
+    assert not result['ok'] and 'interleaves' in result['reason']
+    assert os.listdir(tmp_path) == []
+
+
+def test_backup_cut_mid_stream_leaves_no_archive(fake_adb, tmp_path, monkeypatch):
+    fake_adb.devices['fake-0001'].backup_entries = [('apps/com.example.a/_manifest', b'a')]
+    iter_tar_entries = main.iter_tar_entries
+
+    def cut_short(stream):
+        yield from iter_tar_entries(stream)
+        raise main.AdbError("The backup stream ended in the middle of the archive.")
+    monkeypatch.setattr(main, 'iter_tar_entries', cut_short)
+    [result] = main.backup_devices(['fake-0001'], str(tmp_path))
+    assert result['reason'] == "The backup stream ended in the middle of the archive."
+    assert os.listdir(tmp_path) == []
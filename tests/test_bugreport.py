@@ -0,0 +1,30 @@
+import zipfile
+
+import main
+
+REPORT = (b"== dumpstate: 2026-10-18 10:00:00\n"
+          b"------ SYSTEM LOG (logcat -v threadtime -d *:v) ------\n"
+          b"10-18 10:00:00.000 1 1 I Test: hello\n"
+          b"------ 0.1s was the duration of 'SYSTEM LOG' ------\n"
+          b"------ DUMPSYS (dumpsys) ------\n"
+          b"DUMP OF SERVICE battery:\n"
+          b"  level: 85\n"
+          b"DUMP OF SERVICE wifi:\n"
+          b"  Wi-Fi is enabled\n")
+
+
+def test_sections_are_indexed_and_read_back(tmp_path):
+    path = str(tmp_path / 'bugreport.zip')
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('main_entry.txt', 'bugreport-fake.txt')
+        archive.writestr('bugreport-fake.txt', REPORT)
+    with main.BugreportIndex(path) as report:
+        assert [section['name'] for section in report.sections] == [
+            'SYSTEM LOG (logcat -v threadtime -d *:v)', 'DUMPSYS (dumpsys)',
+            'DUMPSYS (dumpsys) / battery', 'DUMPSYS (dumpsys) / wifi']
+        [battery] = report.find('battery')
+        assert ''.join(report.iter_section(battery)) == "DUMP OF SERVICE battery:\n  level: 85\n"
+    # The saved index is used the second time round.
+    assert (tmp_path / 'bugreport.zip.index.json').exists()
+    with main.BugreportIndex(path) as report:
+        assert len(report.sections) == 4
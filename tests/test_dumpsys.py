@@ -0,0 +1,21 @@
+import main
+
+
+def test_parse_number():
+    assert main.parse_number(' 1,234K ') == 1234
+    assert main.parse_number('42') == 42
+    assert main.parse_number('-3') == -3
+    assert main.parse_number('0.75') == 0.75
+    assert main.parse_number('true') is True
+    assert main.parse_number('OK') == 'OK'
+    assert main.parse_number('UNKNOWN') == 'UNKNOWN'
+    assert main.parse_number('Li-ion, 2 cells') == 'Li-ion, 2 cells'
+
+
+def test_battery_through_the_cache(fake_adb):
+    fake_adb.devices['fake-0001'].responses['dumpsys battery'] = {'output': (
+        "Current Battery Service state:\n  AC powered: false\n  level: 85\n"
+        "  temperature: 312\n  technology: Li-ion\n  status: OK\n")}
+    battery = main.dumpsys_cache.parsed('battery', 'fake-0001')
+    assert battery == {'AC powered': False, 'level': 85, 'temperature': 31.2,
+                       'technology': 'Li-ion', 'status': 'OK'}
@@ -0,0 +1,60 @@
+import os
+import stat
+
+import main
+
+
+def test_compile_remote_glob():
+    regex, base = main.compile_remote_glob('/sdcard/DCIM/**/*.jpg')
+    assert base == '/sdcard/DCIM'
+    assert [path for path in ['/sdcard/DCIM/a.jpg', '/sdcard/DCIM/Camera/2026/b.jpg', '/sdcard/DCIM/a.png',
+                              '/sdcard/DCIM.jpg', '/sdcard/DCIM/a.jpg.bak'] if regex.match(path)] == [
+        '/sdcard/DCIM/a.jpg', '/sdcard/DCIM/Camera/2026/b.jpg']
+
+    regex, base = main.compile_remote_glob('/sdcard/log?/*[!~].txt')
+    assert base == '/sdcard'
+    assert regex.match('/sdcard/log1/a.txt') and regex.match('/sdcard/logs/b.txt')
+    assert not regex.match('/sdcard/log1/sub/a.txt') and not regex.match('/sdcard/log1/a~.txt')
+    assert not regex.match('/sdcard/logs10/a.txt')
+
+    regex, base = main.compile_remote_glob('/sdcard/notes (1).txt')
+    assert base == '/sdcard/notes (1).txt' and regex.match('/sdcard/notes (1).txt')
+
+
+def test_parse_file_listing():
+    listing = main.parse_file_listing(
+        "81b0 12 1700000000 /sdcard/a file.txt\n"
+        "41f9 4096 1700000001 /sdcard/dir/\n"
+        "stat: '/sdcard/gone': No such file or directory\n"
+        "find: /sdcard/private: Permission denied\n")
+    assert listing == {
+        '/sdcard/a file.txt': main.RemoteFile('/sdcard/a file.txt', 0o100660, 12, 1700000000),
+        '/sdcard/dir': main.RemoteFile('/sdcard/dir', 0o40771, 4096, 1700000001)}
+
+
+def test_glob_delete_chmod_and_pull_through_the_fake(fake_adb, tmp_path):
+    device = fake_adb.devices['fake-0001']
+    for path in ['/sdcard/DCIM/a.jpg', '/sdcard/DCIM/Camera/b.jpg', '/sdcard/DCIM/Camera/c.png',
+                 '/sdcard/Download/run.sh']:
+        device.files[path] = (0o100660, 1700000000, path.encode())
+    index = main.file_index
+    assert [entry.path for entry in index.glob('/sdcard/DCIM/**/*.jpg', 'fake-0001')] == [
+        '/sdcard/DCIM/Camera/b.jpg', '/sdcard/DCIM/a.jpg']
+
+    matches, received = index.pull('/sdcard/DCIM/**/*.jpg', str(tmp_path), 'fake-0001')
+    assert received == len('/sdcard/DCIM/a.jpg') + len('/sdcard/DCIM/Camera/b.jpg')
+    assert (tmp_path / 'Camera' / 'b.jpg').read_bytes() == b'/sdcard/DCIM/Camera/b.jpg'
+    assert os.path.getmtime(tmp_path / 'a.jpg') == 1700000000
+
+    paths, errors = index.chmod('/sdcard/Download/*.sh', '755', 'fake-0001')
+    assert (paths, errors) == (['/sdcard/Download/run.sh'], [])
+    assert stat.S_IMODE(device.files['/sdcard/Download/run.sh'][0]) == 0o755
+    [entry] = index.glob('/sdcard/Download/*.sh', 'fake-0001')
+    assert stat.S_IMODE(entry.mode) == 0o755
+
+    paths, errors = index.delete('/sdcard/DCIM/Camera', 'fake-0001')
+    assert (paths, errors) == (['/sdcard/DCIM/Camera'], [])
+    assert sorted(device.files) == ['/sdcard/DCIM/a.jpg', '/sdcard/Download/run.sh']
+    # The index followed the deletion without another listing of the device.
+    assert [entry.path for entry in index.files('/sdcard/DCIM', 'fake-0001')] == [
+        '/sdcard/DCIM', '/sdcard/DCIM/a.jpg']
@@ -0,0 +1,72 @@
+import socket
+import socketserver
+import threading
+import time
+
+import main
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached in time")
+        time.sleep(0.02)
+
+
+def test_list_reverses(fake_adb):
+    main.adb_client.reverse('tcp:7001', 'tcp:7000', 'fake-0001')
+    assert main.adb_client.list_reverses('fake-0001') == [
+        {'serial': 'fake-0001', 'remote': 'tcp:7001', 'local': 'tcp:7000'}]
+    main.adb_client.remove_reverse('tcp:7001', 'fake-0001')
+    assert main.adb_client.list_reverses('fake-0001') == []
+
+
+def test_forward_manager_lists_and_restores_after_reconnect(fake_adb):
+    manager = main.ForwardManager(main.adb_client, main.device_tracker)
+    try:
+        manager.add('tcp:9001', 'tcp:80', 'fake-0001')
+        manager.add('tcp:7000', 'tcp:7001', 'fake-0001', kind='reverse')
+        rows = {(row['kind'], row['local'], row['remote']) for row in manager.list() if row['state'] == 'active'}
+        assert rows == {('forward', 'tcp:9001', 'tcp:80'), ('reverse', 'tcp:7000', 'tcp:7001')}
+
+        device = fake_adb.devices['fake-0001']
+        fake_adb.remove_device('fake-0001')
+        wait_until(lambda: 'fake-0001' not in main.device_tracker.ready())
+        assert fake_adb.forwards == {} and device.reverses == {}
+        fake_adb.add_device(device)
+        wait_until(lambda: fake_adb.forwards and device.reverses)
+        assert fake_adb.forwards == {('fake-0001', 'tcp:9001'): 'tcp:80'}
+        assert device.reverses == {'tcp:7001': 'tcp:7000'}
+
+        manager.remove_all()
+        assert manager.list() == []
+    finally:
+        manager.close()
+        main.device_tracker.remove_listener(manager._on_device)
+
+
+def test_relay_carries_data_and_counts_it(fake_adb):
+    class Upper(socketserver.BaseRequestHandler):
+        def handle(self):
+            while data := self.request.recv(65536):
+                self.request.sendall(data.upper())
+    upstream = socketserver.ThreadingTCPServer(('127.0.0.1', 0), Upper)
+    threading.Thread(target=upstream.serve_forever, daemon=True).start()
+    manager = main.ForwardManager(main.adb_client, main.device_tracker)
+    try:
+        entry = manager.add('tcp:0', f"tcp:{upstream.server_address[1]}", 'fake-0001', kind='relay')
+        port = int(entry['local'].partition(':')[2])
+        for _ in range(3):
+            with socket.create_connection(('127.0.0.1', port)) as client:
+                client.sendall(b'hello')
+                assert client.recv(5) == b'HELLO'
+        wait_until(lambda: entry['relay'].stats()['active'] == 0)
+        stats = entry['relay'].stats()
+        assert (stats['connections'], stats['failed'], stats['bytes_up'], stats['bytes_down']) == (3, 0, 15, 15)
+        assert stats['connect_ms'] is not None and stats['first_byte_ms'] is not None
+    finally:
+        manager.close()
+        main.device_tracker.remove_listener(manager._on_device)
+        upstream.shutdown()
+        upstream.server_close()
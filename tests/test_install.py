@@ -0,0 +1,88 @@
+import hashlib
+import struct
+import zipfile
+
+import main
+
+
+def string_pool(strings, utf8):
+    offsets, data = [], bytearray()
+    for text in strings:
+        offsets.append(len(data))
+        if utf8:
+            encoded = text.encode()
+            data += bytes([len(text), len(encoded)]) + encoded + b'\0'
+        else:
+            data += struct.pack('<H', len(text)) + text.encode('utf-16-le') + b'\0\0'
+    data += b'\0' * (-len(data) % 4)
+    header_size = 28 + 4 * len(strings)
+    return (struct.pack('<HHIIIIII', 0x0001, 28, header_size + len(data), len(strings), 0,
+                        0x100 if utf8 else 0, header_size, 0) +
+            struct.pack(f'<{len(strings)}I', *offsets) + data)
+
+
+def binary_manifest(package, version_code):
+    pool = string_pool(['versionCode', 'package', 'manifest', package], utf8=True)
+    resource_map = struct.pack('<HHII', 0x0180, 8, 12, main.ANDROID_ATTR_VERSION_CODE)
+    attributes = (struct.pack('<IIIHBBI', 0xFFFFFFFF, 1, 3, 8, 0, 3, 3) +
+                  struct.pack('<IIIHBBI', 0xFFFFFFFF, 0, 0xFFFFFFFF, 8, 0, 0x10, version_code))
+    element = struct.pack('<HHIIIIIHHHHHH', 0x0102, 16, 36 + len(attributes), 1, 0xFFFFFFFF,
+                          0xFFFFFFFF, 2, 20, 20, 2, 0, 0, 0) + attributes
+    body = pool + resource_map + element
+    return struct.pack('<HHI', 0x0003, 8, 8 + len(body)) + body
+
+
+def build_apk(path, version_code=1, **entries):
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as apk:
+        apk.writestr('AndroidManifest.xml', binary_manifest('com.example.app', version_code))
+        for name, data in sorted(entries.items()):
+            apk.writestr(name.replace('_', '.'), data)
+    return str(path)
+
+
+def test_parse_string_pool_reads_both_encodings():
+    strings = ['package', 'com.example.app', 'é' * 3, '']
+    for utf8 in (True, False):
+        data = b'\0' * 8 + string_pool(strings, utf8)
+        assert main.parse_string_pool(data, 8) == strings
+
+
+def test_read_apk_manifest(tmp_path):
+    assert main.read_apk_manifest(build_apk(tmp_path / 'app.apk', 42)) == ('com.example.app', 42)
+
+
+def test_plan_apk_delta_rebuilds_the_new_apk(tmp_path):
+    unchanged = bytes(range(256)) * 400
+    old = build_apk(tmp_path / 'old.apk', 1, classes_dex=b'old code' * 100, assets_big=unchanged)
+    new = build_apk(tmp_path / 'new.apk', 2, classes_dex=b'new code' * 120, assets_big=unchanged)
+    segments, patch = main.plan_apk_delta(old, new)
+    with open(old, 'rb') as old_file:
+        old_bytes = old_file.read()
+    rebuilt = b''.join(old_bytes[offset:offset + length] if source == 'old' else patch[offset:offset + length]
+                       for source, offset, length in segments)
+    with open(new, 'rb') as new_file:
+        assert rebuilt == new_file.read()
+    # Only the unchanged asset comes from the device's copy; everything else is patched in.
+    with zipfile.ZipFile(new) as apk:
+        assert sum(length for source, _, length in segments if source == 'old') == \
+            apk.getinfo('assets.big').compress_size
+    assert len(patch) + apk.getinfo('assets.big').compress_size == len(rebuilt)
+
+
+def test_install_if_changed_skips_the_same_build(fake_adb, tmp_path, monkeypatch):
+    # The fake is not a shell, so the device-side state query reports what it
+    # was last sent instead of running `pm path`/`sha1sum`.
+    device = fake_adb.devices['fake-0001']
+    monkeypatch.setattr(main, 'APK_CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setattr(main, 'installed_apk_state', lambda package, serial=None: device.installs and {
+        'path': '/data/app/base.apk', 'sha1': hashlib.sha1(device.installs[-1]).hexdigest(), 'version_code': 3})
+    apk = build_apk(tmp_path / 'app.apk', 3, classes_dex=b'code')
+    assert main.install_if_changed(apk, 'fake-0001') == 'installed'
+    assert main.install_if_changed(apk, 'fake-0001') == 'skipped'
+    assert len(device.installs) == 1
+    with open(apk, 'rb') as apk_file:
+        assert device.installs[0] == apk_file.read()
+    assert (tmp_path / 'cache').is_dir()
+    build_apk(tmp_path / 'app.apk', 4, classes_dex=b'changed')
+    assert main.install_if_changed(apk, 'fake-0001') == 'installed'
+    assert len(device.installs) == 2
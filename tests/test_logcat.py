@@ -0,0 +1,77 @@
+import struct
+import threading
+
+import pytest
+
+import main
+from test_forwards import wait_until
+
+
+def record(seconds, nanoseconds, message, pid=100, tid=101, priority=4, tag='Test', header_size=0):
+    payload = bytes([priority]) + tag.encode() + b'\0' + message.encode() + b'\0'
+    header = struct.pack('<HHiiII', len(payload), header_size, pid, tid, seconds, nanoseconds)
+    return header + b'\0' * (max(header_size, 20) - 20) + payload
+
+
+def test_iter_logcat_entries_reads_v1_headers_across_chunks():
+    data = record(10, 5, 'first') + record(11, 6, 'second')
+    chunks = [data[:7], data[7:30], data[30:]]
+    assert list(main.iter_logcat_entries(chunks)) == [
+        main.LogEntry(10, 5, 100, 101, 4, 'Test', 'first'),
+        main.LogEntry(11, 6, 100, 101, 4, 'Test', 'second')]
+
+
+def test_iter_logcat_entries_skips_longer_headers():
+    data = record(10, 5, 'v2', header_size=24) + record(12, 0, 'v4', pid=7, header_size=28)
+    entries = list(main.iter_logcat_entries([data]))
+    assert [(entry.seconds, entry.pid, entry.tag, entry.message) for entry in entries] == [
+        (10, 100, 'Test', 'v2'), (12, 7, 'Test', 'v4')]
+
+
+def test_parse_log_filter():
+    matches = main.parse_log_filter('tag=ActivityManager,WindowManager priority=W pid=1,2')
+    entry = main.LogEntry(0, 0, 1, 1, main.LOG_PRIORITIES.index('E'), 'WindowManager', '')
+    assert matches(entry)
+    assert not matches(entry._replace(priority=main.LOG_PRIORITIES.index('I')))
+    assert not matches(entry._replace(tag='Other'))
+    assert not matches(entry._replace(pid=3))
+    assert main.parse_log_filter('')(entry)
+    with pytest.raises(ValueError):
+        main.parse_log_filter('level=W')
+    with pytest.raises(ValueError):
+        main.parse_log_filter('priority=warn')
+
+
+class ListWriter:
+    def __init__(self):
+        self.lines = []
+
+    def write_line(self, line):
+        self.lines.append(line)
+
+    def close(self):
+        pass
+
+
+def test_capture_logcat_writes_each_entry_once_across_reconnects(fake_adb, monkeypatch):
+    # The fake's logcat exits after each dump, so every pass is a reconnect
+    # that replays the last millisecond.
+    monkeypatch.setattr(main, 'LOG_RECONNECT_DELAY', 0.01)
+    device = fake_adb.devices['fake-0001']
+    device.log += [(100, 1000, 1, 1, 4, 'Test', 'a'),
+                   (100, 2000, 1, 1, 4, 'Test', 'b'),
+                   (100, 2000, 1, 2, 4, 'Test', 'c')]
+    writer, stop_event = ListWriter(), threading.Event()
+    thread = threading.Thread(target=main.capture_logcat,
+                              args=('fake-0001', writer, main.parse_log_filter(''), stop_event, {}))
+    thread.start()
+    try:
+        wait_until(lambda: len(writer.lines) >= 3)
+        device.log += [(100, 2000, 1, 1, 4, 'Test', 'd'), (101, 0, 1, 1, 4, 'Test', 'e')]
+        wait_until(lambda: len(writer.lines) >= 5)
+        # Give further reconnects the chance to write something twice.
+        stop_event.wait(0.2)
+    finally:
+        stop_event.set()
+        thread.join()
+    assert [line.rsplit(': ', 1)[1] for line in writer.lines] == ['a', 'b', 'c', 'd', 'e']
@@ -0,0 +1,32 @@
+import threading
+import time
+
+import main
+
+
+def test_stop_between_segments_does_not_wait_for_the_next_one(fake_adb, tmp_path, monkeypatch):
+    device = fake_adb.devices['fake-0001']
+    device.responses['screenrecord'] = {'output': 'frames'}
+    recorder = main.ScreenRecorder('fake-0001', str(tmp_path / 'clip'))
+    open_service = main.adb_client.open_service
+    stopper = threading.Thread(target=recorder.stop)
+    calls = []
+
+    def open_next_segment(service, serial=None):
+        calls.append(service)
+        if len(calls) == 2:
+            # The second segment would record for a long while; stop() lands as it opens.
+            device.responses['screenrecord'] = {'output': 'frames', 'delay_ms': 3000}
+            stopper.start()
+            recorder._stop.wait()
+        return open_service(service, serial)
+    monkeypatch.setattr(main.adb_client, 'open_service', open_next_segment)
+    started = time.monotonic()
+    recorder.start()
+    stopper_started = recorder._stop.wait(5)
+    stopper.join(5)
+    assert stopper_started and not stopper.is_alive()
+    assert time.monotonic() - started < 2
+    assert recorder.segments == [str(tmp_path / 'clip_0001.h264')]
+    assert (tmp_path / 'clip_0001.h264').read_bytes() == b'frames'
+    assert recorder.error is None
@@ -0,0 +1,34 @@
+import struct
+import zlib
+
+import main
+
+
+def decode_png(data):
+    assert data[:8] == b'\x89PNG\r\n\x1a\n'
+    offset, chunks = 8, {}
+    while offset < len(data):
+        length, kind = struct.unpack_from('>I4s', data, offset)
+        chunks.setdefault(kind, b'')
+        chunks[kind] += data[offset + 8:offset + 8 + length]
+        offset += 12 + length
+    width, height, depth, color_type = struct.unpack_from('>IIBB', chunks[b'IHDR'])
+    return width, height, color_type, zlib.decompress(chunks[b'IDAT'])
+
+
+def test_encode_png_keeps_alpha_for_rgba():
+    pixels = bytes([1, 2, 3, 4, 5, 6, 7, 8])
+    assert decode_png(main.encode_png(main.Framebuffer(2, 1, 1, pixels))) == (2, 1, 6, b'\0' + pixels)
+
+
+def test_encode_png_drops_the_padding_byte_of_rgbx():
+    pixels = bytes([1, 2, 3, 0, 5, 6, 7, 0, 9, 10, 11, 0, 13, 14, 15, 0])
+    assert decode_png(main.encode_png(main.Framebuffer(2, 2, 2, memoryview(pixels)))) == (
+        2, 2, 2, b'\0' + bytes([1, 2, 3, 5, 6, 7]) + b'\0' + bytes([9, 10, 11, 13, 14, 15]))
+
+
+def test_raw_capture_through_the_fake(fake_adb):
+    screenshot = main.capture_screenshot('fake-0001', raw=True)
+    width, height = fake_adb.devices['fake-0001'].screen_size
+    assert (screenshot.width, screenshot.height, screenshot.format) == (width, height, 1)
+    assert decode_png(main.encode_png(screenshot))[:3] == (width, height, 6)
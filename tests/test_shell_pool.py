@@ -0,0 +1,31 @@
+import socket
+
+import pytest
+
+import main
+
+
+def test_stale_session_is_replaced_before_anything_is_sent(fake_adb):
+    assert main.shell_pool.run('echo first', 'fake-0001').stdout == 'first\n'
+    stale = main.shell_pool._idle['fake-0001'][0]
+    stale.conn.sock.shutdown(socket.SHUT_RD)
+    assert main.shell_pool.run('echo second', 'fake-0001').stdout == 'second\n'
+    assert not stale.alive
+
+
+def test_batch_cut_short_is_not_resent(fake_adb, monkeypatch):
+    device = fake_adb.devices['fake-0001']
+    main.shell_pool.run('echo warm', 'fake-0001')
+    ran = []
+
+    def fault():
+        ran.append(None)
+        return 'drop' if len(ran) == 2 else None
+    monkeypatch.setattr(device, 'fault', fault)
+    with pytest.raises(main.ShellSessionError) as raised:
+        main.shell_pool.run_many(['echo a', 'touch /data/local/tmp/once', 'echo c'], 'fake-0001')
+    assert raised.value.written
+    assert [result.stdout for result in raised.value.results] == ['a\n']
+    # The device saw the batch once; a resend would have asked for more commands.
+    assert len(ran) == 2
+    assert main.shell_pool.run('echo after', 'fake-0001').stdout == 'after\n'
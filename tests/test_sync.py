@@ -0,0 +1,42 @@
+import hashlib
+import os
+
+import main
+
+
+def sha1(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+def test_diff_manifests(tmp_path):
+    (tmp_path / 'touched').write_bytes(b'same')
+    (tmp_path / 'edited').write_bytes(b'new!')
+    local = {'new': (1, 10), 'resized': (5, 10), 'touched': (4, 20), 'edited': (4, 20), 'kept': (3, 10)}
+    remote = {'resized': (4, 10, None), 'touched': (4, 10, sha1(b'same')), 'edited': (4, 10, sha1(b'old!')),
+              'kept': (3, 10, None), 'extra': (1, 10, None)}
+    assert main.diff_manifests(str(tmp_path), local, remote, 'local') == (
+        ['edited', 'new', 'resized'], ['extra'])
+    assert main.diff_manifests(str(tmp_path), local, remote, 'remote') == (
+        ['edited', 'extra', 'resized'], ['new'])
+
+
+def test_push_then_pull_through_the_fake(fake_adb, tmp_path):
+    source = tmp_path / 'source'
+    (source / 'sub').mkdir(parents=True)
+    (source / 'a.txt').write_bytes(b'aaa')
+    (source / 'sub' / 'b.txt').write_bytes(b'bb')
+    result = main.sync_directory(str(source), '/sdcard/assets', 'push', serial='fake-0001')
+    assert (result['transferred'], result['bytes']) == (2, 5)
+    assert main.sync_directory(str(source), '/sdcard/assets', 'push', serial='fake-0001')['transferred'] == 0
+
+    (source / 'a.txt').write_bytes(b'AAAA')
+    os.remove(source / 'sub' / 'b.txt')
+    result = main.sync_directory(str(source), '/sdcard/assets', 'push', delete=True, serial='fake-0001')
+    assert (result['transferred'], result['deleted']) == (1, 1)
+    assert sorted(main.build_remote_manifest('/sdcard/assets', 'fake-0001')) == ['a.txt']
+
+    copy = tmp_path / 'copy'
+    result = main.sync_directory(str(copy), '/sdcard/assets', 'pull', serial='fake-0001')
+    assert result['transferred'] == 1
+    assert (copy / 'a.txt').read_bytes() == b'AAAA'
+    assert main.build_remote_manifest('/sdcard/missing', 'fake-0001') == {}
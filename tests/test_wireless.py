@@ -0,0 +1,30 @@
+import time
+
+import main
+from test_forwards import wait_until
+
+
+def test_forget_accepts_a_bare_host(fake_adb):
+    connector = main.WirelessConnector(main.adb_client, main.device_tracker)
+    connector.watched.update({'10.0.0.2:5555', '10.0.0.3:5555', '10.0.0.4:7000'})
+    connector.forget('10.0.0.2')
+    connector.forget('10.0.0.4:7000')
+    assert connector.watched == {'10.0.0.3:5555'}
+    main.device_tracker.remove_listener(connector._on_device)
+
+
+def test_menu_disconnect_is_not_undone_by_the_watcher(fake_adb, monkeypatch):
+    device = fake_adb.add_wireless()
+    main.device_tracker.start()
+    [result] = main.wireless_connector.connect_all([device.serial])
+    assert result['ok']
+    wait_until(lambda: device.serial in main.device_tracker.ready())
+
+    answers = iter([device.serial, ''])
+    monkeypatch.setattr('builtins.input', lambda prompt='': next(answers))
+    monkeypatch.setattr(main, 'clear_screen', lambda: None)
+    main.disconnect_device()
+    wait_until(lambda: device.serial not in main.device_tracker.ready())
+    time.sleep(0.5)
+    assert device.serial not in fake_adb.devices
+    assert main.wireless_connector.watched == set()